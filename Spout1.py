@@ -1,5 +1,3 @@
-from web3 import Web3
-from web3.exceptions import TransactionNotFound
 from eth_account import Account
 from eth_utils import to_hex, to_bytes
 from curl_cffi import requests
@@ -7,6 +5,7 @@ from fake_useragent import FakeUserAgent
 from datetime import datetime
 from colorama import *
 import asyncio, random, json, os, pytz
+from pharos import Web3Pool, GasProfile, TransactionSigner, TokenRegistry, TokenReader, BalanceLedger, AllowanceLedger, RunJournal, AccountRunner, AccountState, TransactionSender, RetryPolicy, RateLimits, current_account, classify_error, is_allowance_error
 
 wib = pytz.timezone('Asia/Jakarta')
 
@@ -105,8 +104,22 @@ class Spout:
         self.proxies = []
         self.proxy_index = 0
         self.account_proxies = {}
-        self.used_nonce = {}
-        self.identity_address = {}
+        self.retry_policy = RetryPolicy()
+        self.rate_limits = RateLimits.from_config("limits.json")
+        self.web3_pool = Web3Pool.from_config("rpc.json", self.RPC_URL, retry_policy=self.retry_policy, rate_limits=self.rate_limits)
+        self.gas_profile = GasProfile()
+        self.journal = RunJournal("journal.db", "spout")
+        self.signer = TransactionSigner()
+        self.token_registry = TokenRegistry()
+        self.token_reader = TokenReader(registry=self.token_registry)
+        self.balance_ledger = BalanceLedger(reader=self.token_reader)
+        self.sender = TransactionSender(self.web3_pool, self.signer, self.gas_profile, self.balance_ledger, self.log)
+        self.balance_tokens = [self.USDC_CONTRACT_ADDRESS]
+        self.allowance_ledger = AllowanceLedger(multicall=self.token_reader.multicall)
+        self.allowance_pairs = [
+            (self.USDC_CONTRACT_ADDRESS, self.ORDERS_ROUTER_ADDRESS)
+        ]
+        self.workers = 1
         self.trade_count = 0
         self.usdc_amount = 0
         self.slqd_amount = 0
@@ -117,12 +130,18 @@ class Spout:
         os.system('cls' if os.name == 'nt' else 'clear')
 
     def log(self, message):
+        state = current_account.get()
+        label = f"{Fore.MAGENTA + Style.BRIGHT}[ {state.label} ]{Style.RESET_ALL} " if state and self.workers > 1 else ""
         print(
             f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
-            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{message}",
+            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{label}{message}",
             flush=True
         )
 
+    @property
+    def state(self):
+        return current_account.get()
+
     def welcome(self):
         print(
             f"""
@@ -199,34 +218,17 @@ class Spout:
         except Exception as e:
             return None
         
-    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60):
-        request_kwargs = {"timeout": timeout}
-
+    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60, pin=False):
         proxy = self.get_next_proxy_for_account(address) if use_proxy else None
-
-        if use_proxy and proxy:
-            request_kwargs["proxies"] = {"http": proxy, "https": proxy}
-
-        for attempt in range(retries):
-            try:
-                web3 = Web3(Web3.HTTPProvider(self.RPC_URL, request_kwargs=request_kwargs))
-                web3.eth.get_block_number()
-                return web3
-            except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(3)
-                    continue
-                raise Exception(f"Failed to Connect to RPC: {str(e)}")
+        return await self.web3_pool.get(proxy, timeout, retries, address if pin else None)
         
-    async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool):
+    async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool, required=None):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
-            token_contract = web3.eth.contract(address=web3.to_checksum_address(contract_address), abi=self.ERC20_CONTRACT_ABI)
-            balance = token_contract.functions.balanceOf(address).call()
-            decimals = token_contract.functions.decimals().call()
+            token = (await self.balance_ledger.read(web3, address, [contract_address], required))[0]
 
-            token_balance = balance / (10 ** decimals)
+            token_balance = token["balance"] / (10 ** token["decimals"])
 
             return token_balance
         except Exception as e:
@@ -242,7 +244,7 @@ class Spout:
 
             factory_address = web3.to_checksum_address(self.FACTORY_ROUTER_ADDRESS)
             token_contract = web3.eth.contract(address=factory_address, abi=self.SPOUT_CONTRACT_ABI)
-            identity_address = token_contract.functions.getIdentity(address).call()
+            identity_address = await token_contract.functions.getIdentity(address).call()
 
             return identity_address
         except Exception as e:
@@ -256,9 +258,9 @@ class Spout:
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
-            identity_address = web3.to_checksum_address(self.identity_address[address])
+            identity_address = web3.to_checksum_address(self.state.identity_address)
             token_contract = web3.eth.contract(address=identity_address, abi=self.SPOUT_CONTRACT_ABI)
-            claim_ids = token_contract.functions.getClaimIdsByTopic(1).call()
+            claim_ids = await token_contract.functions.getClaimIdsByTopic(1).call()
 
             return claim_ids
         except Exception as e:
@@ -268,67 +270,33 @@ class Spout:
             )
             return None
     
-    async def send_raw_transaction_with_retries(self, account, web3, tx, retries=5):
-        for attempt in range(retries):
-            try:
-                signed_tx = web3.eth.account.sign_transaction(tx, account)
-                raw_tx = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                tx_hash = web3.to_hex(raw_tx)
-                return tx_hash
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Send TX Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Hash Not Found After Maximum Retries")
-
-    async def wait_for_receipt_with_retries(self, web3, tx_hash, retries=5):
-        for attempt in range(retries):
-            try:
-                receipt = await asyncio.to_thread(web3.eth.wait_for_transaction_receipt, tx_hash, timeout=300)
-                return receipt
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Wait for Receipt Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Receipt Not Found After Maximum Retries")
     
     async def perform_deploy_identity(self, account: str, address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             contract_address = web3.to_checksum_address(self.GATEWAY_ROUTER_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.SPOUT_CONTRACT_ABI)
 
             deploy_data = token_contract.functions.deployIdentityForWallet(address)
 
-            identity_address = deploy_data.call({"from": address})
-            estimated_gas = deploy_data.estimate_gas({"from": address})
+            identity_address = await deploy_data.call({"from": address})
+            estimated_gas = await deploy_data.estimate_gas({"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            deploy_tx = deploy_data.build_transaction({
+            deploy_tx = await deploy_data.build_transaction({
                 "from": web3.to_checksum_address(address),
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, deploy_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, deploy_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number, identity_address
         except Exception as e:
@@ -340,35 +308,32 @@ class Spout:
     
     async def perform_add_claim(self, account: str, address: str, signature: bytes, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
-            contract_address = web3.to_checksum_address(self.identity_address[address])
+            contract_address = web3.to_checksum_address(self.state.identity_address)
             token_contract = web3.eth.contract(address=contract_address, abi=self.SPOUT_CONTRACT_ABI)
 
             data = to_bytes(hexstr="0x6fdd523c9e64db4a7a67716a6b20d5da5ce39e3ee59b2ca281248b18087e860")
 
             add_claim_data = token_contract.functions.addClaim(1, 1, self.ISSUER_ROUTER_ADDRESS, signature, data, "")
 
-            claim_id = add_claim_data.call({"from": address})
-            estimated_gas = add_claim_data.estimate_gas({"from": address})
+            claim_id = await add_claim_data.call({"from": address})
+            estimated_gas = await add_claim_data.estimate_gas({"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            add_claim_tx = add_claim_data.build_transaction({
+            add_claim_tx = await add_claim_data.build_transaction({
                 "from": web3.to_checksum_address(address),
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, add_claim_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, add_claim_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number, to_hex(claim_id)
         except Exception as e:
@@ -380,34 +345,36 @@ class Spout:
         
     async def approving_token(self, account: str, address: str, router_address: str, asset_address: str, amount: int, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             
             spender = web3.to_checksum_address(router_address)
             asset = web3.to_checksum_address(asset_address)
             token_contract = web3.eth.contract(address=asset, abi=self.ERC20_CONTRACT_ABI)
 
-            allowance = token_contract.functions.allowance(address, spender).call()
+            allowance = self.allowance_ledger.get(address, asset_address, spender)
+            if allowance is None:
+                allowance = await token_contract.functions.allowance(address, spender).call()
+                self.allowance_ledger.record(address, asset_address, spender, allowance)
+
             if allowance < amount:
                 approve_data = token_contract.functions.approve(spender, amount)
-                estimated_gas = approve_data.estimate_gas({"from": address})
+                estimated_gas = await self.gas_profile.estimate(approve_data, {"from": address})
 
-                max_priority_fee = web3.to_wei(1, "gwei")
-                max_fee = max_priority_fee
+                max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-                approve_tx = approve_data.build_transaction({
+                approve_tx = await approve_data.build_transaction({
                     "from": address,
                     "gas": int(estimated_gas * 1.2),
                     "maxFeePerGas": int(max_fee),
                     "maxPriorityFeePerGas": int(max_priority_fee),
-                    "nonce": self.used_nonce[address],
-                    "chainId": web3.eth.chain_id,
+                    "chainId": await self.web3_pool.chain.chain_id(web3),
                 })
 
-                tx_hash = await self.send_raw_transaction_with_retries(account, web3, approve_tx)
-                receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+                tx_hash = await self.sender.send(account, web3, approve_tx, substep="approve")
+                receipt = await self.sender.wait(web3, tx_hash)
+                self.allowance_ledger.record(address, asset_address, spender, amount)
 
                 block_number = receipt.blockNumber
-                self.used_nonce[address] += 1
 
                 explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
                 
@@ -435,9 +402,11 @@ class Spout:
     
     async def perform_buy_asset(self, account: str, address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
+
+            decimals = await self.token_registry.decimals(web3, self.USDC_CONTRACT_ADDRESS)
 
-            amount_to_wei = int(self.usdc_amount * (10**6))
+            amount_to_wei = int(self.usdc_amount * (10**decimals))
 
             await self.approving_token(account, address, self.ORDERS_ROUTER_ADDRESS, self.USDC_CONTRACT_ADDRESS, amount_to_wei, use_proxy)
 
@@ -446,28 +415,28 @@ class Spout:
 
             buy_data = token_contract.functions.buyAsset(2000002, "LQD", self.SLQD_CONTRACT_ADDRESS, amount_to_wei)
 
-            estimated_gas = buy_data.estimate_gas({"from": address})
+            estimated_gas = await buy_data.estimate_gas({"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            buy_tx = buy_data.build_transaction({
+            buy_tx = await buy_data.build_transaction({
                 "from": web3.to_checksum_address(address),
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, buy_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, buy_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
+            self.allowance_ledger.spend(address, self.USDC_CONTRACT_ADDRESS, self.ORDERS_ROUTER_ADDRESS, amount_to_wei)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
+            if is_allowance_error(e):
+                self.allowance_ledger.forget(address)
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
@@ -475,7 +444,12 @@ class Spout:
             return None, None
         
     async def print_timer(self):
-        for remaining in range(random.randint(self.min_delay, self.max_delay), 0, -1):
+        delay = random.randint(self.min_delay, self.max_delay)
+        if self.workers > 1:
+            await asyncio.sleep(delay)
+            return
+
+        for remaining in range(delay, 0, -1):
             print(
                 f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
                 f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}"
@@ -534,6 +508,18 @@ class Spout:
             except ValueError:
                 print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
 
+    def print_worker_question(self):
+        while True:
+            try:
+                workers = int(input(f"{Fore.YELLOW + Style.BRIGHT}Concurrent Accounts -> {Style.RESET_ALL}").strip())
+                if workers > 0:
+                    self.workers = workers
+                    break
+                else:
+                    print(f"{Fore.RED + Style.BRIGHT}Concurrent Accounts must be > 0.{Style.RESET_ALL}")
+            except ValueError:
+                print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
+
     def print_question(self):
         self.print_buy_asset_question()
         self.print_usdc_question()
@@ -590,7 +576,7 @@ class Spout:
         url = f"{self.BASE_API}/kyc-signature"
         data = json.dumps({
             "userAddress":address,
-            "onchainIDAddress":self.identity_address[address],
+            "onchainIDAddress":self.state.identity_address,
             "claimData":"KYC passed",
             "topic":1,
             "countryCode":91
@@ -615,8 +601,9 @@ class Spout:
                 response.raise_for_status()
                 return response.json()
             except (Exception, requests.RequestsError) as e:
-                if attempt < retries:
-                    await asyncio.sleep(5)
+                kind = classify_error(e)
+                if attempt < retries - 1 and self.retry_policy.should_retry(kind):
+                    await self.retry_policy.sleep(kind, attempt)
                     continue
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
@@ -726,11 +713,13 @@ class Spout:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
     
     async def process_complete_kyc(self, account: str, address: str, use_proxy):
         self.log(f"{Fore.CYAN+Style.BRIGHT}KYC     :{Style.RESET_ALL}")
@@ -745,7 +734,8 @@ class Spout:
 
         if identity_address == self.ZERO_CONTRACT_ADDRESS:
 
-            identity_address = await self.process_perform_deploy_identity(account, address, use_proxy)
+            self.state.begin_step("kyc:deploy")
+            identity_address = self.state.record("kyc:deploy", await self.process_perform_deploy_identity(account, address, use_proxy))
             if not identity_address: return False
 
         else:
@@ -759,7 +749,7 @@ class Spout:
             f"{Fore.BLUE+Style.BRIGHT} {identity_address} {Style.RESET_ALL}"
         )
 
-        self.identity_address[address] = identity_address
+        self.state.identity_address = identity_address
 
         self.log(
             f"{Fore.MAGENTA+Style.BRIGHT} ● {Style.RESET_ALL}"
@@ -781,7 +771,8 @@ class Spout:
 
             signature = to_bytes(r) + to_bytes(s) + to_bytes(v)
 
-            claim_id = await self.process_perform_add_claim(account, address, signature, use_proxy)
+            self.state.begin_step("kyc:claim")
+            claim_id = self.state.record("kyc:claim", await self.process_perform_add_claim(account, address, signature, use_proxy))
             if not claim_id: return False
 
         else:
@@ -813,6 +804,9 @@ class Spout:
                 f"{Fore.WHITE+Style.BRIGHT} {self.trade_count} {Style.RESET_ALL}                                   "
             )
 
+            if self.sender.skip(step=f"buy_asset:{i}"):
+                continue
+
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Pair    :{Style.RESET_ALL}"
                 f"{Fore.BLUE+Style.BRIGHT} USDC to SLQD {Style.RESET_ALL}"
@@ -823,7 +817,7 @@ class Spout:
                 f"{Fore.WHITE+Style.BRIGHT} {self.usdc_amount} {Style.RESET_ALL}"
             )
 
-            balance = await self.get_token_balance(address, self.USDC_CONTRACT_ADDRESS, use_proxy)
+            balance = await self.get_token_balance(address, self.USDC_CONTRACT_ADDRESS, use_proxy, self.usdc_amount)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Balance :{Style.RESET_ALL}"
@@ -844,15 +838,18 @@ class Spout:
                 )
                 return
 
-            await self.process_perform_buy_asset(account, address, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path="buy_asset"):
+                continue
+
+            if self.state.record("buy_asset", await self.process_perform_buy_asset(account, address, use_proxy)):
+                await self.print_timer()
 
     async def process_accounts(self, account: str, address: str, use_proxy: bool, rotate_proxy: bool):
         is_valid = await self.process_check_connection(address, use_proxy, rotate_proxy)
         if is_valid:
             
             try:
-                web3 = await self.get_web3_with_check(address, use_proxy)
+                web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             except Exception as e:
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -860,13 +857,55 @@ class Spout:
                     f"{Fore.MAGENTA+Style.BRIGHT}-{Style.RESET_ALL}"
                     f"{Fore.YELLOW+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
                 )
-                return
+                return False
             
-            self.used_nonce[address] = web3.eth.get_transaction_count(address, "pending")
+            await self.state.nonces.sync(web3)
+            await self.allowance_ledger.scan(web3, address, self.allowance_pairs)
+            await self.balance_ledger.seed(web3, address, self.balance_tokens)
             
             is_verifed = await self.process_complete_kyc(account, address, use_proxy)
-            if is_verifed:
-                await self.process_trade_buy_asset(account, address, use_proxy)
+            if not is_verifed:
+                return False
+
+            await self.process_trade_buy_asset(account, address, use_proxy)
+
+            return True
+
+        return False
+
+    async def process_account_task(self, account: str, use_proxy: bool, rotate_proxy: bool):
+        address = self.generate_address(account)
+        current_account.set(AccountState(account, address, self.mask_account(address), identity_address=None))
+
+        separator = "=" * 25
+        self.log(
+            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
+            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
+            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
+        )
+
+        if not address:
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.open_run(self.journal)
+
+        try:
+            success = await self.process_accounts(account, address, use_proxy, rotate_proxy)
+        except Exception as e:
+            self.state.close_run("failed")
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.close_run("finished" if success else "failed")
+        await asyncio.sleep(3)
+        return success
 
     async def main(self):
         try:
@@ -874,6 +913,10 @@ class Spout:
                 accounts = [line.strip() for line in file if line.strip()]
             
             proxy_choice, rotate_proxy = self.print_question()
+            self.print_worker_question()
+            self.signer.offload = self.workers > 1
+
+            await self.journal.reconcile(await self.web3_pool.get())
 
             while True:
                 use_proxy = True if proxy_choice == 1 else False
@@ -888,28 +931,20 @@ class Spout:
                 if use_proxy:
                     await self.load_proxies()
                 
-                separator = "=" * 25
-                for account in accounts:
-                    if account:
-                        address = self.generate_address(account)
-
-                        self.log(
-                            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
-                            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
-                            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
-                        )
-
-                        if not address:
-                            self.log(
-                                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
-                                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
-                            )
-                            continue
-
-                        await self.process_accounts(account, address, use_proxy, rotate_proxy)
-                        await asyncio.sleep(3)
+                runner = AccountRunner(self.workers)
+                report = await runner.run(accounts, lambda account: self.process_account_task(account, use_proxy, rotate_proxy))
 
                 self.log(f"{Fore.CYAN + Style.BRIGHT}={Style.RESET_ALL}"*72)
+                self.log(
+                    f"{Fore.GREEN + Style.BRIGHT}Throughput     : {Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT}{report['processed']} Accounts in {self.format_seconds(report['elapsed'])} {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} {report['per_minute']:.2f} Accounts/Min {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} x{report['parallelism']:.1f} Parallel {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.RED + Style.BRIGHT} {report['failed']} Failed {Style.RESET_ALL}"
+                )
                 seconds = 24 * 60 * 60
                 while seconds > 0:
                     formatted_time = self.format_seconds(seconds)
@@ -930,6 +965,9 @@ class Spout:
         except Exception as e:
             self.log(f"{Fore.RED+Style.BRIGHT}Error: {e}{Style.RESET_ALL}")
             raise e
+        finally:
+            await self.web3_pool.close()
+            self.signer.close()
 
 if __name__ == "__main__":
     try:
@@ -1,15 +1,29 @@
-from web3 import Web3
-from web3.exceptions import TransactionNotFound
 from eth_account import Account
 from aiohttp import ClientResponseError, ClientSession, ClientTimeout, BasicAuth
-from aiohttp_socks import ProxyConnector
 from fake_useragent import FakeUserAgent
 from datetime import datetime
 from colorama import *
+from typing import NamedTuple
 import asyncio, random, json, re, os, pytz
+from pharos import Web3Pool, SingleFlightCache, SessionPool, GasProfile, TransactionSigner, TokenRegistry, TokenReader, BalanceLedger, AllowanceLedger, EligibilityIndex, AccountScheduler, RunJournal, AccountRunner, AccountState, TransactionSender, RetryPolicy, RateLimits, current_account, classify_error, is_allowance_error
 
 wib = pytz.timezone('Asia/Jakarta')
 
+class Position(NamedTuple):
+    trader: str
+    id: int
+    asset_index: int
+    is_long: bool
+    leverage: int
+    open_price: int
+    size_usd: int
+    timestamp: int
+    stop_loss_price: int
+    take_profit_price: int
+    liquidation_price: int
+
+POSITION_TYPE = "(address,uint256,uint256,bool,uint256,uint256,uint256,uint256,uint256,uint256,uint256)"
+
 class Brokex:
     def __init__(self) -> None:
         self.HEADERS = {
@@ -149,8 +163,27 @@ class Brokex:
         self.proxies = []
         self.proxy_index = 0
         self.account_proxies = {}
-        self.used_nonce = {}
-        self.open_ids = {}
+        self.retry_policy = RetryPolicy()
+        self.rate_limits = RateLimits.from_config("limits.json")
+        self.web3_pool = Web3Pool.from_config("rpc.json", self.RPC_URL, retry_policy=self.retry_policy, rate_limits=self.rate_limits)
+        self.session_pool = SessionPool(rate_limits=self.rate_limits)
+        self.proof_cache = SingleFlightCache(ttl=10)
+        self.gas_profile = GasProfile()
+        self.journal = RunJournal("journal.db", "brokex")
+        self.signer = TransactionSigner()
+        self.token_registry = TokenRegistry()
+        self.token_reader = TokenReader(registry=self.token_registry)
+        self.balance_ledger = BalanceLedger(reader=self.token_reader)
+        self.sender = TransactionSender(self.web3_pool, self.signer, self.gas_profile, self.balance_ledger, self.log)
+        self.balance_tokens = [self.USDT_CONTRACT_ADDRESS]
+        self.allowance_ledger = AllowanceLedger(multicall=self.token_reader.multicall)
+        self.allowance_pairs = [
+            (self.USDT_CONTRACT_ADDRESS, self.POOL_ROUTER_ADDRESS),
+            (self.USDT_CONTRACT_ADDRESS, self.TRADE_ROUTER_ADDRESS)
+        ]
+        self.faucet_index = EligibilityIndex(multicall=self.token_reader.multicall)
+        self.scheduler = AccountScheduler()
+        self.workers = 1
         self.potition_option = 0
         self.potition_count = 0
         self.open_amount = 0
@@ -166,12 +199,18 @@ class Brokex:
         os.system('cls' if os.name == 'nt' else 'clear')
 
     def log(self, message):
+        state = current_account.get()
+        label = f"{Fore.MAGENTA + Style.BRIGHT}[ {state.label} ]{Style.RESET_ALL} " if state and self.workers > 1 else ""
         print(
             f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
-            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{message}",
+            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{label}{message}",
             flush=True
         )
 
+    @property
+    def state(self):
+        return current_account.get()
+
     def welcome(self):
         print(Fore.LIGHTGREEN_EX + Style.BRIGHT + "\n" + "═" * 60)
         print(Fore.GREEN + Style.BRIGHT + "    ⚡ Pharos Testnet Automation BOT  ⚡")
@@ -243,22 +282,18 @@ class Brokex:
         return proxy
     
     def build_proxy_config(self, proxy=None):
-        if not proxy:
-            return None, None, None
-
-        if proxy.startswith("socks"):
-            connector = ProxyConnector.from_url(proxy)
-            return connector, None, None
+        if not proxy or proxy.startswith("socks"):
+            return None, None
 
-        elif proxy.startswith("http"):
+        if proxy.startswith("http"):
             match = re.match(r"http://(.*?):(.*?)@(.*)", proxy)
             if match:
                 username, password, host_port = match.groups()
                 clean_url = f"http://{host_port}"
                 auth = BasicAuth(username, password)
-                return None, clean_url, auth
+                return clean_url, auth
             else:
-                return None, proxy, None
+                return proxy, None
 
         raise Exception("Unsupported Proxy Type.")
     
@@ -278,38 +313,17 @@ class Brokex:
         except Exception as e:
             return None
         
-    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60):
-        request_kwargs = {"timeout": timeout}
-
+    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60, pin=False):
         proxy = self.get_next_proxy_for_account(address) if use_proxy else None
-
-        if use_proxy and proxy:
-            request_kwargs["proxies"] = {"http": proxy, "https": proxy}
-
-        for attempt in range(retries):
-            try:
-                web3 = Web3(Web3.HTTPProvider(self.RPC_URL, request_kwargs=request_kwargs))
-                web3.eth.get_block_number()
-                return web3
-            except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(3)
-                    continue
-                raise Exception(f"Failed to Connect to RPC: {str(e)}")
+        return await self.web3_pool.get(proxy, timeout, retries, address if pin else None)
         
-    async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool):
+    async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool, required=None):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
-            if contract_address == self.PHRS_CONTRACT_ADDRESS:
-                balance = web3.eth.get_balance(address)
-                decimals = 18
-            else:
-                token_contract = web3.eth.contract(address=web3.to_checksum_address(contract_address), abi=self.ERC20_CONTRACT_ABI)
-                balance = token_contract.functions.balanceOf(address).call()
-                decimals = token_contract.functions.decimals().call()
+            token = (await self.balance_ledger.read(web3, address, [contract_address], required))[0]
 
-            token_balance = balance / (10 ** decimals)
+            token_balance = token["balance"] / (10 ** token["decimals"])
 
             return token_balance
         except Exception as e:
@@ -323,7 +337,7 @@ class Brokex:
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
             token_contract = web3.eth.contract(address=web3.to_checksum_address(self.POOL_ROUTER_ADDRESS), abi=self.BROKEX_CONTRACT_ABI)
-            balance = token_contract.functions.balanceOf(address).call()
+            balance = await token_contract.functions.balanceOf(address).call()
 
             lp_balance = balance / (10 ** 18)
 
@@ -335,13 +349,25 @@ class Brokex:
             )
             return None
         
-    async def get_user_open_ids(self, address: str, use_proxy: bool):
+    async def get_position_snapshot(self, address: str, use_proxy: bool):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
             token_contract = web3.eth.contract(address=web3.to_checksum_address(self.TRADE_ROUTER_ADDRESS), abi=self.BROKEX_CONTRACT_ABI)
-            open_ids = token_contract.functions.getUserOpenIds(address).call()
+            open_ids = await token_contract.functions.getUserOpenIds(address).call()
+
+            calls = [
+                (token_contract.address, web3.to_bytes(hexstr=token_contract.encode_abi("getOpenById", args=[open_id])))
+                for open_id in open_ids
+            ]
+            results = await self.token_reader.multicall.aggregate(web3, calls)
 
-            return open_ids
+            positions = {}
+            for open_id, (success, data) in zip(open_ids, results):
+                if not success:
+                    continue
+                positions[open_id] = Position(*web3.codec.decode([POSITION_TYPE], data)[0])
+
+            return positions
         except Exception as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message :{Style.RESET_ALL}"
@@ -349,71 +375,35 @@ class Brokex:
             )
             return None
         
-    async def get_open_data_by_id(self, address: str, open_id: int, use_proxy: bool):
-        try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
-            token_contract = web3.eth.contract(address=web3.to_checksum_address(self.TRADE_ROUTER_ADDRESS), abi=self.BROKEX_CONTRACT_ABI)
-            open_data = token_contract.functions.getOpenById(open_id).call()
-
-            return {
-                "trader": open_data[0],
-                "id": open_data[1],
-                "assetIndex": open_data[2],
-                "isLong": open_data[3],
-                "leverage": open_data[4],
-                "openPrice": open_data[5],
-                "sizeUsd": open_data[6],
-                "timestamp": open_data[7],
-                "stopLossPrice": open_data[8],
-                "takeProfitPrice": open_data[9],
-                "liquidationPrice": open_data[10]
-            }
-        except Exception as e:
-            self.log(
-                f"{Fore.CYAN+Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
-            )
-            return None
         
-    async def send_raw_transaction_with_retries(self, account, web3, tx, retries=5):
-        for attempt in range(retries):
-            try:
-                signed_tx = web3.eth.account.sign_transaction(tx, account)
-                raw_tx = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                tx_hash = web3.to_hex(raw_tx)
-                return tx_hash
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Send TX Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Hash Not Found After Maximum Retries")
+    async def scan_faucet_status(self, addresses: list, use_proxy: bool):
+        if not addresses:
+            return
+        try:
+            web3 = await self.get_web3_with_check(addresses[0], use_proxy)
 
-    async def wait_for_receipt_with_retries(self, web3, tx_hash, retries=5):
-        for attempt in range(retries):
-            try:
-                receipt = await asyncio.to_thread(web3.eth.wait_for_transaction_receipt, tx_hash, timeout=300)
-                return receipt
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Wait for Receipt Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Receipt Not Found After Maximum Retries")
+            contract_address = web3.to_checksum_address(self.FAUCET_ROUTER_ADDRESS)
+            token_contract = web3.eth.contract(address=contract_address, abi=self.ERC20_CONTRACT_ABI)
+
+            entries = [
+                (address, contract_address, web3.to_bytes(hexstr=token_contract.encode_abi("hasClaimed", args=[web3.to_checksum_address(address)])))
+                for address in addresses
+            ]
+            await self.faucet_index.scan(web3, entries, lambda has_claimed: float("inf") if has_claimed else 0)
+        except Exception as e:
+            self.log(f"{Fore.RED+Style.BRIGHT}Scan Faucet Status Failed: {str(e)}{Style.RESET_ALL}")
         
     async def check_faucet_status(self, address: str, use_proxy: bool):
+        is_eligible = self.faucet_index.is_eligible(address)
+        if is_eligible is not None:
+            return not is_eligible
+
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
             contract_address = web3.to_checksum_address(self.FAUCET_ROUTER_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.ERC20_CONTRACT_ABI)
-            claim_data = token_contract.functions.hasClaimed(web3.to_checksum_address(address)).call()
+            claim_data = await token_contract.functions.hasClaimed(web3.to_checksum_address(address)).call()
 
             return claim_data
         except Exception as e:
@@ -425,31 +415,28 @@ class Brokex:
         
     async def perform_claim_faucet(self, account: str, address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             contract_address = web3.to_checksum_address(self.FAUCET_ROUTER_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.ERC20_CONTRACT_ABI)
 
             claim_data = token_contract.functions.claim()
-            estimated_gas = claim_data.estimate_gas({"from": address})
+            estimated_gas = await claim_data.estimate_gas({"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            claim_tx = claim_data.build_transaction({
+            claim_tx = await claim_data.build_transaction({
                 "from": web3.to_checksum_address(address),
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, claim_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, claim_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -461,68 +448,73 @@ class Brokex:
         
     async def approving_token(self, account: str, address: str, router_address: str, asset_address: str, amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             
             spender = web3.to_checksum_address(router_address)
             token_contract = web3.eth.contract(address=web3.to_checksum_address(asset_address), abi=self.ERC20_CONTRACT_ABI)
-            decimals = token_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, asset_address)
             
             amount_to_wei = int(amount * (10 ** decimals))
 
-            allowance = token_contract.functions.allowance(address, spender).call()
+            allowance = self.allowance_ledger.get(address, asset_address, spender)
+            if allowance is None:
+                allowance = await token_contract.functions.allowance(address, spender).call()
+                self.allowance_ledger.record(address, asset_address, spender, allowance)
+
             if allowance < amount_to_wei:
                 approve_data = token_contract.functions.approve(spender, 2**256 - 1)
-                estimated_gas = approve_data.estimate_gas({"from": address})
+                estimated_gas = await self.gas_profile.estimate(approve_data, {"from": address})
 
-                max_priority_fee = web3.to_wei(1, "gwei")
-                max_fee = max_priority_fee
+                max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-                approve_tx = approve_data.build_transaction({
+                approve_tx = await approve_data.build_transaction({
                     "from": address,
                     "gas": int(estimated_gas * 1.2),
                     "maxFeePerGas": int(max_fee),
                     "maxPriorityFeePerGas": int(max_priority_fee),
-                    "nonce": self.used_nonce[address],
-                    "chainId": web3.eth.chain_id,
+                    "chainId": await self.web3_pool.chain.chain_id(web3),
                 })
 
-                tx_hash = await self.send_raw_transaction_with_retries(account, web3, approve_tx)
-                receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
-
-                block_number = receipt.blockNumber
-                self.used_nonce[address] += 1
-
-                explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
-                
-                self.log(
-                    f"{Fore.CYAN+Style.BRIGHT}   Approve :{Style.RESET_ALL}"
-                    f"{Fore.GREEN+Style.BRIGHT} Success {Style.RESET_ALL}"
-                )
-                self.log(
-                    f"{Fore.CYAN+Style.BRIGHT}   Block   :{Style.RESET_ALL}"
-                    f"{Fore.WHITE+Style.BRIGHT} {block_number} {Style.RESET_ALL}"
-                )
-                self.log(
-                    f"{Fore.CYAN+Style.BRIGHT}   Tx Hash :{Style.RESET_ALL}"
-                    f"{Fore.WHITE+Style.BRIGHT} {tx_hash} {Style.RESET_ALL}"
-                )
-                self.log(
-                    f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
-                    f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
-                )
+                tx_hash = await self.sender.send(account, web3, approve_tx, substep="approve")
+                await self.confirm_approval(web3, tx_hash, address, asset_address, spender)
                 await asyncio.sleep(5)
 
             return True
         except Exception as e:
             raise Exception(f"Approving Token Contract Failed: {str(e)}")
 
+    async def confirm_approval(self, web3, tx_hash: str, address: str, asset_address: str, spender: str):
+        receipt = await self.sender.wait(web3, tx_hash)
+        self.allowance_ledger.record(address, asset_address, spender, 2**256 - 1)
+
+        block_number = receipt.blockNumber
+
+        explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
+        
+        self.log(
+            f"{Fore.CYAN+Style.BRIGHT}   Approve :{Style.RESET_ALL}"
+            f"{Fore.GREEN+Style.BRIGHT} Success {Style.RESET_ALL}"
+        )
+        self.log(
+            f"{Fore.CYAN+Style.BRIGHT}   Block   :{Style.RESET_ALL}"
+            f"{Fore.WHITE+Style.BRIGHT} {block_number} {Style.RESET_ALL}"
+        )
+        self.log(
+            f"{Fore.CYAN+Style.BRIGHT}   Tx Hash :{Style.RESET_ALL}"
+            f"{Fore.WHITE+Style.BRIGHT} {tx_hash} {Style.RESET_ALL}"
+        )
+        self.log(
+            f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
+            f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
+        )
+        return receipt
+
     async def perform_open_potition(self, account: str, address: str, pair: int, is_long: bool, use_proxy: bool, lev=1, sl=0, tp=0):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             asset_address = web3.to_checksum_address(self.USDT_CONTRACT_ADDRESS)
-            asset_contract = web3.eth.contract(address=web3.to_checksum_address(asset_address), abi=self.ERC20_CONTRACT_ABI)
-            decimals = asset_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, asset_address)
             
             open_amount = int(self.open_amount * (10 ** decimals))
 
@@ -530,35 +522,36 @@ class Brokex:
 
             await self.approving_token(account, address, self.TRADE_ROUTER_ADDRESS, asset_address, self.open_amount, use_proxy)
 
-            proof = await self.get_proof(address, pair, use_proxy)
+            proof = await self.proof_cache.get(pair, lambda: self.get_proof(address, pair, use_proxy))
             if not proof:
                 raise Exception("Failed to Fetch Proof")
 
             token_contract = web3.eth.contract(address=web3.to_checksum_address(self.TRADE_ROUTER_ADDRESS), abi=self.BROKEX_CONTRACT_ABI)
 
             open_position_data = token_contract.functions.openPosition(pair, proof['proof'], is_long, lev, open_amount, sl, tp)
-            estimated_gas = open_position_data.estimate_gas({"from": address})
+            estimated_gas = await open_position_data.estimate_gas({"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            open_position_tx = open_position_data.build_transaction({
+            open_position_tx = await open_position_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, open_position_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, open_position_tx)
+
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
+            self.proof_cache.invalidate(pair)
+            if is_allowance_error(e):
+                self.allowance_ledger.forget(address)
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
@@ -567,37 +560,35 @@ class Brokex:
         
     async def perform_close_potition(self, account: str, address: str, open_id: int, pair: int, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
-            proof = await self.get_proof(address, pair, use_proxy)
+            proof = await self.proof_cache.get(pair, lambda: self.get_proof(address, pair, use_proxy))
             if not proof:
                 raise Exception("Failed to Fetch Proof")
 
             token_contract = web3.eth.contract(address=web3.to_checksum_address(self.TRADE_ROUTER_ADDRESS), abi=self.BROKEX_CONTRACT_ABI)
 
             close_position_data = token_contract.functions.closePosition(open_id, proof['proof'])
-            estimated_gas = close_position_data.estimate_gas({"from": address})
+            estimated_gas = await close_position_data.estimate_gas({"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            close_position_tx = close_position_data.build_transaction({
+            close_position_tx = await close_position_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, close_position_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, close_position_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
+            self.proof_cache.invalidate(pair)
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
@@ -606,11 +597,10 @@ class Brokex:
         
     async def perform_deposit_lp(self, account: str, address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             asset_address = web3.to_checksum_address(self.USDT_CONTRACT_ADDRESS)
-            asset_contract = web3.eth.contract(address=web3.to_checksum_address(asset_address), abi=self.ERC20_CONTRACT_ABI)
-            decimals = asset_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, asset_address)
             
             deposit_lp_amount = int(self.deposit_lp_amount * (10 ** decimals))
 
@@ -619,28 +609,27 @@ class Brokex:
             token_contract = web3.eth.contract(address=web3.to_checksum_address(self.POOL_ROUTER_ADDRESS), abi=self.BROKEX_CONTRACT_ABI)
 
             lp_data = token_contract.functions.depositLiquidity(deposit_lp_amount)
-            estimated_gas = lp_data.estimate_gas({"from": address})
+            estimated_gas = await self.gas_profile.estimate(lp_data, {"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            lp_tx = lp_data.build_transaction({
+            lp_tx = await lp_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, lp_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, lp_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
+            if is_allowance_error(e):
+                self.allowance_ledger.forget(address)
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
@@ -649,32 +638,29 @@ class Brokex:
         
     async def perform_withdraw_lp(self, account: str, address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             withdraw_lp_amount = int(self.withdraw_lp_amount * (10 ** 18))
 
             token_contract = web3.eth.contract(address=web3.to_checksum_address(self.POOL_ROUTER_ADDRESS), abi=self.BROKEX_CONTRACT_ABI)
 
             lp_data = token_contract.functions.withdrawLiquidity(withdraw_lp_amount)
-            estimated_gas = lp_data.estimate_gas({"from": address})
+            estimated_gas = await self.gas_profile.estimate(lp_data, {"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            lp_tx = lp_data.build_transaction({
+            lp_tx = await lp_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, lp_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, lp_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -685,7 +671,12 @@ class Brokex:
             return None, None
         
     async def print_timer(self):
-        for remaining in range(random.randint(self.min_delay, self.max_delay), 0, -1):
+        delay = random.randint(self.min_delay, self.max_delay)
+        if self.workers > 1:
+            await asyncio.sleep(delay)
+            return
+
+        for remaining in range(delay, 0, -1):
             print(
                 f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
                 f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}"
@@ -851,6 +842,18 @@ class Brokex:
             except ValueError:
                 print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
         
+    def print_worker_question(self):
+        while True:
+            try:
+                workers = int(input(f"{Fore.YELLOW + Style.BRIGHT}Concurrent Accounts -> {Style.RESET_ALL}").strip())
+                if workers > 0:
+                    self.workers = workers
+                    break
+                else:
+                    print(f"{Fore.RED + Style.BRIGHT}Concurrent Accounts must be > 0.{Style.RESET_ALL}")
+            except ValueError:
+                print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
+
     def print_question(self):
         while True:
             try:
@@ -935,12 +938,12 @@ class Brokex:
         return option, choose, rotate
     
     async def check_connection(self, proxy_url=None):
-        connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+        proxy, proxy_auth = self.build_proxy_config(proxy_url)
         try:
-            async with ClientSession(connector=connector, timeout=ClientTimeout(total=10)) as session:
-                async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth) as response:
-                    response.raise_for_status()
-                    return True
+            session = self.session_pool.get("https://api.ipify.org?format=json", proxy_url)
+            async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                return True
         except (Exception, ClientResponseError) as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -954,15 +957,16 @@ class Brokex:
         url = f"{self.BASE_API}/proof?pairs={pair}"
         for attempt in range(retries):
             proxy_url = self.get_next_proxy_for_account(address) if use_proxy else None
-            connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+            proxy, proxy_auth = self.build_proxy_config(proxy_url)
             try:
-                async with ClientSession(connector=connector, timeout=ClientTimeout(total=60)) as session:
-                    async with session.get(url=url, headers=self.HEADERS, proxy=proxy, proxy_auth=proxy_auth) as response:
-                        response.raise_for_status()
-                        return await response.json()
+                session = self.session_pool.get(url, proxy_url)
+                async with session.get(url=url, headers=self.HEADERS, proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=60)) as response:
+                    response.raise_for_status()
+                    return await response.json()
             except (Exception, ClientResponseError) as e:
-                if attempt < retries:
-                    await asyncio.sleep(5)
+                kind = classify_error(e)
+                if attempt < retries - 1 and self.retry_policy.should_retry(kind):
+                    await self.retry_policy.sleep(kind, attempt)
                     continue
                 return None
         
@@ -989,6 +993,7 @@ class Brokex:
         if not has_claimed:
             tx_hash, block_number = await self.perform_claim_faucet(account, address, use_proxy)
             if tx_hash and block_number:
+                self.faucet_index.mark(address, float("inf"))
                 explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
 
                 self.log(
@@ -1039,18 +1044,20 @@ class Brokex:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
             
-    async def process_perform_close_potition(self, account: str, address: str, used_ids, open_id: int, pair: int, use_proxy: bool):
-        tx_hash, block_number = await self.perform_close_potition(account, address, open_id, pair, use_proxy)
+    async def process_perform_close_potition(self, account: str, address: str, position: Position, use_proxy: bool):
+        tx_hash, block_number = await self.perform_close_potition(account, address, position.id, position.asset_index, use_proxy)
         if tx_hash and block_number:
             explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
 
-            used_ids.add(open_id)
+            self.state.positions.pop(position.id, None)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
@@ -1068,11 +1075,13 @@ class Brokex:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_perform_deposit_lp(self, account: str, address: str, use_proxy: bool):
         tx_hash, block_number = await self.perform_deposit_lp(account, address, use_proxy)
@@ -1095,11 +1104,13 @@ class Brokex:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_perform_withdraw_lp(self, account: str, address: str, use_proxy: bool):
         tx_hash, block_number = await self.perform_withdraw_lp(account, address, use_proxy)
@@ -1122,11 +1133,13 @@ class Brokex:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_option_1(self, account: str, address: str, use_proxy):
         self.log(
@@ -1151,13 +1164,16 @@ class Brokex:
                 f"{Fore.WHITE+Style.BRIGHT}{self.potition_count}{Style.RESET_ALL}                                   "
             )
 
+            if self.sender.skip(step=f"open:{i}"):
+                continue
+
             pairs = random.choice(self.pairs)
             is_long = random.choice([True, False])
             name = pairs["name"]
             pair = pairs["desimal"]
             action = "Long" if is_long == True else "Short"
 
-            balance = await self.get_token_balance(address, self.USDT_CONTRACT_ADDRESS, use_proxy)
+            balance = await self.get_token_balance(address, self.USDT_CONTRACT_ADDRESS, use_proxy, self.open_amount)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Balance :{Style.RESET_ALL}"
@@ -1179,8 +1195,11 @@ class Brokex:
                 )
                 return
             
-            await self.process_perform_open_potition(account, address, pair, is_long, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path=("open", pair, is_long)):
+                continue
+
+            if self.state.record(("open", pair, is_long), await self.process_perform_open_potition(account, address, pair, is_long, use_proxy)):
+                await self.print_timer()
 
     async def process_option_3(self, account: str, address: str, use_proxy: bool):
         self.log(
@@ -1188,23 +1207,21 @@ class Brokex:
             f"{Fore.GREEN+Style.BRIGHT}Potition{Style.RESET_ALL}"
         )
 
-        open_ids = await self.get_user_open_ids(address, use_proxy)
-        if not open_ids:
+        positions = await self.get_position_snapshot(address, use_proxy)
+        if not positions:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} No Open Ids Found {Style.RESET_ALL}"
             )
             return
 
-        self.open_ids[address] = open_ids
+        self.state.positions = positions
 
         self.log(
             f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
-            f"{Fore.GREEN+Style.BRIGHT} Fetch {len(open_ids)} Open Ids Success {Style.RESET_ALL}"
+            f"{Fore.GREEN+Style.BRIGHT} Fetch {len(positions)} Open Ids Success {Style.RESET_ALL}"
         )
 
-        used_ids = set()
-
         for i in range(self.potition_count):
             self.log(
                 f"{Fore.GREEN+Style.BRIGHT} ●{Style.RESET_ALL}"
@@ -1214,23 +1231,20 @@ class Brokex:
                 f"{Fore.WHITE+Style.BRIGHT}{self.potition_count}{Style.RESET_ALL}                                   "
             )
 
-            available_ids = [oid for oid in self.open_ids[address] if oid not in used_ids]
-            if not available_ids:
+            if self.sender.skip(step=f"close:{i}"):
+                continue
+
+            positions = [position for position in self.state.positions.values() if ("close", position.id) not in self.state.reverted]
+            if not positions:
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}   Message :{Style.RESET_ALL}"
                     f"{Fore.YELLOW+Style.BRIGHT} No more unique Open Ids available. Stopping early. {Style.RESET_ALL}"
                 )
                 break
 
-            open_id = random.choice(available_ids)
-
-            open_data = await self.get_open_data_by_id(address, open_id, use_proxy)
-            if not open_data:
-                continue
+            position = random.choice(positions)
             
-            pair = open_data["assetIndex"]
-            is_long = open_data["isLong"]
-            size = open_data["sizeUsd"]
+            pair = position.asset_index
 
             name = (
                 "BTC_USDT" if pair == 0 else "ETH_USDT" if pair == 1 else 
@@ -1240,12 +1254,12 @@ class Brokex:
                 "SUI_USDT" if pair == 90 else "LINK_USDT" if pair == 2 else 
                 "NaN_USDT"
             )
-            formatted_size = size / 10**6
-            action = "Long" if is_long == True else "Short"
+            formatted_size = position.size_usd / 10**6
+            action = "Long" if position.is_long else "Short"
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Open Id :{Style.RESET_ALL}"
-                f"{Fore.WHITE+Style.BRIGHT} {open_id} {Style.RESET_ALL}"
+                f"{Fore.WHITE+Style.BRIGHT} {position.id} {Style.RESET_ALL}"
             )
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Size    :{Style.RESET_ALL}"
@@ -1256,8 +1270,8 @@ class Brokex:
                 f"{Fore.BLUE+Style.BRIGHT} {action} - {name} {Style.RESET_ALL}"
             )
             
-            await self.process_perform_close_potition(account, address, used_ids, open_id, pair, use_proxy)
-            await self.print_timer()
+            if self.state.record(("close", position.id), await self.process_perform_close_potition(account, address, position, use_proxy)):
+                await self.print_timer()
 
     async def process_option_4(self, account: str, address: str, use_proxy: bool):
         self.log(
@@ -1274,7 +1288,10 @@ class Brokex:
                 f"{Fore.WHITE+Style.BRIGHT}{self.deposit_lp_count}{Style.RESET_ALL}                                   "
             )
 
-            balance = await self.get_token_balance(address, self.USDT_CONTRACT_ADDRESS, use_proxy)
+            if self.sender.skip(step=f"deposit_lp:{i}"):
+                continue
+
+            balance = await self.get_token_balance(address, self.USDT_CONTRACT_ADDRESS, use_proxy, self.deposit_lp_amount)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Balance :{Style.RESET_ALL}"
@@ -1292,8 +1309,11 @@ class Brokex:
                 )
                 return
             
-            await self.process_perform_deposit_lp(account, address, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path="deposit_lp"):
+                continue
+
+            if self.state.record("deposit_lp", await self.process_perform_deposit_lp(account, address, use_proxy)):
+                await self.print_timer()
 
     async def process_option_5(self, account: str, address: str, use_proxy: bool):
         self.log(
@@ -1310,6 +1330,9 @@ class Brokex:
                 f"{Fore.WHITE+Style.BRIGHT}{self.withdraw_lp_count}{Style.RESET_ALL}                                   "
             )
 
+            if self.sender.skip(step=f"withdraw_lp:{i}"):
+                continue
+
             balance = await self.get_lp_balance(address, use_proxy)
 
             self.log(
@@ -1328,15 +1351,18 @@ class Brokex:
                 )
                 return
             
-            await self.process_perform_withdraw_lp(account, address, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path="withdraw_lp"):
+                continue
+
+            if self.state.record("withdraw_lp", await self.process_perform_withdraw_lp(account, address, use_proxy)):
+                await self.print_timer()
 
     async def process_accounts(self, account: str, address: str, option: int, use_proxy: bool, rotate_proxy: bool):
         is_valid = await self.process_check_connection(address, use_proxy, rotate_proxy)
         if is_valid:
             
             try:
-                web3 = await self.get_web3_with_check(address, use_proxy)
+                web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             except Exception as e:
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -1344,9 +1370,11 @@ class Brokex:
                     f"{Fore.MAGENTA+Style.BRIGHT}-{Style.RESET_ALL}"
                     f"{Fore.YELLOW+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
                 )
-                return
+                return False
             
-            self.used_nonce[address] = web3.eth.get_transaction_count(address, "pending")
+            await self.state.nonces.sync(web3)
+            await self.allowance_ledger.scan(web3, address, self.allowance_pairs)
+            await self.balance_ledger.seed(web3, address, self.balance_tokens)
             
             if option == 1:
                 self.log(
@@ -1410,18 +1438,63 @@ class Brokex:
                 elif self.lp_option == 2:
                     await self.process_option_5(account, address, use_proxy)
 
+            return True
+
+        return False
+
+    async def process_account_task(self, account: str, option: int, use_proxy: bool, rotate_proxy: bool):
+        address = self.generate_address(account)
+        current_account.set(AccountState(account, address, self.mask_account(address), positions={}))
+
+        separator = "=" * 25
+        self.log(
+            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
+            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
+            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
+        )
+
+        if not address:
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.open_run(self.journal, option)
+
+        try:
+            success = await self.process_accounts(account, address, option, use_proxy, rotate_proxy)
+        except Exception as e:
+            self.state.close_run("failed")
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.close_run("finished" if success else "failed")
+        await asyncio.sleep(3)
+        return success
+
     async def main(self):
         try:
             with open('accounts.txt', 'r') as file:
                 accounts = [line.strip() for line in file if line.strip()]
             
             option, use_proxy_choice, rotate_proxy = self.print_question()
+            self.print_worker_question()
+            self.signer.offload = self.workers > 1
 
-            while True:
-                use_proxy = False
-                if use_proxy_choice in [1, 2]:
-                    use_proxy = True
+            use_proxy = False
+            if use_proxy_choice in [1, 2]:
+                use_proxy = True
 
+            for account in accounts:
+                self.scheduler.schedule(account, 0)
+
+            await self.journal.reconcile(await self.web3_pool.get())
+
+            while True:
                 self.clear_terminal()
                 self.welcome()
                 self.log(
@@ -1431,30 +1504,31 @@ class Brokex:
 
                 if use_proxy:
                     await self.load_proxies(use_proxy_choice)
+
+                due_accounts = self.scheduler.pop_due()
+                addresses = [address for address in map(self.generate_address, due_accounts) if address]
+                await self.scan_faucet_status([address for address in addresses if self.faucet_index.get(address) is None], use_proxy)
                 
-                separator = "=" * 25
-                for account in accounts:
-                    if account:
-                        address = self.generate_address(account)
-
-                        self.log(
-                            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
-                            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
-                            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
-                        )
-
-                        if not address:
-                            self.log(
-                                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
-                                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
-                            )
-                            continue
-
-                        await self.process_accounts(account, address, option, use_proxy, rotate_proxy)
-                        await asyncio.sleep(3)
+                runner = AccountRunner(self.workers)
+                report = await runner.run(due_accounts, lambda account: self.process_account_task(account, option, use_proxy, rotate_proxy))
 
                 self.log(f"{Fore.CYAN + Style.BRIGHT}={Style.RESET_ALL}"*72)
-                seconds = 24 * 60 * 60
+                self.log(
+                    f"{Fore.GREEN + Style.BRIGHT}Throughput     : {Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT}{report['processed']} Accounts in {self.format_seconds(report['elapsed'])} {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} {report['per_minute']:.2f} Accounts/Min {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} x{report['parallelism']:.1f} Parallel {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.RED + Style.BRIGHT} {report['failed']} Failed {Style.RESET_ALL}"
+                )
+
+                # hasClaimed is a one-time flag with no on-chain cooldown, so accounts fall back to the daily interval
+                for account in due_accounts:
+                    self.scheduler.schedule(account)
+
+                seconds = self.scheduler.seconds_until_due()
                 while seconds > 0:
                     formatted_time = self.format_seconds(seconds)
                     print(
@@ -1465,8 +1539,8 @@ class Brokex:
                         f"{Fore.BLUE+Style.BRIGHT}All Accounts Have Been Processed.{Style.RESET_ALL}",
                         end="\r"
                     )
-                    await asyncio.sleep(1)
-                    seconds -= 1
+                    await asyncio.sleep(min(1, seconds))
+                    seconds = self.scheduler.seconds_until_due()
 
         except FileNotFoundError:
             self.log(f"{Fore.RED}File 'accounts.txt' Not Found.{Style.RESET_ALL}")
@@ -1474,6 +1548,10 @@ class Brokex:
         except Exception as e:
             self.log(f"{Fore.RED+Style.BRIGHT}Error: {e}{Style.RESET_ALL}")
             raise e
+        finally:
+            await self.web3_pool.close()
+            await self.session_pool.close()
+            self.signer.close()
 
 if __name__ == "__main__":
     try:
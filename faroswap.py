@@ -1,12 +1,10 @@
-from web3 import Web3
-from web3.exceptions import TransactionNotFound
 from eth_account import Account
 from aiohttp import ClientResponseError, ClientSession, ClientTimeout, BasicAuth
-from aiohttp_socks import ProxyConnector
 from fake_useragent import FakeUserAgent
 from datetime import datetime
 from colorama import *
 import asyncio, random, time, json, re, os, pytz
+from pharos import Web3Pool, SessionPool, GasProfile, TransactionSigner, TokenRegistry, TokenReader, BalanceLedger, AllowanceLedger, RunJournal, AccountRunner, AccountState, TransactionSender, RetryPolicy, RateLimits, current_account, classify_error, is_allowance_error
 
 wib = pytz.timezone('Asia/Jakarta')
 
@@ -54,8 +52,31 @@ class Faroswap:
         self.proxies = []
         self.proxy_index = 0
         self.account_proxies = {}
+        self.retry_policy = RetryPolicy()
+        self.rate_limits = RateLimits.from_config("limits.json")
+        self.web3_pool = Web3Pool.from_config("rpc.json", self.RPC_URL, retry_policy=self.retry_policy, rate_limits=self.rate_limits)
+        self.session_pool = SessionPool(rate_limits=self.rate_limits)
+        self.gas_profile = GasProfile()
+        self.journal = RunJournal("journal.db", "faroswap")
+        self.signer = TransactionSigner()
+        self.token_registry = TokenRegistry()
+        self.token_reader = TokenReader(registry=self.token_registry)
+        self.balance_ledger = BalanceLedger(reader=self.token_reader)
+        self.sender = TransactionSender(self.web3_pool, self.signer, self.gas_profile, self.balance_ledger, self.log, "   Message  :", "   Status   :")
+        self.balance_tokens = [
+            self.PHRS_CONTRACT_ADDRESS,
+            self.WPHRS_CONTRACT_ADDRESS,
+            self.USDC_CONTRACT_ADDRESS,
+            self.USDT_CONTRACT_ADDRESS
+        ]
+        self.allowance_ledger = AllowanceLedger(multicall=self.token_reader.multicall)
+        self.allowance_pairs = [
+            (self.WPHRS_CONTRACT_ADDRESS, self.DODO_APPROVE_ADDRESS),
+            (self.USDC_CONTRACT_ADDRESS, self.DODO_APPROVE_ADDRESS),
+            (self.USDT_CONTRACT_ADDRESS, self.DODO_APPROVE_ADDRESS)
+        ]
+        self.workers = 1
         self.pool_addresses = []
-        self.used_nonce = {}
         self.wrap_option = 0
         self.wrap_amount = 0
         self.swap_count = 0
@@ -72,12 +93,18 @@ class Faroswap:
         os.system('cls' if os.name == 'nt' else 'clear')
 
     def log(self, message):
+        state = current_account.get()
+        label = f"{Fore.MAGENTA + Style.BRIGHT}[ {state.label} ]{Style.RESET_ALL} " if state and self.workers > 1 else ""
         print(
             f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
-            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{message}",
+            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{label}{message}",
             flush=True
         )
 
+    @property
+    def state(self):
+        return current_account.get()
+
     def welcome(self):
         print(Fore.LIGHTGREEN_EX + Style.BRIGHT + "\n" + "═" * 60)
         print(Fore.GREEN + Style.BRIGHT + "    ⚡ Pharos Automation BOT ⚡")
@@ -155,22 +182,18 @@ class Faroswap:
         return proxy
     
     def build_proxy_config(self, proxy=None):
-        if not proxy:
-            return None, None, None
-
-        if proxy.startswith("socks"):
-            connector = ProxyConnector.from_url(proxy)
-            return connector, None, None
+        if not proxy or proxy.startswith("socks"):
+            return None, None
 
-        elif proxy.startswith("http"):
+        if proxy.startswith("http"):
             match = re.match(r"http://(.*?):(.*?)@(.*)", proxy)
             if match:
                 username, password, host_port = match.groups()
                 clean_url = f"http://{host_port}"
                 auth = BasicAuth(username, password)
-                return None, clean_url, auth
+                return clean_url, auth
             else:
-                return None, proxy, None
+                return proxy, None
 
         raise Exception("Unsupported Proxy Type.")
     
@@ -241,111 +264,65 @@ class Faroswap:
 
         return pair_address, base_ticker, quote_ticker, base_address, quote_address
 
-    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60):
-        request_kwargs = {"timeout": timeout}
-
+    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60, pin=False):
         proxy = self.get_next_proxy_for_account(address) if use_proxy else None
-
-        if use_proxy and proxy:
-            request_kwargs["proxies"] = {"http": proxy, "https": proxy}
-
-        for attempt in range(retries):
-            try:
-                web3 = Web3(Web3.HTTPProvider(self.RPC_URL, request_kwargs=request_kwargs))
-                web3.eth.get_block_number()
-                return web3
-            except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(3)
-                    continue
-                raise Exception(f"Failed to Connect to RPC: {str(e)}")
+        return await self.web3_pool.get(proxy, timeout, retries, address if pin else None)
             
-    async def send_raw_transaction_with_retries(self, account, web3, tx, retries=5):
-        for attempt in range(retries):
-            try:
-                signed_tx = web3.eth.account.sign_transaction(tx, account)
-                raw_tx = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                tx_hash = web3.to_hex(raw_tx)
-                return tx_hash
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message  :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Send TX Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Hash Not Found After Maximum Retries")
-
-    async def wait_for_receipt_with_retries(self, web3, tx_hash, retries=5):
-        for attempt in range(retries):
-            try:
-                receipt = await asyncio.to_thread(web3.eth.wait_for_transaction_receipt, tx_hash, timeout=300)
-                return receipt
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message  :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Wait for Receipt Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Receipt Not Found After Maximum Retries")
         
-    async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool, retries=5):
+    async def get_token_snapshot(self, address: str, queries: list, use_proxy: bool, required=None, retries=5):
         for attempt in range(retries):
             try:
                 web3 = await self.get_web3_with_check(address, use_proxy)
 
-                if contract_address == self.PHRS_CONTRACT_ADDRESS:
-                    balance = web3.eth.get_balance(address)
-                    decimals = 18
-                else:
-                    token_contract = web3.eth.contract(address=web3.to_checksum_address(contract_address), abi=self.ERC20_CONTRACT_ABI)
-                    balance = token_contract.functions.balanceOf(address).call()
-                    decimals = token_contract.functions.decimals().call()
-
-                token_balance = balance / (10 ** decimals)
+                snapshot = await self.balance_ledger.read(web3, address, [token for token, _ in queries], required)
+                for token, (_, spender) in zip(snapshot, queries):
+                    token["amount"] = token["balance"] / (10 ** token["decimals"])
+                    token["allowance"] = self.allowance_ledger.get(address, token["token"], spender) if spender else None
 
-                return token_balance
+                return snapshot
             except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(3)
+                kind = classify_error(e)
+                if attempt < retries - 1 and self.retry_policy.should_retry(kind):
+                    await self.retry_policy.sleep(kind, attempt)
                     continue
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
                     f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
                 )
                 return None
+
+    async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool, required=None):
+        snapshot = await self.get_token_snapshot(address, [(contract_address, None)], use_proxy, required)
+        if not snapshot:
+            return None
+
+        return snapshot[0]["amount"]
         
     async def perform_wrapped(self, account: str, address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             contract_address = web3.to_checksum_address(self.WPHRS_CONTRACT_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.ERC20_CONTRACT_ABI)
 
             amount_to_wei = web3.to_wei(self.wrap_amount, "ether")
             wrap_data = token_contract.functions.deposit()
-            estimated_gas = wrap_data.estimate_gas({"from":address, "value":amount_to_wei})
+            estimated_gas = await self.gas_profile.estimate(wrap_data, {"from":address, "value":amount_to_wei})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            wrap_tx = wrap_data.build_transaction({
+            wrap_tx = await wrap_data.build_transaction({
                 "from": address,
                 "value": amount_to_wei,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, wrap_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, wrap_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -357,31 +334,28 @@ class Faroswap:
         
     async def perform_unwrapped(self, account: str, address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             contract_address = web3.to_checksum_address(self.WPHRS_CONTRACT_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.ERC20_CONTRACT_ABI)
 
             amount_to_wei = web3.to_wei(self.wrap_amount, "ether")
             unwrap_data = token_contract.functions.withdraw(amount_to_wei)
-            estimated_gas = unwrap_data.estimate_gas({"from":address})
+            estimated_gas = await self.gas_profile.estimate(unwrap_data, {"from":address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            unwrap_tx = unwrap_data.build_transaction({
+            unwrap_tx = await unwrap_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, unwrap_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, unwrap_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -391,79 +365,86 @@ class Faroswap:
             )
             return None, None
         
-    async def approving_token(self, account: str, address: str, router_address: str, asset_address: str, amount_to_wei: int, use_proxy: bool):
+    async def approving_token(self, account: str, address: str, router_address: str, asset_address: str, amount_to_wei: int, use_proxy: bool, allowance=None):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             
             spender = web3.to_checksum_address(router_address)
             token_contract = web3.eth.contract(address=web3.to_checksum_address(asset_address), abi=self.ERC20_CONTRACT_ABI)
 
-            allowance = token_contract.functions.allowance(address, spender).call()
+            if allowance is None:
+                allowance = self.allowance_ledger.get(address, asset_address, spender)
+            if allowance is None:
+                allowance = await token_contract.functions.allowance(address, spender).call()
+            self.allowance_ledger.record(address, asset_address, spender, allowance)
+
             if allowance < amount_to_wei:
                 approve_data = token_contract.functions.approve(spender, 2**256 - 1)
-                estimated_gas = approve_data.estimate_gas({"from": address})
+                estimated_gas = await self.gas_profile.estimate(approve_data, {"from": address})
 
-                max_priority_fee = web3.to_wei(1, "gwei")
-                max_fee = max_priority_fee
+                max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-                approve_tx = approve_data.build_transaction({
+                approve_tx = await approve_data.build_transaction({
                     "from": address,
                     "gas": int(estimated_gas * 1.2),
                     "maxFeePerGas": int(max_fee),
                     "maxPriorityFeePerGas": int(max_priority_fee),
-                    "nonce": self.used_nonce[address],
-                    "chainId": web3.eth.chain_id,
+                    "chainId": await self.web3_pool.chain.chain_id(web3),
                 })
 
-                tx_hash = await self.send_raw_transaction_with_retries(account, web3, approve_tx)
-                receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
-                block_number = receipt.blockNumber
-                self.used_nonce[address] += 1
-
-                explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
-                
-                self.log(
-                    f"{Fore.CYAN+Style.BRIGHT}   Approve  :{Style.RESET_ALL}"
-                    f"{Fore.GREEN+Style.BRIGHT} Success {Style.RESET_ALL}"
-                )
-                self.log(
-                    f"{Fore.CYAN+Style.BRIGHT}   Block    :{Style.RESET_ALL}"
-                    f"{Fore.WHITE+Style.BRIGHT} {block_number} {Style.RESET_ALL}"
-                )
-                self.log(
-                    f"{Fore.CYAN+Style.BRIGHT}   Tx Hash  :{Style.RESET_ALL}"
-                    f"{Fore.WHITE+Style.BRIGHT} {tx_hash} {Style.RESET_ALL}"
-                )
-                self.log(
-                    f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
-                    f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
-                )
+                tx_hash = await self.sender.send(account, web3, approve_tx, substep="approve")
+                await self.confirm_approval(web3, tx_hash, address, asset_address, spender)
                 await self.print_timer()
 
             return True
         except Exception as e:
             raise Exception(f"Approving Token Contract Failed: {str(e)}")
+
+    async def confirm_approval(self, web3, tx_hash: str, address: str, asset_address: str, spender: str):
+        receipt = await self.sender.wait(web3, tx_hash)
+        self.allowance_ledger.record(address, asset_address, spender, 2**256 - 1)
+        block_number = receipt.blockNumber
+
+        explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
         
-    async def perform_swap(self, account: str, address: str, from_token: str, to_token: str, amount_in: float, use_proxy: bool):
+        self.log(
+            f"{Fore.CYAN+Style.BRIGHT}   Approve  :{Style.RESET_ALL}"
+            f"{Fore.GREEN+Style.BRIGHT} Success {Style.RESET_ALL}"
+        )
+        self.log(
+            f"{Fore.CYAN+Style.BRIGHT}   Block    :{Style.RESET_ALL}"
+            f"{Fore.WHITE+Style.BRIGHT} {block_number} {Style.RESET_ALL}"
+        )
+        self.log(
+            f"{Fore.CYAN+Style.BRIGHT}   Tx Hash  :{Style.RESET_ALL}"
+            f"{Fore.WHITE+Style.BRIGHT} {tx_hash} {Style.RESET_ALL}"
+        )
+        self.log(
+            f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
+            f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
+        )
+        return receipt
+        
+    async def perform_swap(self, account: str, address: str, from_token: str, to_token: str, amount_in: float, use_proxy: bool, allowance=None):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
-            decimals = 6 if from_token in ["USDC", "USDT"] else 18
+            decimals = await self.token_registry.decimals(web3, from_token)
 
             amount_in_wei = int(amount_in * 10**decimals)
 
             if from_token != self.PHRS_CONTRACT_ADDRESS:
-                await self.approving_token(account, address, self.DODO_APPROVE_ADDRESS, from_token, amount_in_wei, use_proxy)
+                await self.approving_token(account, address, self.DODO_APPROVE_ADDRESS, from_token, amount_in_wei, use_proxy, allowance=allowance)
 
             route = await self.get_dodo_route(address, from_token, to_token, amount_in_wei, use_proxy)
-            if not route: return None, None
+            if not route:
+                return None, None
 
             value = route["data"]["value"]
             calldata = route["data"]["data"]
             gas_limit = route["data"]["gasLimit"]
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
             
             swap_tx = {
                 "from": address,
@@ -473,30 +454,32 @@ class Faroswap:
                 "gas": int(gas_limit),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id
+                "chainId": await self.web3_pool.chain.chain_id(web3)
             }
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, swap_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, swap_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
+            if is_allowance_error(e):
+                self.allowance_ledger.forget(address)
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
             )
             return None, None
         
-    async def perform_liquidity(self, account: str, address: str, pair_address: str, amount: float, use_proxy: bool):
+    async def perform_liquidity(self, account: str, address: str, pair_address: str, base_address: str, amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             dvm_address = web3.to_checksum_address(pair_address)
 
-            in_amount = int(amount * 10**6)
+            decimals = await self.token_registry.decimals(web3, base_address)
+
+            in_amount = int(amount * 10**decimals)
 
             min_amount = int(in_amount * (10000 - 10)) // 10000
 
@@ -508,24 +491,21 @@ class Faroswap:
                 dvm_address, in_amount, in_amount, min_amount, min_amount, 0, deadline
             )
 
-            estimated_gas = liquidity_data.estimate_gas({"from": address})
+            estimated_gas = await self.gas_profile.estimate(liquidity_data, {"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            liquidity_tx = liquidity_data.build_transaction({
+            liquidity_tx = await liquidity_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, liquidity_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, liquidity_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -691,7 +671,12 @@ class Faroswap:
                 print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
          
     async def print_timer(self):
-        for remaining in range(random.randint(self.min_delay, self.max_delay), 0, -1):
+        delay = random.randint(self.min_delay, self.max_delay)
+        if self.workers > 1:
+            await asyncio.sleep(delay)
+            return
+
+        for remaining in range(delay, 0, -1):
             print(
                 f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
                 f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}"
@@ -703,6 +688,18 @@ class Faroswap:
             )
             await asyncio.sleep(1)
 
+    def print_worker_question(self):
+        while True:
+            try:
+                workers = int(input(f"{Fore.YELLOW + Style.BRIGHT}Concurrent Accounts -> {Style.RESET_ALL}").strip())
+                if workers > 0:
+                    self.workers = workers
+                    break
+                else:
+                    print(f"{Fore.RED + Style.BRIGHT}Concurrent Accounts must be > 0.{Style.RESET_ALL}")
+            except ValueError:
+                print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
+
     def print_question(self):
         while True:
             try:
@@ -783,12 +780,12 @@ class Faroswap:
         return option, proxy_choice, rotate_proxy
     
     async def check_connection(self, proxy_url=None):
-        connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+        proxy, proxy_auth = self.build_proxy_config(proxy_url)
         try:
-            async with ClientSession(connector=connector, timeout=ClientTimeout(total=10)) as session:
-                async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth) as response:
-                    response.raise_for_status()
-                    return True
+            session = self.session_pool.get("https://api.ipify.org?format=json", proxy_url)
+            async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                return True
         except (Exception, ClientResponseError) as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}Status    :{Style.RESET_ALL}"
@@ -815,17 +812,17 @@ class Faroswap:
         url = f"{self.BASE_API}?chainId=688688&deadLine={deadline}&apikey=a37546505892e1a952&slippage=1&source=dodoV2AndMixWasm&toTokenAddress={to_token}&fromTokenAddress={from_token}&userAddr={address}&estimateGas=true&fromAmount={amount_in}"
         
         proxy_url = self.get_next_proxy_for_account(address) if use_proxy else None
-        connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+        proxy, proxy_auth = self.build_proxy_config(proxy_url)
         try:
-            async with ClientSession(connector=connector, timeout=ClientTimeout(total=60)) as session:
-                async with session.get(url=url, headers=headers, proxy=proxy, proxy_auth=proxy_auth) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    if result.get("status") != 200:
-                        err_msg = result.get("data", "Quote Not Available")
-                        raise ValueError(err_msg)
-
-                    return result
+            session = self.session_pool.get(url, proxy_url)
+            async with session.get(url=url, headers=headers, proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=60)) as response:
+                response.raise_for_status()
+                result = await response.json()
+                if result.get("status") != 200:
+                    err_msg = result.get("data", "Quote Not Available")
+                    raise ValueError(err_msg)
+
+                return result
         except (Exception, ClientResponseError) as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
@@ -904,8 +901,8 @@ class Faroswap:
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
 
-    async def process_perform_swap(self, account: str, address: str, from_token: str, to_token: str, amount_in: float, use_proxy: bool):
-        tx_hash, block_number = await self.perform_swap(account, address, from_token, to_token, amount_in, use_proxy)
+    async def process_perform_swap(self, account: str, address: str, from_token: str, to_token: str, amount_in: float, use_proxy: bool, allowance=None):
+        tx_hash, block_number = await self.perform_swap(account, address, from_token, to_token, amount_in, use_proxy, allowance)
         if tx_hash and block_number:
             explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
             self.log(
@@ -924,14 +921,16 @@ class Faroswap:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status   :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
-    async def process_perform_liquidity(self, account: str, address: str, pair_address: str, amount: float, use_proxy: bool):
-        tx_hash, block_number = await self.perform_liquidity(account, address, pair_address, amount, use_proxy)
+    async def process_perform_liquidity(self, account: str, address: str, pair_address: str, base_address: str, amount: float, use_proxy: bool):
+        tx_hash, block_number = await self.perform_liquidity(account, address, pair_address, base_address, amount, use_proxy)
         if tx_hash and block_number:
             explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
             self.log(
@@ -950,16 +949,18 @@ class Faroswap:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status   :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_option_1(self, account: str, address: str, use_proxy):
         self.log(f"{Fore.CYAN+Style.BRIGHT}Wrapped   :{Style.RESET_ALL}                      ")
 
-        balance = await self.get_token_balance(address, self.PHRS_CONTRACT_ADDRESS, use_proxy)
+        balance = await self.get_token_balance(address, self.PHRS_CONTRACT_ADDRESS, use_proxy, self.wrap_amount)
         self.log(
             f"{Fore.CYAN+Style.BRIGHT}   Balance :{Style.RESET_ALL}"
             f"{Fore.WHITE+Style.BRIGHT} {balance} PHRS {Style.RESET_ALL}"
@@ -981,7 +982,7 @@ class Faroswap:
     async def process_option_2(self, account: str, address: str, use_proxy):
         self.log(f"{Fore.CYAN+Style.BRIGHT}Unwrapped :{Style.RESET_ALL}                      ")
 
-        balance = await self.get_token_balance(address, self.WPHRS_CONTRACT_ADDRESS, use_proxy)
+        balance = await self.get_token_balance(address, self.WPHRS_CONTRACT_ADDRESS, use_proxy, self.wrap_amount)
         self.log(
             f"{Fore.CYAN+Style.BRIGHT}   Balance  :{Style.RESET_ALL}"
             f"{Fore.WHITE+Style.BRIGHT} {balance} WPHRS {Style.RESET_ALL}"
@@ -1009,6 +1010,9 @@ class Faroswap:
                 f"{Fore.WHITE+Style.BRIGHT} {i+1} / {self.swap_count} {Style.RESET_ALL}                           "
             )
 
+            if self.sender.skip(step=f"swap:{i}"):
+                continue
+
             from_ticker, to_ticker, from_token, to_token, amount_in = self.generate_swap_option()
 
             self.log(
@@ -1016,7 +1020,10 @@ class Faroswap:
                 f"{Fore.BLUE+Style.BRIGHT} {from_ticker} to {to_ticker} {Style.RESET_ALL}"
             )
 
-            balance = await self.get_token_balance(address, from_token, use_proxy)
+            spender = self.DODO_APPROVE_ADDRESS if from_token != self.PHRS_CONTRACT_ADDRESS else None
+            snapshot = await self.get_token_snapshot(address, [(from_token, spender)], use_proxy, amount_in)
+            balance = snapshot[0]["amount"] if snapshot else None
+            allowance = snapshot[0]["allowance"] if snapshot else None
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Balance  :{Style.RESET_ALL}"
@@ -1034,8 +1041,11 @@ class Faroswap:
                 )
                 continue
             
-            await self.process_perform_swap(account, address, from_token, to_token, amount_in, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path=(from_token, to_token)):
+                continue
+
+            if self.state.record((from_token, to_token), await self.process_perform_swap(account, address, from_token, to_token, amount_in, use_proxy, allowance)):
+                await self.print_timer()
 
     async def process_option_4(self, account: str, address: str, use_proxy):
         self.log(f"{Fore.CYAN+Style.BRIGHT}Liquidity :{Style.RESET_ALL}                      ")
@@ -1046,6 +1056,9 @@ class Faroswap:
                 f"{Fore.WHITE+Style.BRIGHT} {i+1} / {self.liquidity_count} {Style.RESET_ALL}                           "
             )
 
+            if self.sender.skip(step=f"liquidity:{i}"):
+                continue
+
             pair_address, base_ticker, quote_ticker, base_address, quote_address = self.generate_liquidity_option()
 
             self.log(
@@ -1053,8 +1066,8 @@ class Faroswap:
                 f"{Fore.BLUE+Style.BRIGHT} {base_ticker}/{quote_ticker} {Style.RESET_ALL}"
             )
 
-            balance0 = await self.get_token_balance(address, base_address, use_proxy)
-            balance1 = await self.get_token_balance(address, quote_address, use_proxy)
+            snapshot = await self.get_token_snapshot(address, [(base_address, None), (quote_address, None)], use_proxy, self.liquidity_amount)
+            balance0, balance1 = (snapshot[0]["amount"], snapshot[1]["amount"]) if snapshot else (None, None)
 
             self.log(f"{Fore.CYAN+Style.BRIGHT}   Balance  :{Style.RESET_ALL}")
             self.log(
@@ -1089,14 +1102,17 @@ class Faroswap:
                 )
                 continue
             
-            await self.process_perform_liquidity(account, address, pair_address, self.liquidity_amount, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path=pair_address):
+                continue
+
+            if self.state.record(pair_address, await self.process_perform_liquidity(account, address, pair_address, base_address, self.liquidity_amount, use_proxy)):
+                await self.print_timer()
 
     async def process_accounts(self, account: str, address: str, option: int, use_proxy: bool, rotate_proxy: bool):
         is_valid = await self.process_check_connection(address, use_proxy, rotate_proxy)
         if is_valid:
             try:
-                web3 = await self.get_web3_with_check(address, use_proxy)
+                web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             except Exception as e:
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -1104,9 +1120,11 @@ class Faroswap:
                     f"{Fore.MAGENTA+Style.BRIGHT}-{Style.RESET_ALL}"
                     f"{Fore.YELLOW+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
                 )
-                return
+                return False
             
-            self.used_nonce[address] = web3.eth.get_transaction_count(address, "pending")
+            await self.state.nonces.sync(web3)
+            await self.allowance_ledger.scan(web3, address, self.allowance_pairs)
+            await self.balance_ledger.seed(web3, address, self.balance_tokens)
             
             if option == 1:
                 self.log(
@@ -1155,6 +1173,44 @@ class Faroswap:
                 await self.process_option_4(account, address, use_proxy)
                 await asyncio.sleep(5)
 
+            return True
+
+        return False
+
+    async def process_account_task(self, account: str, option: int, use_proxy: bool, rotate_proxy: bool):
+        address = self.generate_address(account)
+        current_account.set(AccountState(account, address, self.mask_account(address)))
+
+        separator = "=" * 25
+        self.log(
+            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
+            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
+            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
+        )
+
+        if not address:
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status    :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.open_run(self.journal, option)
+
+        try:
+            success = await self.process_accounts(account, address, option, use_proxy, rotate_proxy)
+        except Exception as e:
+            self.state.close_run("failed")
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status    :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.close_run("finished" if success else "failed")
+        await asyncio.sleep(3)
+        return success
+
     async def main(self):
         try:
             with open('accounts.txt', 'r') as file:
@@ -1163,9 +1219,13 @@ class Faroswap:
             self.pool_addresses = self.load_pools()
 
             option, proxy_choice, rotate_proxy = self.print_question()
+            self.print_worker_question()
+            self.signer.offload = self.workers > 1
 
             use_proxy = True if proxy_choice == 1 else False
 
+            await self.journal.reconcile(await self.web3_pool.get())
+
             while True:
                 self.clear_terminal()
                 self.welcome()
@@ -1177,28 +1237,20 @@ class Faroswap:
                 if use_proxy:
                     await self.load_proxies()
                 
-                separator = "=" * 25
-                for account in accounts:
-                    if account:
-                        address = self.generate_address(account)
-
-                        self.log(
-                            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
-                            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
-                            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
-                        )
-
-                        if not address:
-                            self.log(
-                                f"{Fore.CYAN + Style.BRIGHT}Status    :{Style.RESET_ALL}"
-                                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
-                            )
-                            continue
-
-                        await self.process_accounts(account, address, option, use_proxy, rotate_proxy)
-                        await asyncio.sleep(3)
+                runner = AccountRunner(self.workers)
+                report = await runner.run(accounts, lambda account: self.process_account_task(account, option, use_proxy, rotate_proxy))
 
                 self.log(f"{Fore.CYAN + Style.BRIGHT}={Style.RESET_ALL}"*72)
+                self.log(
+                    f"{Fore.GREEN + Style.BRIGHT}Throughput     : {Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT}{report['processed']} Accounts in {self.format_seconds(report['elapsed'])} {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} {report['per_minute']:.2f} Accounts/Min {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} x{report['parallelism']:.1f} Parallel {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.RED + Style.BRIGHT} {report['failed']} Failed {Style.RESET_ALL}"
+                )
                 seconds = 24 * 60 * 60
                 while seconds > 0:
                     formatted_time = self.format_seconds(seconds)
@@ -1219,6 +1271,10 @@ class Faroswap:
         except Exception as e:
             self.log(f"{Fore.RED+Style.BRIGHT}Error: {e}{Style.RESET_ALL}")
             raise e
+        finally:
+            await self.web3_pool.close()
+            await self.session_pool.close()
+            self.signer.close()
 
 if __name__ == "__main__":
     try:
@@ -1,12 +1,10 @@
-from web3 import Web3
-from web3.exceptions import TransactionNotFound
 from eth_account import Account
 from aiohttp import ClientResponseError, ClientSession, ClientTimeout, BasicAuth
-from aiohttp_socks import ProxyConnector
 from fake_useragent import FakeUserAgent
 from datetime import datetime
 from colorama import *
 import asyncio, random, json, re, os, pytz
+from pharos import Web3Pool, SessionPool, ConditionalCache, Multicall, BALANCE_OF, GasProfile, TransactionSigner, RunJournal, AccountRunner, AccountState, TransactionSender, RetryPolicy, RateLimits, current_account, classify_error
 
 wib = pytz.timezone('Asia/Jakarta')
 
@@ -69,21 +67,39 @@ class Grandline:
             }
         ]
         self.NFT_LISTS = []
+        self.collection_cache = ConditionalCache("collections.json")
+        self.fetch_limit = 8
         self.proxies = []
         self.proxy_index = 0
         self.account_proxies = {}
-        self.used_nonce = {}
+        self.retry_policy = RetryPolicy()
+        self.rate_limits = RateLimits.from_config("limits.json")
+        self.web3_pool = Web3Pool.from_config("rpc.json", self.RPC_URL, retry_policy=self.retry_policy, rate_limits=self.rate_limits)
+        self.session_pool = SessionPool(rate_limits=self.rate_limits)
+        self.gas_profile = GasProfile()
+        self.journal = RunJournal("journal.db", "grandline")
+        self.signer = TransactionSigner()
+        self.sender = TransactionSender(self.web3_pool, self.signer, self.gas_profile, None, self.log)
+        self.multicall = Multicall()
+        self.nft_ownership = {}
+        self.workers = 1
 
     def clear_terminal(self):
         os.system('cls' if os.name == 'nt' else 'clear')
 
     def log(self, message):
+        state = current_account.get()
+        label = f"{Fore.MAGENTA + Style.BRIGHT}[ {state.label} ]{Style.RESET_ALL} " if state and self.workers > 1 else ""
         print(
             f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
-            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{message}",
+            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{label}{message}",
             flush=True
         )
 
+    @property
+    def state(self):
+        return current_account.get()
+
     def welcome(self, project_name="Grandline"):
         border = "═" * 58  # Solid elite border
         print(Fore.LIGHTBLUE_EX + Style.BRIGHT + border)
@@ -149,22 +165,18 @@ class Grandline:
         return proxy
     
     def build_proxy_config(self, proxy=None):
-        if not proxy:
-            return None, None, None
-
-        if proxy.startswith("socks"):
-            connector = ProxyConnector.from_url(proxy)
-            return connector, None, None
+        if not proxy or proxy.startswith("socks"):
+            return None, None
 
-        elif proxy.startswith("http"):
+        if proxy.startswith("http"):
             match = re.match(r"http://(.*?):(.*?)@(.*)", proxy)
             if match:
                 username, password, host_port = match.groups()
                 clean_url = f"http://{host_port}"
                 auth = BasicAuth(username, password)
-                return None, clean_url, auth
+                return clean_url, auth
             else:
-                return None, proxy, None
+                return proxy, None
 
         raise Exception("Unsupported Proxy Type.")
     
@@ -184,30 +196,15 @@ class Grandline:
         except Exception as e:
             return None
         
-    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60):
-        request_kwargs = {"timeout": timeout}
-
+    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60, pin=False):
         proxy = self.get_next_proxy_for_account(address) if use_proxy else None
-
-        if use_proxy and proxy:
-            request_kwargs["proxies"] = {"http": proxy, "https": proxy}
-
-        for attempt in range(retries):
-            try:
-                web3 = Web3(Web3.HTTPProvider(self.RPC_URL, request_kwargs=request_kwargs))
-                web3.eth.get_block_number()
-                return web3
-            except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(3)
-                    continue
-                raise Exception(f"Failed to Connect to RPC: {str(e)}")
+        return await self.web3_pool.get(proxy, timeout, retries, address if pin else None)
         
     async def get_token_balance(self, address: str, use_proxy: bool):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
-            balance = web3.eth.get_balance(address)
+            balance = await web3.eth.get_balance(address)
 
             token_balance = balance / (10 ** 18)
 
@@ -219,43 +216,12 @@ class Grandline:
             )
             return None
         
-    async def send_raw_transaction_with_retries(self, account, web3, tx, retries=5):
-        for attempt in range(retries):
-            try:
-                signed_tx = web3.eth.account.sign_transaction(tx, account)
-                raw_tx = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                tx_hash = web3.to_hex(raw_tx)
-                return tx_hash
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Send TX Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Hash Not Found After Maximum Retries")
-
-    async def wait_for_receipt_with_retries(self, web3, tx_hash, retries=5):
-        for attempt in range(retries):
-            try:
-                receipt = await asyncio.to_thread(web3.eth.wait_for_transaction_receipt, tx_hash, timeout=300)
-                return receipt
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Wait for Receipt Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Receipt Not Found After Maximum Retries")
     
     async def check_nft_status(self, address: str, nft_contract_address: str, use_proxy: bool):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
             token_contract = web3.eth.contract(address=web3.to_checksum_address(nft_contract_address), abi=self.GRANDLINE_CONTRACT_ABI)
-            amount = token_contract.functions.balanceOf(address).call()
+            amount = await token_contract.functions.balanceOf(address).call()
 
             return True if amount > 0 else False
         except Exception as e:
@@ -265,9 +231,29 @@ class Grandline:
             )
             return None
         
+    async def scan_nft_ownership(self, addresses: list, use_proxy: bool):
+        try:
+            web3 = await self.get_web3_with_check(addresses[0], use_proxy)
+
+            pairs = [(address, nft["address"]) for address in addresses for nft in self.NFT_LISTS]
+            calls = [
+                (web3.to_checksum_address(nft_contract_address), BALANCE_OF + web3.codec.encode(["address"], [web3.to_checksum_address(address)]))
+                for address, nft_contract_address in pairs
+            ]
+            results = await self.multicall.aggregate(web3, calls)
+
+            for (address, nft_contract_address), (success, data) in zip(pairs, results):
+                if success and len(data) >= 32:
+                    self.nft_ownership[(address.lower(), nft_contract_address.lower())] = int.from_bytes(data[:32], "big") > 0
+
+            return True
+        except Exception as e:
+            self.log(f"{Fore.RED+Style.BRIGHT}Scan NFT Ownership Failed: {str(e)}{Style.RESET_ALL}")
+            return False
+        
     async def perform_claim_nft(self, account: str, address: str, nft_contract_address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             nft_price = web3.to_wei(1, "ether")
 
@@ -282,26 +268,23 @@ class Grandline:
             token_contract = web3.eth.contract(address=contract_address, abi=self.GRANDLINE_CONTRACT_ABI)
 
             claim_data = token_contract.functions.claim(address, 1, self.NATIVE_ADDRESS, nft_price, proof, b'')
-            estimated_gas = claim_data.estimate_gas({"from": address, "value": nft_price})
+            estimated_gas = await self.gas_profile.estimate(claim_data, {"from": address, "value": nft_price})
 
-            max_priority_fee = web3.to_wei(10, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3, percentile=90)
 
-            claim_tx = claim_data.build_transaction({
+            claim_tx = await claim_data.build_transaction({
                 "from": web3.to_checksum_address(address),
                 "value": nft_price,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, claim_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, claim_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -312,7 +295,12 @@ class Grandline:
             return None, None
         
     async def print_timer(self):
-        for remaining in range(random.randint(5, 10), 0, -1):
+        delay = random.randint(5, 10)
+        if self.workers > 1:
+            await asyncio.sleep(delay)
+            return
+
+        for remaining in range(delay, 0, -1):
             print(
                 f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
                 f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}"
@@ -324,6 +312,18 @@ class Grandline:
             )
             await asyncio.sleep(1)
         
+    def print_worker_question(self):
+        while True:
+            try:
+                workers = int(input(f"{Fore.YELLOW + Style.BRIGHT}Concurrent Accounts -> {Style.RESET_ALL}").strip())
+                if workers > 0:
+                    self.workers = workers
+                    break
+                else:
+                    print(f"{Fore.RED + Style.BRIGHT}Concurrent Accounts must be > 0.{Style.RESET_ALL}")
+            except ValueError:
+                print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
+
     def print_question(self):
         while True:
             try:
@@ -354,12 +354,12 @@ class Grandline:
         return use_proxy, rotate_proxy
     
     async def check_connection(self, proxy_url=None):
-        connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+        proxy, proxy_auth = self.build_proxy_config(proxy_url)
         try:
-            async with ClientSession(connector=connector, timeout=ClientTimeout(total=10)) as session:
-                async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth) as response:
-                    response.raise_for_status()
-                    return True
+            session = self.session_pool.get("https://api.ipify.org?format=json", proxy_url)
+            async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                return True
         except (Exception, ClientResponseError) as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -399,9 +399,10 @@ class Grandline:
                                 if addresses:
                                     return addresses
                                 
-            except Exception:
-                if attempt < retries - 1:
-                    await asyncio.sleep(5)
+            except Exception as e:
+                kind = classify_error(e)
+                if attempt < retries - 1 and self.retry_policy.should_retry(kind):
+                    await self.retry_policy.sleep(kind, attempt)
                     continue
                 return None
             
@@ -409,15 +410,29 @@ class Grandline:
         url = f"{self.BASE_API}/items/collections/{nft_contract_address}"
         for attempt in range(retries):
             try:
-                async with ClientSession(timeout=ClientTimeout(total=60)) as session:
-                    async with session.get(url=url, headers=HEADERS) as response:
-                        response.raise_for_status()
-                        return await response.json()
+                headers = {**HEADERS, **self.collection_cache.headers(nft_contract_address)}
+                session = self.session_pool.get(url)
+                async with session.get(url=url, headers=headers, timeout=ClientTimeout(total=60)) as response:
+                    if response.status == 304 and self.collection_cache.get(nft_contract_address):
+                        self.collection_cache.touch(nft_contract_address)
+                        return self.collection_cache.get(nft_contract_address)
+                    response.raise_for_status()
+                    result = await response.json()
+                    self.collection_cache.store(nft_contract_address, result, response.headers)
+                    return result
             except (Exception, ClientResponseError) as e:
-                if attempt < retries:
-                    await asyncio.sleep(5)
+                kind = classify_error(e)
+                if attempt < retries - 1 and self.retry_policy.should_retry(kind):
+                    await self.retry_policy.sleep(kind, attempt)
                     continue
-                return None
+                return self.collection_cache.get(nft_contract_address)
+            
+    async def load_nft_data(self, nft_contract_address: str, semaphore: asyncio.Semaphore):
+        if self.collection_cache.is_fresh(nft_contract_address):
+            return self.collection_cache.get(nft_contract_address)
+
+        async with semaphore:
+            return await self.fetch_nft_data(nft_contract_address)
         
     async def process_check_connection(self, address: str, use_proxy: bool, rotate_proxy: bool):
         while True:
@@ -444,8 +459,11 @@ class Grandline:
             print(f"{Fore.RED+Style.BRIGHT}Fetch NFT Contract Addresses Failed{Style.RESET_ALL}")
             return False
 
-        for nft_contract_address in addresses:
-            nft_data = await self.fetch_nft_data(nft_contract_address)
+        semaphore = asyncio.Semaphore(self.fetch_limit)
+        results = await asyncio.gather(*(self.load_nft_data(nft_contract_address, semaphore) for nft_contract_address in addresses))
+        self.collection_cache.save()
+
+        for nft_contract_address, nft_data in zip(addresses, results):
             if nft_data:
                 nft_name = nft_data["data"]["name"]
 
@@ -466,13 +484,12 @@ class Grandline:
                     f"{Fore.RED+Style.BRIGHT} Failed {Style.RESET_ALL}"
                 )
 
-            await asyncio.sleep(1)
-
         return True
 
     async def process_perform_claim_nft(self, account: str, address: str, nft_contract_address: str, use_proxy: bool):
         tx_hash, block_number = await self.perform_claim_nft(account, address, nft_contract_address, use_proxy)
         if tx_hash and block_number:
+            self.nft_ownership[(address.lower(), nft_contract_address.lower())] = True
             explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
 
             self.log(
@@ -491,18 +508,20 @@ class Grandline:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_accounts(self, account: str, address: str, use_proxy: bool, rotate_proxy: bool):
         is_valid = await self.process_check_connection(address, use_proxy, rotate_proxy)
         if is_valid:
             
             try:
-                web3 = await self.get_web3_with_check(address, use_proxy)
+                web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             except Exception as e:
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -510,9 +529,9 @@ class Grandline:
                     f"{Fore.MAGENTA+Style.BRIGHT}-{Style.RESET_ALL}"
                     f"{Fore.YELLOW+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
                 )
-                return
+                return False
             
-            self.used_nonce[address] = web3.eth.get_transaction_count(address, "pending")
+            await self.state.nonces.sync(web3)
 
             self.log(f"{Fore.CYAN+Style.BRIGHT}Claim   :{Style.RESET_ALL}")
             
@@ -520,7 +539,8 @@ class Grandline:
                 nft_name = nft["name"]
                 nft_contract_address = nft["address"]
 
-                balance = await self.get_token_balance(address, use_proxy)
+                if self.sender.skip(step=f"claim:{nft_contract_address}"):
+                    continue
 
                 self.log(
                     f"{Fore.GREEN+Style.BRIGHT} ● {Style.RESET_ALL}"
@@ -535,7 +555,9 @@ class Grandline:
                     f"{Fore.WHITE+Style.BRIGHT} 1 PHRS {Style.RESET_ALL}"
                 )
 
-                has_claimed = await self.check_nft_status(address, nft_contract_address, use_proxy)
+                has_claimed = self.nft_ownership.get((address.lower(), nft_contract_address.lower()))
+                if has_claimed is None:
+                    has_claimed = await self.check_nft_status(address, nft_contract_address, use_proxy)
                 if has_claimed:
                     self.log(
                         f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
@@ -554,10 +576,48 @@ class Grandline:
                         f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                         f"{Fore.YELLOW+Style.BRIGHT} Insufficient PHRS Token Balance {Style.RESET_ALL}"
                     )
-                    return
+                    break
                 
-                await self.process_perform_claim_nft(account, address, nft_contract_address, use_proxy)
-                await self.print_timer()
+                if self.state.record(nft_contract_address, await self.process_perform_claim_nft(account, address, nft_contract_address, use_proxy)):
+                    await self.print_timer()
+
+            return True
+
+        return False
+
+    async def process_account_task(self, account: str, use_proxy: bool, rotate_proxy: bool):
+        address = self.generate_address(account)
+        current_account.set(AccountState(account, address, self.mask_account(address)))
+
+        separator = "=" * 25
+        self.log(
+            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
+            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
+            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
+        )
+
+        if not address:
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.open_run(self.journal)
+
+        try:
+            success = await self.process_accounts(account, address, use_proxy, rotate_proxy)
+        except Exception as e:
+            self.state.close_run("failed")
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.close_run("finished" if success else "failed")
+        await asyncio.sleep(3)
+        return success
 
     async def main(self):
         try:
@@ -565,6 +625,8 @@ class Grandline:
                 accounts = [line.strip() for line in file if line.strip()]
             
             proxy_choice, rotate_proxy = self.print_question()
+            self.print_worker_question()
+            self.signer.offload = self.workers > 1
 
             print(f"\n{Fore.BLUE+Style.BRIGHT}Fetch NFT Contract Addresses...{Style.RESET_ALL}\n")
             await asyncio.sleep(1)
@@ -572,6 +634,8 @@ class Grandline:
             fetched = await self.process_fetch_nft_addresses()
             if not fetched: return
 
+            await self.journal.reconcile(await self.web3_pool.get())
+
             while True:
                 use_proxy = True if proxy_choice == 1 else False
 
@@ -584,29 +648,26 @@ class Grandline:
 
                 if use_proxy:
                     await self.load_proxies()
+
+                addresses = [address for address in map(self.generate_address, accounts) if address]
+                self.nft_ownership.clear()
+                if addresses:
+                    await self.scan_nft_ownership(addresses, use_proxy)
                 
-                separator = "=" * 25
-                for account in accounts:
-                    if account:
-                        address = self.generate_address(account)
-
-                        self.log(
-                            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
-                            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
-                            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
-                        )
-
-                        if not address:
-                            self.log(
-                                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
-                                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
-                            )
-                            continue
-
-                        await self.process_accounts(account, address, use_proxy, rotate_proxy)
-                        await asyncio.sleep(3)
+                runner = AccountRunner(self.workers)
+                report = await runner.run(accounts, lambda account: self.process_account_task(account, use_proxy, rotate_proxy))
 
                 self.log(f"{Fore.CYAN + Style.BRIGHT}={Style.RESET_ALL}"*72)
+                self.log(
+                    f"{Fore.GREEN + Style.BRIGHT}Throughput     : {Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT}{report['processed']} Accounts in {self.format_seconds(report['elapsed'])} {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} {report['per_minute']:.2f} Accounts/Min {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} x{report['parallelism']:.1f} Parallel {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.RED + Style.BRIGHT} {report['failed']} Failed {Style.RESET_ALL}"
+                )
                 seconds = 24 * 60 * 60
                 while seconds > 0:
                     formatted_time = self.format_seconds(seconds)
@@ -627,6 +688,10 @@ class Grandline:
         except Exception as e:
             self.log(f"{Fore.RED+Style.BRIGHT}Error: {e}{Style.RESET_ALL}")
             raise e
+        finally:
+            await self.web3_pool.close()
+            await self.session_pool.close()
+            self.signer.close()
 
 if __name__ == "__main__":
     try:
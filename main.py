@@ -1,11 +1,8 @@
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import serialization
-from web3 import Web3
-from web3.exceptions import TransactionNotFound
 from eth_account import Account
 from aiohttp import ClientResponseError, ClientSession, ClientTimeout, BasicAuth
-from aiohttp_socks import ProxyConnector
 from fake_useragent import FakeUserAgent
 from datetime import datetime
 from base64 import b64encode
@@ -13,6 +10,7 @@ from colorama import *
 import asyncio, random, time, json, re, os, pytz
 from pyfiglet import Figlet
 import shutil
+from pharos import Web3Pool, SessionPool, GasProfile, TransactionSigner, TokenRegistry, TokenReader, AllowanceLedger, EligibilityIndex, AccountScheduler, RunJournal, AccountRunner, AccountState, TransactionSender, RetryPolicy, RateLimits, current_account, classify_error, is_allowance_error
 
 wib = pytz.timezone('Asia/Jakarta')
 
@@ -63,12 +61,28 @@ class AutoStaking:
             "with each receiving approximately 33.3% of the investment."
         )
         self.BASE_API = None
-        self.HEADERS = {}
         self.proxies = []
         self.proxy_index = 0
         self.account_proxies = {}
-        self.auth_tokens = {}
-        self.used_nonce = {}
+        self.retry_policy = RetryPolicy()
+        self.rate_limits = RateLimits.from_config("limits.json")
+        self.web3_pool = Web3Pool.from_config("rpc.json", self.RPC_URL, retry_policy=self.retry_policy, rate_limits=self.rate_limits)
+        self.session_pool = SessionPool(rate_limits=self.rate_limits)
+        self.gas_profile = GasProfile()
+        self.journal = RunJournal("journal.db", "autostaking")
+        self.signer = TransactionSigner()
+        self.sender = TransactionSender(self.web3_pool, self.signer, self.gas_profile, None, self.log, status_label="    Status  :")
+        self.token_registry = TokenRegistry()
+        self.token_reader = TokenReader(registry=self.token_registry)
+        self.allowance_ledger = AllowanceLedger(multicall=self.token_reader.multicall)
+        self.allowance_pairs = [
+            (self.USDC_CONTRACT_ADDRESS, self.STAKING_ROUTER_ADDRESS),
+            (self.USDT_CONTRACT_ADDRESS, self.STAKING_ROUTER_ADDRESS),
+            (self.MUSD_CONTRACT_ADDRESS, self.STAKING_ROUTER_ADDRESS)
+        ]
+        self.faucet_index = EligibilityIndex(multicall=self.token_reader.multicall)
+        self.scheduler = AccountScheduler()
+        self.workers = 1
         self.staking_count = 0
         self.usdc_amount = 0
         self.usdt_amount = 0
@@ -80,12 +94,18 @@ class AutoStaking:
         os.system('cls' if os.name == 'nt' else 'clear')
 
     def log(self, message):
+        state = current_account.get()
+        label = f"{Fore.MAGENTA + Style.BRIGHT}[ {state.label} ]{Style.RESET_ALL} " if state and self.workers > 1 else ""
         print(
             f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
-            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{message}",
+            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{label}{message}",
             flush=True
         )
 
+    @property
+    def state(self):
+        return current_account.get()
+
     def welcome(self):
         figlet = Figlet(font='ansi_shadow')
         banner_lines = figlet.renderText('BG WIN').splitlines()
@@ -156,22 +176,18 @@ class AutoStaking:
         return proxy
     
     def build_proxy_config(self, proxy=None):
-        if not proxy:
-            return None, None, None
-
-        if proxy.startswith("socks"):
-            connector = ProxyConnector.from_url(proxy)
-            return connector, None, None
+        if not proxy or proxy.startswith("socks"):
+            return None, None
 
-        elif proxy.startswith("http"):
+        if proxy.startswith("http"):
             match = re.match(r"http://(.*?):(.*?)@(.*)", proxy)
             if match:
                 username, password, host_port = match.groups()
                 clean_url = f"http://{host_port}"
                 auth = BasicAuth(username, password)
-                return None, clean_url, auth
+                return clean_url, auth
             else:
-                return None, proxy, None
+                return proxy, None
 
         raise Exception("Unsupported Proxy Type.")
     
@@ -274,34 +290,17 @@ class AutoStaking:
         except Exception as e:
             raise Exception(f"Generate Req Payload Failed: {str(e)}")
         
-    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60):
-        request_kwargs = {"timeout": timeout}
-
+    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60, pin=False):
         proxy = self.get_next_proxy_for_account(address) if use_proxy else None
-
-        if use_proxy and proxy:
-            request_kwargs["proxies"] = {"http": proxy, "https": proxy}
-
-        for attempt in range(retries):
-            try:
-                web3 = Web3(Web3.HTTPProvider(self.RPC_URL, request_kwargs=request_kwargs))
-                web3.eth.get_block_number()
-                return web3
-            except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(3)
-                    continue
-                raise Exception(f"Failed to Connect to RPC: {str(e)}")
+        return await self.web3_pool.get(proxy, timeout, retries, address if pin else None)
             
     async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
-            token_contract = web3.eth.contract(address=web3.to_checksum_address(contract_address), abi=self.ERC20_CONTRACT_ABI)
-            balance = token_contract.functions.balanceOf(address).call()
-            decimals = token_contract.functions.decimals().call()
+            token = (await self.token_reader.read(web3, [(contract_address, address, None)]))[0]
 
-            token_balance = balance / (10 ** decimals)
+            token_balance = token["balance"] / (10 ** token["decimals"])
 
             return token_balance
         except Exception as e:
@@ -311,37 +310,6 @@ class AutoStaking:
             )
             return None
         
-    async def send_raw_transaction_with_retries(self, account, web3, tx, retries=5):
-        for attempt in range(retries):
-            try:
-                signed_tx = web3.eth.account.sign_transaction(tx, account)
-                raw_tx = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                tx_hash = web3.to_hex(raw_tx)
-                return tx_hash
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Send TX Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Hash Not Found After Maximum Retries")
-
-    async def wait_for_receipt_with_retries(self, web3, tx_hash, retries=5):
-        for attempt in range(retries):
-            try:
-                receipt = await asyncio.to_thread(web3.eth.wait_for_transaction_receipt, tx_hash, timeout=300)
-                return receipt
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Wait for Receipt Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Receipt Not Found After Maximum Retries")
     
     async def get_next_faucet_claim_time(self, address: str, use_proxy: bool):
         try:
@@ -350,7 +318,7 @@ class AutoStaking:
             contract_address = web3.to_checksum_address(self.mvMUSD_CONTRACT_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.AUTOSTAKING_CONTRACT_ABI)
 
-            next_faucet_claim_time = token_contract.functions.getNextFaucetClaimTime(web3.to_checksum_address(address)).call()
+            next_faucet_claim_time = await token_contract.functions.getNextFaucetClaimTime(web3.to_checksum_address(address)).call()
 
             return next_faucet_claim_time
         except Exception as e:
@@ -360,33 +328,53 @@ class AutoStaking:
             )
             return None
         
+    async def scan_faucet_claim_times(self, addresses: list, use_proxy: bool):
+        if not addresses:
+            return
+        try:
+            web3 = await self.get_web3_with_check(addresses[0], use_proxy)
+
+            contract_address = web3.to_checksum_address(self.mvMUSD_CONTRACT_ADDRESS)
+            token_contract = web3.eth.contract(address=contract_address, abi=self.AUTOSTAKING_CONTRACT_ABI)
+
+            entries = [
+                (address, contract_address, web3.to_bytes(hexstr=token_contract.encode_abi("getNextFaucetClaimTime", args=[web3.to_checksum_address(address)])))
+                for address in addresses
+            ]
+            await self.faucet_index.scan(web3, entries, lambda next_faucet_claim_time: next_faucet_claim_time)
+        except Exception as e:
+            self.log(f"{Fore.RED+Style.BRIGHT}Scan Faucet Claim Times Failed: {str(e)}{Style.RESET_ALL}")
+
+    def next_due_time(self, address: str):
+        next_faucet_claim_time = self.faucet_index.get(address) if address else None
+        if next_faucet_claim_time and next_faucet_claim_time > time.time():
+            return next_faucet_claim_time
+        return None
+        
     async def perform_claim_faucet(self, account: str, address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             contract_address = web3.to_checksum_address(self.mvMUSD_CONTRACT_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.ERC20_CONTRACT_ABI)
 
             claim_data = token_contract.functions.claimFaucet()
-            estimated_gas = claim_data.estimate_gas({"from": address})
+            estimated_gas = await claim_data.estimate_gas({"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            claim_tx = claim_data.build_transaction({
+            claim_tx = await claim_data.build_transaction({
                 "from": web3.to_checksum_address(address),
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, claim_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, claim_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -398,36 +386,38 @@ class AutoStaking:
         
     async def approving_token(self, account: str, address: str, ticker: str, router_address: str, asset_address: str, amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             
             spender = web3.to_checksum_address(router_address)
             token_contract = web3.eth.contract(address=web3.to_checksum_address(asset_address), abi=self.ERC20_CONTRACT_ABI)
-            decimals = token_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, asset_address)
             
             amount_to_wei = int(amount * (10 ** decimals))
 
-            allowance = token_contract.functions.allowance(address, spender).call()
+            allowance = self.allowance_ledger.get(address, asset_address, spender)
+            if allowance is None:
+                allowance = await token_contract.functions.allowance(address, spender).call()
+                self.allowance_ledger.record(address, asset_address, spender, allowance)
+
             if allowance < amount_to_wei:
                 approve_data = token_contract.functions.approve(spender, 2**256 - 1)
-                estimated_gas = approve_data.estimate_gas({"from": address})
+                estimated_gas = await self.gas_profile.estimate(approve_data, {"from": address})
 
-                max_priority_fee = web3.to_wei(1, "gwei")
-                max_fee = max_priority_fee
+                max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-                approve_tx = approve_data.build_transaction({
+                approve_tx = await approve_data.build_transaction({
                     "from": address,
                     "gas": int(estimated_gas * 1.2),
                     "maxFeePerGas": int(max_fee),
                     "maxPriorityFeePerGas": int(max_priority_fee),
-                    "nonce": self.used_nonce[address],
-                    "chainId": web3.eth.chain_id,
+                    "chainId": await self.web3_pool.chain.chain_id(web3),
                 })
 
-                tx_hash = await self.send_raw_transaction_with_retries(account, web3, approve_tx)
-                receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+                tx_hash = await self.sender.send(account, web3, approve_tx, substep="approve")
+                receipt = await self.sender.wait(web3, tx_hash)
+                self.allowance_ledger.record(address, asset_address, spender, 2**256 - 1)
 
                 block_number = receipt.blockNumber
-                self.used_nonce[address] += 1
 
                 explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
                 
@@ -455,7 +445,7 @@ class AutoStaking:
         
     async def perform_staking(self, account: str, address: str, tickers: dict, change_tx: list, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             await self.approving_token(account, address, tickers['ticker0'], self.STAKING_ROUTER_ADDRESS, self.USDC_CONTRACT_ADDRESS, self.usdc_amount, use_proxy)
             await self.approving_token(account, address, tickers['ticker1'], self.STAKING_ROUTER_ADDRESS, self.USDT_CONTRACT_ADDRESS, self.usdt_amount, use_proxy)
@@ -467,14 +457,13 @@ class AutoStaking:
                 
             calldata = transactions["data"]["688688"]["data"]
 
-            estimated_gas = web3.eth.estimate_gas({
+            estimated_gas = await web3.eth.estimate_gas({
                 "from": web3.to_checksum_address(address),
                 "to": web3.to_checksum_address(self.STAKING_ROUTER_ADDRESS),
                 "data": calldata,
             })
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
             tx = {
                 "from": web3.to_checksum_address(address),
@@ -483,18 +472,18 @@ class AutoStaking:
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             }
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
+            if is_allowance_error(e):
+                self.allowance_ledger.forget(address)
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
@@ -502,7 +491,12 @@ class AutoStaking:
             return None, None
         
     async def print_timer(self):
-        for remaining in range(random.randint(self.max_delay, self.max_delay), 0, -1):
+        delay = random.randint(self.max_delay, self.max_delay)
+        if self.workers > 1:
+            await asyncio.sleep(delay)
+            return
+
+        for remaining in range(delay, 0, -1):
             print(
                 f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
                 f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}"
@@ -514,6 +508,18 @@ class AutoStaking:
             )
             await asyncio.sleep(1)
 
+    def print_worker_question(self):
+        while True:
+            try:
+                workers = int(input(f"{Fore.YELLOW + Style.BRIGHT}Concurrent Accounts -> {Style.RESET_ALL}").strip())
+                if workers > 0:
+                    self.workers = workers
+                    break
+                else:
+                    print(f"{Fore.RED + Style.BRIGHT}Concurrent Accounts must be > 0.{Style.RESET_ALL}")
+            except ValueError:
+                print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
+
     def print_question(self):
         while True:
             try:
@@ -654,8 +660,9 @@ class AutoStaking:
                     return found_api
                     
             except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(5)
+                kind = classify_error(e)
+                if attempt < retries - 1 and self.retry_policy.should_retry(kind):
+                    await self.retry_policy.sleep(kind, attempt)
                     continue
                 self.log(
                     f"{Fore.GREEN + Style.BRIGHT}Base API Url   : {Style.RESET_ALL}"
@@ -666,12 +673,12 @@ class AutoStaking:
                 return None
     
     async def check_connection(self, proxy_url=None):
-        connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+        proxy, proxy_auth = self.build_proxy_config(proxy_url)
         try:
-            async with ClientSession(connector=connector, timeout=ClientTimeout(total=30)) as session:
-                async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth) as response:
-                    response.raise_for_status()
-                    return True
+            session = self.session_pool.get("https://api.ipify.org?format=json", proxy_url)
+            async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=30)) as response:
+                response.raise_for_status()
+                return True
         except (Exception, ClientResponseError) as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -685,22 +692,23 @@ class AutoStaking:
         url = f"{self.BASE_API}/investment/financial-portfolio-recommendation"
         data = json.dumps(self.generate_recommendation_payload(address))
         headers = {
-            **self.HEADERS[address],
-            "Authorization": self.auth_tokens[address],
+            **self.state.headers,
+            "Authorization": self.state.auth_token,
             "Content-Length": str(len(data)),
             "Content-Type": "application/json"
         }
         for attempt in range(retries):
             proxy_url = self.get_next_proxy_for_account(address) if use_proxy else None
-            connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+            proxy, proxy_auth = self.build_proxy_config(proxy_url)
             try:
-                async with ClientSession(connector=connector, timeout=ClientTimeout(total=120)) as session:
-                    async with session.post(url=url, headers=headers, data=data, proxy=proxy, proxy_auth=proxy_auth) as response:
-                        response.raise_for_status()
-                        return await response.json()
+                session = self.session_pool.get(url, proxy_url)
+                async with session.post(url=url, headers=headers, data=data, proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=120)) as response:
+                    response.raise_for_status()
+                    return await response.json()
             except (Exception, ClientResponseError) as e:
-                if attempt < retries:
-                    await asyncio.sleep(5)
+                kind = classify_error(e)
+                if attempt < retries - 1 and self.retry_policy.should_retry(kind):
+                    await self.retry_policy.sleep(kind, attempt)
                     continue
                 return None
             
@@ -708,22 +716,23 @@ class AutoStaking:
         url = f"{self.BASE_API}/investment/generate-change-transactions"
         data = json.dumps(self.generate_transactions_payload(address, change_tx))
         headers = {
-            **self.HEADERS[address],
-            "Authorization": self.auth_tokens[address],
+            **self.state.headers,
+            "Authorization": self.state.auth_token,
             "Content-Length": str(len(data)),
             "Content-Type": "application/json"
         }
         for attempt in range(retries):
             proxy_url = self.get_next_proxy_for_account(address) if use_proxy else None
-            connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+            proxy, proxy_auth = self.build_proxy_config(proxy_url)
             try:
-                async with ClientSession(connector=connector, timeout=ClientTimeout(total=120)) as session:
-                    async with session.post(url=url, headers=headers, data=data, proxy=proxy, proxy_auth=proxy_auth) as response:
-                        response.raise_for_status()
-                        return await response.json()
+                session = self.session_pool.get(url, proxy_url)
+                async with session.post(url=url, headers=headers, data=data, proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=120)) as response:
+                    response.raise_for_status()
+                    return await response.json()
             except (Exception, ClientResponseError) as e:
-                if attempt < retries:
-                    await asyncio.sleep(5)
+                kind = classify_error(e)
+                if attempt < retries - 1 and self.retry_policy.should_retry(kind):
+                    await self.retry_policy.sleep(kind, attempt)
                     continue
                 return None
         
@@ -746,11 +755,14 @@ class AutoStaking:
             return True
     
     async def process_perform_claim_faucet(self, account: str, address: str, use_proxy: bool):
-        next_faucet_claim_time = await self.get_next_faucet_claim_time(address, use_proxy)
+        next_faucet_claim_time = self.faucet_index.get(address)
+        if next_faucet_claim_time is None:
+            next_faucet_claim_time = await self.get_next_faucet_claim_time(address, use_proxy)
         if next_faucet_claim_time is not None:
             if int(time.time()) >= next_faucet_claim_time:
                 tx_hash, block_number = await self.perform_claim_faucet(account, address, use_proxy)
                 if tx_hash and block_number:
+                    self.faucet_index.mark(address, None)
                     explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
 
                     self.log(
@@ -810,24 +822,27 @@ class AutoStaking:
                     f"{Fore.CYAN+Style.BRIGHT}   Explorer:{Style.RESET_ALL}"
                     f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
                 )
+                return True
             
             else:
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                     f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
                 )
+                return False
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Fetch Financial Portfolio Recommendation Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_accounts(self, account: str, address: str, use_proxy: bool, rotate_proxy: bool):
         is_valid = await self.process_check_connection(address, use_proxy, rotate_proxy)
         if is_valid:
 
             try:
-                web3 = await self.get_web3_with_check(address, use_proxy)
+                web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             except Exception as e:
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -835,9 +850,10 @@ class AutoStaking:
                     f"{Fore.MAGENTA+Style.BRIGHT}-{Style.RESET_ALL}"
                     f"{Fore.YELLOW+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
                 )
-                return
+                return False
             
-            self.used_nonce[address] = web3.eth.get_transaction_count(address, "pending")
+            await self.state.nonces.sync(web3)
+            await self.allowance_ledger.scan(web3, address, self.allowance_pairs)
 
             self.log(f"{Fore.CYAN+Style.BRIGHT}Faucet  :{Style.RESET_ALL}")
 
@@ -854,6 +870,9 @@ class AutoStaking:
                     f"{Fore.WHITE+Style.BRIGHT}{self.staking_count}{Style.RESET_ALL}                                   "
                 )
 
+                if self.sender.skip(step=f"staking:{i}"):
+                    continue
+
                 tickers = {
                     "ticker0": "USDC",
                     "ticker1": "USDT",
@@ -913,21 +932,88 @@ class AutoStaking:
                     )
                     break
 
-                await self.process_perform_staking(account, address, tickers, use_proxy)
-                await self.print_timer()
-            
+                if self.sender.skip(path="staking"):
+                    continue
+
+                if self.state.record("staking", await self.process_perform_staking(account, address, tickers, use_proxy)):
+                    await self.print_timer()
+
+            return True
+
+        return False
+
+    async def process_account_task(self, account: str, use_proxy: bool, rotate_proxy: bool):
+        address = self.generate_address(account)
+        current_account.set(AccountState(account, address, self.mask_account(address), headers={}, auth_token=None))
+
+        separator = "=" * 25
+        self.log(
+            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
+            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
+            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
+        )
+
+        if not address:
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.auth_token = self.generate_auth_token(address)
+        if not self.state.auth_token:
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} Cryptography Library Version Not Supported {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.headers = {
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": "id-ID,id;q=0.9,en-US;q=0.8,en;q=0.7",
+            "Origin": "https://autostaking.pro",
+            "Referer": "https://autostaking.pro/",
+            "Sec-Fetch-Dest": "empty",
+            "Sec-Fetch-Mode": "cors",
+            "Sec-Fetch-Site": "same-site",
+            "User-Agent": FakeUserAgent().random
+        }
+
+        self.state.open_run(self.journal)
+
+        try:
+            success = await self.process_accounts(account, address, use_proxy, rotate_proxy)
+        except Exception as e:
+            self.state.close_run("failed")
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.close_run("finished" if success else "failed")
+        await asyncio.sleep(3)
+        return success
+
     async def main(self):
         try:
             with open("accounts.txt", "r") as file:
                 accounts = [line.strip() for line in file if line.strip()]
             
             use_proxy_choice, rotate_proxy = self.print_question()
+            self.print_worker_question()
+            self.signer.offload = self.workers > 1
 
-            while True:
-                use_proxy = False
-                if use_proxy_choice in [1, 2]:
-                    use_proxy = True
+            use_proxy = False
+            if use_proxy_choice in [1, 2]:
+                use_proxy = True
 
+            for account in accounts:
+                self.scheduler.schedule(account, 0)
+
+            await self.journal.reconcile(await self.web3_pool.get())
+
+            while True:
                 self.clear_terminal()
                 self.welcome()
                 self.log(
@@ -947,49 +1033,31 @@ class AutoStaking:
                 )
 
                 self.BASE_API = base_api
+
+                due_accounts = self.scheduler.pop_due()
+                addresses = {account: self.generate_address(account) for account in due_accounts}
+                await self.scan_faucet_claim_times([address for address in addresses.values() if address and self.faucet_index.get(address) is None], use_proxy)
                 
-                separator = "=" * 25
-                for account in accounts:
-                    if account:
-                        address = self.generate_address(account)
-
-                        self.log(
-                            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
-                            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
-                            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
-                        )
-
-                        if not address:
-                            self.log(
-                                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
-                                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
-                            )
-                            continue
-
-                        self.auth_tokens[address] = self.generate_auth_token(address)
-                        if not self.auth_tokens[address]:
-                            self.log(
-                                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
-                                f"{Fore.RED + Style.BRIGHT} Cryptography Library Version Not Supported {Style.RESET_ALL}"
-                            )
-                            continue
-
-                        self.HEADERS[address] = {
-                            "Accept": "application/json, text/plain, */*",
-                            "Accept-Language": "id-ID,id;q=0.9,en-US;q=0.8,en;q=0.7",
-                            "Origin": "https://autostaking.pro",
-                            "Referer": "https://autostaking.pro/",
-                            "Sec-Fetch-Dest": "empty",
-                            "Sec-Fetch-Mode": "cors",
-                            "Sec-Fetch-Site": "same-site",
-                            "User-Agent": FakeUserAgent().random
-                        }
-
-                        await self.process_accounts(account, address, use_proxy, rotate_proxy)
-                        await asyncio.sleep(3)
+                runner = AccountRunner(self.workers)
+                report = await runner.run(due_accounts, lambda account: self.process_account_task(account, use_proxy, rotate_proxy))
 
                 self.log(f"{Fore.CYAN + Style.BRIGHT}={Style.RESET_ALL}"*72)
-                seconds = 24 * 60 * 60
+                self.log(
+                    f"{Fore.GREEN + Style.BRIGHT}Throughput     : {Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT}{report['processed']} Accounts in {self.format_seconds(report['elapsed'])} {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} {report['per_minute']:.2f} Accounts/Min {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} x{report['parallelism']:.1f} Parallel {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.RED + Style.BRIGHT} {report['failed']} Failed {Style.RESET_ALL}"
+                )
+
+                await self.scan_faucet_claim_times([address for address in addresses.values() if address], use_proxy)
+                for account, address in addresses.items():
+                    self.scheduler.schedule(account, self.next_due_time(address))
+
+                seconds = self.scheduler.seconds_until_due()
                 while seconds > 0:
                     formatted_time = self.format_seconds(seconds)
                     print(
@@ -1000,8 +1068,8 @@ class AutoStaking:
                         f"{Fore.BLUE+Style.BRIGHT}All Accounts Have Been Processed.{Style.RESET_ALL}",
                         end="\r"
                     )
-                    await asyncio.sleep(1)
-                    seconds -= 1
+                    await asyncio.sleep(min(1, seconds))
+                    seconds = self.scheduler.seconds_until_due()
 
         except FileNotFoundError:
             self.log(f"{Fore.RED}File 'accounts.txt' Not Found.{Style.RESET_ALL}")
@@ -1009,6 +1077,10 @@ class AutoStaking:
         except Exception as e:
             self.log(f"{Fore.RED+Style.BRIGHT}Error: {e}{Style.RESET_ALL}")
             raise e
+        finally:
+            await self.web3_pool.close()
+            await self.session_pool.close()
+            self.signer.close()
 
 if __name__ == "__main__":
     try:
@@ -1,11 +1,9 @@
-from web3 import Web3
-from web3.exceptions import TransactionNotFound
 from eth_account import Account
 from aiohttp import ClientResponseError, ClientSession, ClientTimeout, BasicAuth
-from aiohttp_socks import ProxyConnector
 from datetime import datetime
 from colorama import *
 import asyncio, random, json, re, os, pytz
+from pharos import Web3Pool, SingleFlightCache, SessionPool, GasProfile, TransactionSigner, TokenRegistry, TokenReader, BalanceLedger, AllowanceLedger, EligibilityIndex, AccountScheduler, RunJournal, AccountRunner, AccountState, TransactionSender, RetryPolicy, RateLimits, current_account, is_allowance_error
 
 wib = pytz.timezone('Asia/Jakarta')
 
@@ -187,7 +185,40 @@ class OpenFi:
         self.proxies = []
         self.proxy_index = 0
         self.account_proxies = {}
-        self.used_nonce = {}
+        self.retry_policy = RetryPolicy()
+        self.rate_limits = RateLimits.from_config("limits.json")
+        self.web3_pool = Web3Pool.from_config("rpc.json", self.RPC_URL, retry_policy=self.retry_policy, rate_limits=self.rate_limits)
+        self.session_pool = SessionPool(rate_limits=self.rate_limits)
+        self.block_cache = SingleFlightCache(ttl=1)
+        self.reserve_cache = SingleFlightCache(ttl=30)
+        self.gas_profile = GasProfile()
+        self.journal = RunJournal("journal.db", "openfi")
+        self.signer = TransactionSigner()
+        self.token_registry = TokenRegistry()
+        self.token_reader = TokenReader(registry=self.token_registry)
+        self.balance_ledger = BalanceLedger(reader=self.token_reader)
+        self.sender = TransactionSender(self.web3_pool, self.signer, self.gas_profile, self.balance_ledger, self.log, "   Message  :", "   Status   :")
+        self.balance_tokens = [
+            self.PHRS_CONTRACT_ADDRESS,
+            self.WPHRS_CONTRACT_ADDRESS,
+            self.USDC_CONTRACT_ADDRESS,
+            self.USDT_CONTRACT_ADDRESS,
+            self.WETH_CONTRACT_ADDRESS,
+            self.WBTC_CONTRACT_ADDRESS,
+            self.GOLD_CONTRACT_ADDRESS,
+            self.TSLA_CONTRACT_ADDRESS,
+            self.NVIDIA_CONTRACT_ADDRESS
+        ]
+        self.allowance_ledger = AllowanceLedger(multicall=self.token_reader.multicall)
+        self.allowance_pairs = [
+            (asset_address, self.POOL_ROUTER_ADDRESS) for asset_address in [
+                self.WPHRS_CONTRACT_ADDRESS, self.USDC_CONTRACT_ADDRESS, self.USDT_CONTRACT_ADDRESS, self.WETH_CONTRACT_ADDRESS,
+                self.WBTC_CONTRACT_ADDRESS, self.GOLD_CONTRACT_ADDRESS, self.TSLA_CONTRACT_ADDRESS, self.NVIDIA_CONTRACT_ADDRESS
+            ]
+        ]
+        self.faucet_index = EligibilityIndex(multicall=self.token_reader.multicall)
+        self.scheduler = AccountScheduler()
+        self.workers = 1
         self.deposit_count = 0
         self.deposit_amount = 0
         self.supply_count = 0
@@ -205,12 +236,18 @@ class OpenFi:
         os.system('cls' if os.name == 'nt' else 'clear')
 
     def log(self, message):
+        state = current_account.get()
+        label = f"{Fore.MAGENTA + Style.BRIGHT}[ {state.label} ]{Style.RESET_ALL} " if state and self.workers > 1 else ""
         print(
             f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
-            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{message}",
+            f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}{label}{message}",
             flush=True
         )
 
+    @property
+    def state(self):
+        return current_account.get()
+
     def welcome(self):
         print(Fore.LIGHTGREEN_EX + Style.BRIGHT + "\n" + "═" * 60)
         print(Fore.GREEN + Style.BRIGHT + "    ⚡ Pharos Testnet Automation BOT  ⚡")
@@ -273,22 +310,18 @@ class OpenFi:
         return proxy
     
     def build_proxy_config(self, proxy=None):
-        if not proxy:
-            return None, None, None
-
-        if proxy.startswith("socks"):
-            connector = ProxyConnector.from_url(proxy)
-            return connector, None, None
+        if not proxy or proxy.startswith("socks"):
+            return None, None
 
-        elif proxy.startswith("http"):
+        if proxy.startswith("http"):
             match = re.match(r"http://(.*?):(.*?)@(.*)", proxy)
             if match:
                 username, password, host_port = match.groups()
                 clean_url = f"http://{host_port}"
                 auth = BasicAuth(username, password)
-                return None, clean_url, auth
+                return clean_url, auth
             else:
-                return None, proxy, None
+                return proxy, None
 
         raise Exception("Unsupported Proxy Type.")
     
@@ -316,52 +349,31 @@ class OpenFi:
         
     def generate_random_option(self):
         assets = [
-            ("WPHRS", self.WPHRS_CONTRACT_ADDRESS, 18),
-            ("USDC", self.USDC_CONTRACT_ADDRESS, 6),
-            ("USDT", self.USDT_CONTRACT_ADDRESS, 6),
-            ("WETH", self.WETH_CONTRACT_ADDRESS, 18),
-            ("WBTC", self.WBTC_CONTRACT_ADDRESS, 8),
-            ("GOLD", self.GOLD_CONTRACT_ADDRESS, 18),
-            ("TSLA", self.TSLA_CONTRACT_ADDRESS, 18),
-            ("NVIDIA", self.NVIDIA_CONTRACT_ADDRESS, 18)
+            ("WPHRS", self.WPHRS_CONTRACT_ADDRESS),
+            ("USDC", self.USDC_CONTRACT_ADDRESS),
+            ("USDT", self.USDT_CONTRACT_ADDRESS),
+            ("WETH", self.WETH_CONTRACT_ADDRESS),
+            ("WBTC", self.WBTC_CONTRACT_ADDRESS),
+            ("GOLD", self.GOLD_CONTRACT_ADDRESS),
+            ("TSLA", self.TSLA_CONTRACT_ADDRESS),
+            ("NVIDIA", self.NVIDIA_CONTRACT_ADDRESS)
         ]
 
-        ticker, asset_address, decimals = random.choice(assets)
+        ticker, asset_address = random.choice(assets)
 
-        return ticker, asset_address, decimals
+        return ticker, asset_address
         
-    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60):
-        request_kwargs = {"timeout": timeout}
-
+    async def get_web3_with_check(self, address: str, use_proxy: bool, retries=3, timeout=60, pin=False):
         proxy = self.get_next_proxy_for_account(address) if use_proxy else None
-
-        if use_proxy and proxy:
-            request_kwargs["proxies"] = {"http": proxy, "https": proxy}
-
-        for attempt in range(retries):
-            try:
-                web3 = Web3(Web3.HTTPProvider(self.RPC_URL, request_kwargs=request_kwargs))
-                web3.eth.get_block_number()
-                return web3
-            except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(3)
-                    continue
-                raise Exception(f"Failed to Connect to RPC: {str(e)}")
+        return await self.web3_pool.get(proxy, timeout, retries, address if pin else None)
         
-    async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool):
+    async def get_token_balance(self, address: str, contract_address: str, use_proxy: bool, required=None):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
-            if contract_address == self.PHRS_CONTRACT_ADDRESS:
-                balance = web3.eth.get_balance(address)
-                decimals = 18
-            else:
-                token_contract = web3.eth.contract(address=web3.to_checksum_address(contract_address), abi=self.ERC20_CONTRACT_ABI)
-                balance = token_contract.functions.balanceOf(address).call()
-                decimals = token_contract.functions.decimals().call()
+            token = (await self.balance_ledger.read(web3, address, [contract_address], required))[0]
 
-            token_balance = balance / (10 ** decimals)
+            token_balance = token["balance"] / (10 ** token["decimals"])
 
             return token_balance
         except Exception as e:
@@ -371,67 +383,35 @@ class OpenFi:
             )
             return None
         
-    async def send_raw_transaction_with_retries(self, account, web3, tx, retries=5):
-        for attempt in range(retries):
-            try:
-                signed_tx = web3.eth.account.sign_transaction(tx, account)
-                raw_tx = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                tx_hash = web3.to_hex(raw_tx)
-                return tx_hash
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message  :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Send TX Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Hash Not Found After Maximum Retries")
-
-    async def wait_for_receipt_with_retries(self, web3, tx_hash, retries=5):
-        for attempt in range(retries):
-            try:
-                receipt = await asyncio.to_thread(web3.eth.wait_for_transaction_receipt, tx_hash, timeout=300)
-                return receipt
-            except TransactionNotFound:
-                pass
-            except Exception as e:
-                self.log(
-                    f"{Fore.CYAN + Style.BRIGHT}   Message  :{Style.RESET_ALL}"
-                    f"{Fore.YELLOW + Style.BRIGHT} [Attempt {attempt + 1}] Wait for Receipt Error: {str(e)} {Style.RESET_ALL}"
-                )
-            await asyncio.sleep(2 ** attempt)
-        raise Exception("Transaction Receipt Not Found After Maximum Retries")
         
-    async def check_faucet_status(self, address: str, asset_address, use_proxy: bool):
+    async def scan_faucet_status(self, address: str, use_proxy: bool):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
             contract_address = web3.to_checksum_address(self.FAUCET_ROUTER_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.OPENFI_CONTRACT_ABI)
-            is_mintable = token_contract.functions.isMintable(web3.to_checksum_address(asset_address)).call()
 
-            return is_mintable
+            entries = [
+                (asset_address, contract_address, web3.to_bytes(hexstr=token_contract.encode_abi("isMintable", args=[web3.to_checksum_address(asset_address)])))
+                for asset_address in [self.GOLD_CONTRACT_ADDRESS, self.TSLA_CONTRACT_ADDRESS, self.NVIDIA_CONTRACT_ADDRESS]
+            ]
+            await self.faucet_index.scan(web3, entries, lambda is_mintable: 0 if is_mintable else float("inf"))
         except Exception as e:
-            self.log(
-                f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
-                f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
-            )
-            return None
+            self.log(f"{Fore.RED+Style.BRIGHT}Scan Faucet Status Failed: {str(e)}{Style.RESET_ALL}")
         
-    async def get_supplied_balance(self, address: str, asset_address, decimals: int, use_proxy: bool):
+    async def check_faucet_status(self, address: str, asset_address, use_proxy: bool):
+        is_mintable = self.faucet_index.is_eligible(asset_address)
+        if is_mintable is not None:
+            return is_mintable
+
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
-            asset = web3.to_checksum_address(asset_address)
-
-            contract_address = web3.to_checksum_address(self.POOL_PROVIDER_ADDRESS)
+            contract_address = web3.to_checksum_address(self.FAUCET_ROUTER_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.OPENFI_CONTRACT_ABI)
-            user_reserve_data = token_contract.functions.getUserReserveData(asset, address).call()
-            
-            supplied_balance = user_reserve_data[0] / (10 ** decimals)
+            is_mintable = await token_contract.functions.isMintable(web3.to_checksum_address(asset_address)).call()
 
-            return supplied_balance
+            return is_mintable
         except Exception as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
@@ -439,62 +419,56 @@ class OpenFi:
             )
             return None
         
-    async def get_borrowed_balance(self, address: str, asset_address, decimals: int, use_proxy: bool):
-        try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+    async def get_reserve_state(self, web3, asset: str, block_number: int):
+        contract_address = web3.to_checksum_address(self.POOL_PROVIDER_ADDRESS)
+        token_contract = web3.eth.contract(address=contract_address, abi=self.OPENFI_CONTRACT_ABI)
 
-            asset = web3.to_checksum_address(asset_address)
+        configuration_data, reserve_data = await asyncio.gather(
+            token_contract.functions.getReserveConfigurationData(asset).call(block_identifier=block_number),
+            token_contract.functions.getReserveData(asset).call(block_identifier=block_number)
+        )
 
-            contract_address = web3.to_checksum_address(self.POOL_PROVIDER_ADDRESS)
-            token_contract = web3.eth.contract(address=contract_address, abi=self.OPENFI_CONTRACT_ABI)
-            user_reserve_data = token_contract.functions.getUserReserveData(asset, address).call()
+        ltv = configuration_data[1]
 
-            stable_debt     = user_reserve_data[1]
-            variable_debt   = user_reserve_data[2]
+        total_token = reserve_data[2]
+        total_stable_debt = reserve_data[3]
+        total_variable_debt = reserve_data[4]
 
-            total_debt = (stable_debt + variable_debt) / (10 ** decimals)
+        available_liquidity = total_token - (total_stable_debt + total_variable_debt)
 
-            return total_debt
-        except Exception as e:
-            self.log(
-                f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
-                f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
-            )
-            return None
+        return ltv, available_liquidity
         
-    async def get_available_borrowed_balance(self, address: str, asset_address, decimals: int, use_proxy: bool):
+    async def get_reserve_snapshot(self, address: str, asset_address, use_proxy: bool):
         try:
             web3 = await self.get_web3_with_check(address, use_proxy)
 
             asset = web3.to_checksum_address(asset_address)
+            decimals = await self.token_registry.decimals(web3, asset)
 
             contract_address = web3.to_checksum_address(self.POOL_PROVIDER_ADDRESS)
             token_contract = web3.eth.contract(address=contract_address, abi=self.OPENFI_CONTRACT_ABI)
 
-            user_reserve_data = token_contract.functions.getUserReserveData(asset, address).call()
+            block_number = await self.block_cache.get(web3.provider.endpoint_uri, web3.eth.get_block_number)
+
+            user_reserve_data, (ltv, available_liquidity) = await asyncio.gather(
+                token_contract.functions.getUserReserveData(asset, address).call(block_identifier=block_number),
+                self.reserve_cache.get((asset, block_number), lambda: self.get_reserve_state(web3, asset, block_number))
+            )
+
             supplied_balance = user_reserve_data[0]
             stable_debt = user_reserve_data[1]
             variable_debt = user_reserve_data[2]
 
-            configuration_data = token_contract.functions.getReserveConfigurationData(asset).call()
-            ltv = configuration_data[1] 
-
-            reserve_data = token_contract.functions.getReserveData(asset).call()
-            total_token = reserve_data[2]
-            total_stable_debt = reserve_data[3]
-            total_variable_debt = reserve_data[4]
-
-            available_liquidity = total_token - (total_stable_debt + total_variable_debt)
-
             total_debt = stable_debt + variable_debt
             max_borrow_from_collateral = (supplied_balance * ltv) // 10000
-            available_to_borrow = max_borrow_from_collateral - total_debt
-            if available_to_borrow < 0:
-                available_to_borrow = 0
+            available_to_borrow = max(0, max_borrow_from_collateral - total_debt)
+            available_to_borrow = min(available_to_borrow, available_liquidity)
 
-            available_to_borrow = min(available_to_borrow, available_liquidity) / (10 ** decimals)
-
-            return available_to_borrow
+            return {
+                "supplied": supplied_balance / (10 ** decimals),
+                "borrowed": total_debt / (10 ** decimals),
+                "available_to_borrow": available_to_borrow / (10 ** decimals)
+            }
         except Exception as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
@@ -502,39 +476,53 @@ class OpenFi:
             )
             return None
         
+    def get_supplied_balance(self, snapshot: dict):
+        if not snapshot:
+            return None
+
+        return snapshot["supplied"]
+        
+    def get_borrowed_balance(self, snapshot: dict):
+        if not snapshot:
+            return None
+
+        return snapshot["borrowed"]
+        
+    def get_available_borrowed_balance(self, snapshot: dict):
+        if not snapshot:
+            return None
+
+        return snapshot["available_to_borrow"]
+        
     async def mint_faucet(self, account: str, address: str, asset_address: str, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             router_address = web3.to_checksum_address(self.FAUCET_ROUTER_ADDRESS)
             router_contract = web3.eth.contract(address=router_address, abi=self.OPENFI_CONTRACT_ABI)
 
             asset_address = web3.to_checksum_address(asset_address)
-            asset_contract = web3.eth.contract(address=asset_address, abi=self.ERC20_CONTRACT_ABI)
 
-            decimals = asset_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, asset_address)
 
             amount_to_wei = int(100 * (10 ** decimals))
             mint_data = router_contract.functions.mint(asset_address, address, amount_to_wei)
-            estimated_gas = mint_data.estimate_gas({"from": address})
+            estimated_gas = await mint_data.estimate_gas({"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            mint_tx = mint_data.build_transaction({
+            mint_tx = await mint_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, mint_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, mint_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -546,7 +534,7 @@ class OpenFi:
         
     async def perform_deposit(self, account: str, address: str, amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             amount_to_wei = web3.to_wei(amount, "ether")
 
@@ -554,26 +542,23 @@ class OpenFi:
             router_contract = web3.eth.contract(address=router_address, abi=self.OPENFI_CONTRACT_ABI)
 
             deposit_data = router_contract.functions.depositETH(self.LENDING_POOL_ADDRESS, address, 0)
-            estimated_gas = deposit_data.estimate_gas({"from": address, "value": amount_to_wei})
+            estimated_gas = await self.gas_profile.estimate(deposit_data, {"from": address, "value": amount_to_wei})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            deposit_tx = deposit_data.build_transaction({
+            deposit_tx = await deposit_data.build_transaction({
                 "from": address,
                 "value": amount_to_wei,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, deposit_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, deposit_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -585,36 +570,38 @@ class OpenFi:
         
     async def approving_token(self, account: str, address: str, router_address: str, asset_address: str, amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             
             spender = web3.to_checksum_address(router_address)
             token_contract = web3.eth.contract(address=web3.to_checksum_address(asset_address), abi=self.ERC20_CONTRACT_ABI)
-            decimals = token_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, asset_address)
             
             amount_to_wei = int(amount * (10 ** decimals))
 
-            allowance = token_contract.functions.allowance(address, spender).call()
+            allowance = self.allowance_ledger.get(address, asset_address, spender)
+            if allowance is None:
+                allowance = await token_contract.functions.allowance(address, spender).call()
+                self.allowance_ledger.record(address, asset_address, spender, allowance)
+
             if allowance < amount_to_wei:
                 approve_data = token_contract.functions.approve(spender, 2**256 - 1)
-                estimated_gas = approve_data.estimate_gas({"from": address})
+                estimated_gas = await self.gas_profile.estimate(approve_data, {"from": address})
 
-                max_priority_fee = web3.to_wei(1, "gwei")
-                max_fee = max_priority_fee
+                max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-                approve_tx = approve_data.build_transaction({
+                approve_tx = await approve_data.build_transaction({
                     "from": address,
                     "gas": int(estimated_gas * 1.2),
                     "maxFeePerGas": int(max_fee),
                     "maxPriorityFeePerGas": int(max_priority_fee),
-                    "nonce": self.used_nonce[address],
-                    "chainId": web3.eth.chain_id,
+                    "chainId": await self.web3_pool.chain.chain_id(web3),
                 })
 
-                tx_hash = await self.send_raw_transaction_with_retries(account, web3, approve_tx)
-                receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+                tx_hash = await self.sender.send(account, web3, approve_tx, substep="approve")
+                receipt = await self.sender.wait(web3, tx_hash)
+                self.allowance_ledger.record(address, asset_address, spender, 2**256 - 1)
 
                 block_number = receipt.blockNumber
-                self.used_nonce[address] += 1
 
                 explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
                 
@@ -642,7 +629,7 @@ class OpenFi:
         
     async def perform_supply(self, account: str, address: str, asset_address: str, supply_amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             await self.approving_token(account, address, self.POOL_ROUTER_ADDRESS, asset_address, supply_amount, use_proxy)
 
@@ -650,33 +637,31 @@ class OpenFi:
             router_contract = web3.eth.contract(address=router_address, abi=self.OPENFI_CONTRACT_ABI)
 
             token_address = web3.to_checksum_address(asset_address)
-            token_contract = web3.eth.contract(address=token_address, abi=self.ERC20_CONTRACT_ABI)
-            decimals = token_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, token_address)
 
             amount_to_wei = int(supply_amount * (10 ** decimals))
             supply_data = router_contract.functions.supply(token_address, amount_to_wei, address, 0)
-            estimated_gas = supply_data.estimate_gas({"from": address})
+            estimated_gas = await self.gas_profile.estimate(supply_data, {"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            supply_tx = supply_data.build_transaction({
+            supply_tx = await supply_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, supply_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, supply_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
+            if is_allowance_error(e):
+                self.allowance_ledger.forget(address)
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
@@ -685,36 +670,32 @@ class OpenFi:
         
     async def perform_borrow(self, account: str, address: str, asset_address: str, borrow_amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             router_address = web3.to_checksum_address(self.POOL_ROUTER_ADDRESS)
             router_contract = web3.eth.contract(address=router_address, abi=self.OPENFI_CONTRACT_ABI)
 
             token_address = web3.to_checksum_address(asset_address)
-            token_contract = web3.eth.contract(address=token_address, abi=self.ERC20_CONTRACT_ABI)
-            decimals = token_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, token_address)
 
             amount_to_wei = int(borrow_amount * (10 ** decimals))
             borrow_data = router_contract.functions.borrow(token_address, amount_to_wei, 2, 0, address)
-            estimated_gas = borrow_data.estimate_gas({"from": address})
+            estimated_gas = await self.gas_profile.estimate(borrow_data, {"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            borrow_tx = borrow_data.build_transaction({
+            borrow_tx = await borrow_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, borrow_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, borrow_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -726,7 +707,7 @@ class OpenFi:
         
     async def perform_repay(self, account: str, address: str, asset_address: str, repay_amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             await self.approving_token(account, address, self.POOL_ROUTER_ADDRESS, asset_address, repay_amount, use_proxy)
 
@@ -734,33 +715,31 @@ class OpenFi:
             router_contract = web3.eth.contract(address=router_address, abi=self.OPENFI_CONTRACT_ABI)
 
             token_address = web3.to_checksum_address(asset_address)
-            token_contract = web3.eth.contract(address=token_address, abi=self.ERC20_CONTRACT_ABI)
-            decimals = token_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, token_address)
 
             amount_to_wei = int(repay_amount * (10 ** decimals))
             repay_data = router_contract.functions.repay(token_address, amount_to_wei, 2, address)
-            estimated_gas = repay_data.estimate_gas({"from": address})
+            estimated_gas = await self.gas_profile.estimate(repay_data, {"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            repay_tx = repay_data.build_transaction({
+            repay_tx = await repay_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, repay_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, repay_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
+            if is_allowance_error(e):
+                self.allowance_ledger.forget(address)
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Message  :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
@@ -769,36 +748,32 @@ class OpenFi:
         
     async def perform_withdraw(self, account: str, address: str, asset_address: str, withdraw_amount: float, use_proxy: bool):
         try:
-            web3 = await self.get_web3_with_check(address, use_proxy)
+            web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
 
             router_address = web3.to_checksum_address(self.POOL_ROUTER_ADDRESS)
             router_contract = web3.eth.contract(address=router_address, abi=self.OPENFI_CONTRACT_ABI)
 
             token_address = web3.to_checksum_address(asset_address)
-            token_contract = web3.eth.contract(address=token_address, abi=self.ERC20_CONTRACT_ABI)
-            decimals = token_contract.functions.decimals().call()
+            decimals = await self.token_registry.decimals(web3, token_address)
 
             amount_to_wei = int(withdraw_amount * (10 ** decimals))
             withdraw_data = router_contract.functions.withdraw(token_address, amount_to_wei, address)
-            estimated_gas = withdraw_data.estimate_gas({"from": address})
+            estimated_gas = await self.gas_profile.estimate(withdraw_data, {"from": address})
 
-            max_priority_fee = web3.to_wei(1, "gwei")
-            max_fee = max_priority_fee
+            max_fee, max_priority_fee = await self.web3_pool.chain.fees(web3)
 
-            withdraw_tx = withdraw_data.build_transaction({
+            withdraw_tx = await withdraw_data.build_transaction({
                 "from": address,
                 "gas": int(estimated_gas * 1.2),
                 "maxFeePerGas": int(max_fee),
                 "maxPriorityFeePerGas": int(max_priority_fee),
-                "nonce": self.used_nonce[address],
-                "chainId": web3.eth.chain_id,
+                "chainId": await self.web3_pool.chain.chain_id(web3),
             })
 
-            tx_hash = await self.send_raw_transaction_with_retries(account, web3, withdraw_tx)
-            receipt = await self.wait_for_receipt_with_retries(web3, tx_hash)
+            tx_hash = await self.sender.send(account, web3, withdraw_tx)
+            receipt = await self.sender.wait(web3, tx_hash)
 
             block_number = receipt.blockNumber
-            self.used_nonce[address] += 1
 
             return tx_hash, block_number
         except Exception as e:
@@ -809,7 +784,12 @@ class OpenFi:
             return None, None
         
     async def print_timer(self):
-        for remaining in range(random.randint(self.min_delay, self.max_delay), 0, -1):
+        delay = random.randint(self.min_delay, self.max_delay)
+        if self.workers > 1:
+            await asyncio.sleep(delay)
+            return
+
+        for remaining in range(delay, 0, -1):
             print(
                 f"{Fore.CYAN + Style.BRIGHT}[ {datetime.now().astimezone(wib).strftime('%x %X %Z')} ]{Style.RESET_ALL}"
                 f"{Fore.WHITE + Style.BRIGHT} | {Style.RESET_ALL}"
@@ -959,6 +939,18 @@ class OpenFi:
             except ValueError:
                 print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
         
+    def print_worker_question(self):
+        while True:
+            try:
+                workers = int(input(f"{Fore.YELLOW + Style.BRIGHT}Concurrent Accounts -> {Style.RESET_ALL}").strip())
+                if workers > 0:
+                    self.workers = workers
+                    break
+                else:
+                    print(f"{Fore.RED + Style.BRIGHT}Concurrent Accounts must be > 0.{Style.RESET_ALL}")
+            except ValueError:
+                print(f"{Fore.RED + Style.BRIGHT}Invalid input. Enter a number.{Style.RESET_ALL}")
+
     def print_question(self):
         while True:
             try:
@@ -1052,12 +1044,12 @@ class OpenFi:
         return option, proxy_choice, rotate_proxy
     
     async def check_connection(self, proxy_url=None):
-        connector, proxy, proxy_auth = self.build_proxy_config(proxy_url)
+        proxy, proxy_auth = self.build_proxy_config(proxy_url)
         try:
-            async with ClientSession(connector=connector, timeout=ClientTimeout(total=30)) as session:
-                async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth) as response:
-                    response.raise_for_status()
-                    return True
+            session = self.session_pool.get("https://api.ipify.org?format=json", proxy_url)
+            async with session.get(url="https://api.ipify.org?format=json", proxy=proxy, proxy_auth=proxy_auth, timeout=ClientTimeout(total=30)) as response:
+                response.raise_for_status()
+                return True
         except (Exception, ClientResponseError) as e:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -1091,6 +1083,7 @@ class OpenFi:
         if is_mintable:
             tx_hash, block_number = await self.mint_faucet(account, address, asset_address, use_proxy)
             if tx_hash and block_number:
+                self.faucet_index.mark(asset_address, None)
                 explorer = f"https://testnet.pharosscan.xyz/tx/{tx_hash}"
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}   Status   :{Style.RESET_ALL}"
@@ -1139,11 +1132,13 @@ class OpenFi:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status   :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_perform_supply(self, account: str, address: str, asset_address: str, supply_amount: float, ticker: str, use_proxy: bool):
         tx_hash, block_number = await self.perform_supply(account, address, asset_address, supply_amount, use_proxy)
@@ -1165,11 +1160,13 @@ class OpenFi:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status   :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_perform_borrow(self, account: str, address: str, asset_address: str, borrow_amount: float, ticker: str, use_proxy: bool):
         tx_hash, block_number = await self.perform_borrow(account, address, asset_address, borrow_amount, use_proxy)
@@ -1191,11 +1188,13 @@ class OpenFi:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status   :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
             
     async def process_perform_repay(self, account: str, address: str, asset_address: str, repay_amount: float, ticker: str, use_proxy: bool):
         tx_hash, block_number = await self.perform_repay(account, address, asset_address, repay_amount, use_proxy)
@@ -1217,11 +1216,13 @@ class OpenFi:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status   :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_perform_withdraw(self, account: str, address: str, asset_address: str, withdraw_amount: float, ticker: str, use_proxy: bool):
         tx_hash, block_number = await self.perform_withdraw(account, address, asset_address, withdraw_amount, use_proxy)
@@ -1243,11 +1244,13 @@ class OpenFi:
                 f"{Fore.CYAN+Style.BRIGHT}   Explorer :{Style.RESET_ALL}"
                 f"{Fore.WHITE+Style.BRIGHT} {explorer} {Style.RESET_ALL}"
             )
+            return True
         else:
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Status   :{Style.RESET_ALL}"
                 f"{Fore.RED+Style.BRIGHT} Perform On-Chain Failed {Style.RESET_ALL}"
             )
+            return False
 
     async def process_option_1(self, account: str, address: str, use_proxy: bool):
         self.log(
@@ -1284,6 +1287,9 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.deposit_count} {Style.RESET_ALL}                                   "
             )
 
+            if self.sender.skip(step=f"deposit:{i}"):
+                continue
+
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Assets   :{Style.RESET_ALL}"
                 f"{Fore.BLUE+Style.BRIGHT} PHRS {Style.RESET_ALL}                                   "
@@ -1294,7 +1300,7 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.deposit_amount} PHRS {Style.RESET_ALL}"
             )
 
-            balance = await self.get_token_balance(address, self.PHRS_CONTRACT_ADDRESS, use_proxy)
+            balance = await self.get_token_balance(address, self.PHRS_CONTRACT_ADDRESS, use_proxy, self.deposit_amount)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Balance  :{Style.RESET_ALL}"
@@ -1308,8 +1314,11 @@ class OpenFi:
                 )
                 return
 
-            await self.process_perform_deposit(account, address, self.deposit_amount, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path="deposit"):
+                continue
+
+            if self.state.record("deposit", await self.process_perform_deposit(account, address, self.deposit_amount, use_proxy)):
+                await self.print_timer()
 
     async def process_option_3(self, account: str, address: str, use_proxy: bool):
         self.log(
@@ -1326,7 +1335,10 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.supply_count} {Style.RESET_ALL}                                   "
             )
 
-            ticker, asset_address, decimals = self.generate_random_option()
+            if self.sender.skip(step=f"supply:{i}"):
+                continue
+
+            ticker, asset_address = self.generate_random_option()
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Assets   :{Style.RESET_ALL}"
@@ -1338,7 +1350,7 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.supply_amount} {ticker} {Style.RESET_ALL}"
             )
 
-            balance = await self.get_token_balance(address, asset_address, use_proxy)
+            balance = await self.get_token_balance(address, asset_address, use_proxy, self.supply_amount)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Balance  :{Style.RESET_ALL}"
@@ -1352,8 +1364,11 @@ class OpenFi:
                 )
                 continue
 
-            await self.process_perform_supply(account, address, asset_address, self.supply_amount, ticker, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path=("supply", asset_address)):
+                continue
+
+            if self.state.record(("supply", asset_address), await self.process_perform_supply(account, address, asset_address, self.supply_amount, ticker, use_proxy)):
+                await self.print_timer()
 
     async def process_option_4(self, account: str, address: str, use_proxy: bool):
         self.log(
@@ -1370,7 +1385,10 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.borrow_count} {Style.RESET_ALL}                                   "
             )
 
-            ticker, asset_address, decimals = self.generate_random_option()
+            if self.sender.skip(step=f"borrow:{i}"):
+                continue
+
+            ticker, asset_address = self.generate_random_option()
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Assets   :{Style.RESET_ALL}"
@@ -1382,7 +1400,8 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.borrow_amount} {ticker} {Style.RESET_ALL}"
             )
 
-            available_to_borrow = await self.get_available_borrowed_balance(address, asset_address, decimals, use_proxy)
+            snapshot = await self.get_reserve_snapshot(address, asset_address, use_proxy)
+            available_to_borrow = self.get_available_borrowed_balance(snapshot)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Available:{Style.RESET_ALL}"
@@ -1396,8 +1415,11 @@ class OpenFi:
                 )
                 continue
 
-            await self.process_perform_borrow(account, address, asset_address, self.borrow_amount, ticker, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path=("borrow", asset_address)):
+                continue
+
+            if self.state.record(("borrow", asset_address), await self.process_perform_borrow(account, address, asset_address, self.borrow_amount, ticker, use_proxy)):
+                await self.print_timer()
 
     async def process_option_5(self, account: str, address: str, use_proxy: bool):
         self.log(
@@ -1414,7 +1436,10 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.repay_count} {Style.RESET_ALL}                                   "
             )
 
-            ticker, asset_address, decimals = self.generate_random_option()
+            if self.sender.skip(step=f"repay:{i}"):
+                continue
+
+            ticker, asset_address = self.generate_random_option()
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Assets   :{Style.RESET_ALL}"
@@ -1426,7 +1451,8 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.repay_amount} {ticker} {Style.RESET_ALL}"
             )
 
-            borrowed_balance = await self.get_borrowed_balance(address, asset_address, decimals, use_proxy)
+            snapshot = await self.get_reserve_snapshot(address, asset_address, use_proxy)
+            borrowed_balance = self.get_borrowed_balance(snapshot)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Borrowed :{Style.RESET_ALL}"
@@ -1440,7 +1466,7 @@ class OpenFi:
                 )
                 continue
 
-            balance = await self.get_token_balance(address, asset_address, use_proxy)
+            balance = await self.get_token_balance(address, asset_address, use_proxy, self.repay_amount)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Balance  :{Style.RESET_ALL}"
@@ -1454,8 +1480,11 @@ class OpenFi:
                 )
                 continue
 
-            await self.process_perform_repay(account, address, asset_address, self.repay_amount, ticker, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path=("repay", asset_address)):
+                continue
+
+            if self.state.record(("repay", asset_address), await self.process_perform_repay(account, address, asset_address, self.repay_amount, ticker, use_proxy)):
+                await self.print_timer()
 
     async def process_option_6(self, account: str, address: str, use_proxy: bool):
         self.log(
@@ -1472,7 +1501,10 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.withdraw_count} {Style.RESET_ALL}                                   "
             )
 
-            ticker, asset_address, decimals = self.generate_random_option()
+            if self.sender.skip(step=f"withdraw:{i}"):
+                continue
+
+            ticker, asset_address = self.generate_random_option()
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Assets   :{Style.RESET_ALL}"
@@ -1484,7 +1516,8 @@ class OpenFi:
                 f"{Fore.WHITE+Style.BRIGHT} {self.withdraw_amount} {ticker} {Style.RESET_ALL}"
             )
 
-            supplied_balance = await self.get_supplied_balance(address, asset_address, decimals, use_proxy)
+            snapshot = await self.get_reserve_snapshot(address, asset_address, use_proxy)
+            supplied_balance = self.get_supplied_balance(snapshot)
 
             self.log(
                 f"{Fore.CYAN+Style.BRIGHT}   Supplied :{Style.RESET_ALL}"
@@ -1498,15 +1531,18 @@ class OpenFi:
                 )
                 continue
 
-            await self.process_perform_withdraw(account, address, asset_address, self.withdraw_amount, ticker, use_proxy)
-            await self.print_timer()
+            if self.sender.skip(path=("withdraw", asset_address)):
+                continue
+
+            if self.state.record(("withdraw", asset_address), await self.process_perform_withdraw(account, address, asset_address, self.withdraw_amount, ticker, use_proxy)):
+                await self.print_timer()
 
     async def process_accounts(self, account: str, address: str, option: int, use_proxy: bool, rotate_proxy: bool):
         is_valid = await self.process_check_connection(address, use_proxy, rotate_proxy)
         if is_valid:
             
             try:
-                web3 = await self.get_web3_with_check(address, use_proxy)
+                web3 = await self.get_web3_with_check(address, use_proxy, pin=True)
             except Exception as e:
                 self.log(
                     f"{Fore.CYAN+Style.BRIGHT}Status  :{Style.RESET_ALL}"
@@ -1514,9 +1550,11 @@ class OpenFi:
                     f"{Fore.MAGENTA+Style.BRIGHT}-{Style.RESET_ALL}"
                     f"{Fore.YELLOW+Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
                 )
-                return
+                return False
             
-            self.used_nonce[address] = web3.eth.get_transaction_count(address, "pending")
+            await self.state.nonces.sync(web3)
+            await self.allowance_ledger.scan(web3, address, self.allowance_pairs)
+            await self.balance_ledger.seed(web3, address, self.balance_tokens)
 
             if option == 1:
                 self.log(
@@ -1577,15 +1615,60 @@ class OpenFi:
 
                 await self.process_option_6(account, address, use_proxy)
 
+            return True
+
+        return False
+
+    async def process_account_task(self, account: str, option: int, use_proxy: bool, rotate_proxy: bool):
+        address = self.generate_address(account)
+        current_account.set(AccountState(account, address, self.mask_account(address)))
+
+        separator = "=" * 25
+        self.log(
+            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
+            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
+            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
+        )
+
+        if not address:
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.open_run(self.journal, option)
+
+        try:
+            success = await self.process_accounts(account, address, option, use_proxy, rotate_proxy)
+        except Exception as e:
+            self.state.close_run("failed")
+            self.log(
+                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
+                f"{Fore.RED + Style.BRIGHT} {str(e)} {Style.RESET_ALL}"
+            )
+            return False
+
+        self.state.close_run("finished" if success else "failed")
+        await asyncio.sleep(3)
+        return success
+
     async def main(self):
         try:
             with open('accounts.txt', 'r') as file:
                 accounts = [line.strip() for line in file if line.strip()]
 
             option, proxy_choice, rotate_proxy = self.print_question()
+            self.print_worker_question()
+            self.signer.offload = self.workers > 1
 
             use_proxy = True if proxy_choice == 1 else False
 
+            for account in accounts:
+                self.scheduler.schedule(account, 0)
+
+            await self.journal.reconcile(await self.web3_pool.get())
+
             while True:
                 self.clear_terminal()
                 self.welcome()
@@ -1596,30 +1679,32 @@ class OpenFi:
 
                 if use_proxy:
                     await self.load_proxies()
+
+                due_accounts = self.scheduler.pop_due()
+                addresses = [address for address in map(self.generate_address, due_accounts) if address]
+                if addresses:
+                    await self.scan_faucet_status(addresses[0], use_proxy)
                 
-                separator = "=" * 25
-                for account in accounts:
-                    if account:
-                        address = self.generate_address(account)
-
-                        self.log(
-                            f"{Fore.CYAN + Style.BRIGHT}{separator}[{Style.RESET_ALL}"
-                            f"{Fore.WHITE + Style.BRIGHT} {self.mask_account(address)} {Style.RESET_ALL}"
-                            f"{Fore.CYAN + Style.BRIGHT}]{separator}{Style.RESET_ALL}"
-                        )
-
-                        if not address:
-                            self.log(
-                                f"{Fore.CYAN + Style.BRIGHT}Status  :{Style.RESET_ALL}"
-                                f"{Fore.RED + Style.BRIGHT} Invalid Private Key or Library Version Not Supported {Style.RESET_ALL}"
-                            )
-                            continue
-
-                        await self.process_accounts(account, address, option, use_proxy, rotate_proxy)
-                        await asyncio.sleep(3)
+                runner = AccountRunner(self.workers)
+                report = await runner.run(due_accounts, lambda account: self.process_account_task(account, option, use_proxy, rotate_proxy))
 
                 self.log(f"{Fore.CYAN + Style.BRIGHT}={Style.RESET_ALL}"*72)
-                seconds = 24 * 60 * 60
+                self.log(
+                    f"{Fore.GREEN + Style.BRIGHT}Throughput     : {Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT}{report['processed']} Accounts in {self.format_seconds(report['elapsed'])} {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} {report['per_minute']:.2f} Accounts/Min {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.WHITE + Style.BRIGHT} x{report['parallelism']:.1f} Parallel {Style.RESET_ALL}"
+                    f"{Fore.MAGENTA + Style.BRIGHT}-{Style.RESET_ALL}"
+                    f"{Fore.RED + Style.BRIGHT} {report['failed']} Failed {Style.RESET_ALL}"
+                )
+
+                # isMintable exposes no claim timestamp or cooldown, so accounts fall back to the daily interval
+                for account in due_accounts:
+                    self.scheduler.schedule(account)
+
+                seconds = self.scheduler.seconds_until_due()
                 while seconds > 0:
                     formatted_time = self.format_seconds(seconds)
                     print(
@@ -1630,8 +1715,8 @@ class OpenFi:
                         f"{Fore.BLUE+Style.BRIGHT}All Accounts Have Been Processed.{Style.RESET_ALL}",
                         end="\r"
                     )
-                    await asyncio.sleep(1)
-                    seconds -= 1
+                    await asyncio.sleep(min(1, seconds))
+                    seconds = self.scheduler.seconds_until_due()
 
         except FileNotFoundError:
             self.log(f"{Fore.RED}File 'accounts.txt' Not Found.{Style.RESET_ALL}")
@@ -1639,6 +1724,10 @@ class OpenFi:
         except Exception as e:
             self.log(f"{Fore.RED+Style.BRIGHT}Error: {e}{Style.RESET_ALL}")
             raise e
+        finally:
+            await self.web3_pool.close()
+            await self.session_pool.close()
+            self.signer.close()
 
 if __name__ == "__main__":
     try:
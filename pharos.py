@@ -0,0 +1,1571 @@
+from web3 import AsyncWeb3
+from web3.exceptions import ContractLogicError, TransactionNotFound
+from aiohttp import ClientSession, ClientTimeout, ClientError, ClientConnectionError, TCPConnector, TraceConfig, DummyCookieJar
+from aiohttp_socks import ProxyConnector
+from eth_account import Account
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from colorama import Fore, Style
+import asyncio, heapq, json, random, sqlite3, time, uuid, os
+
+current_account = ContextVar("current_account", default=None)
+
+NONCE_ERRORS = ("nonce too low", "replacement transaction underpriced", "invalid nonce", "nonce has already been used")
+KNOWN_TX_ERRORS = ("already known", "known transaction")
+ALLOWANCE_ERRORS = ("allowance", "0xfb8f41b2", "transferfrom failed", "transfer_from_failed")
+FEE_ERRORS = ("underpriced", "fee cap less than block base fee", "max fee per gas less than block base fee", "fee too low", "tip too low")
+FATAL_ERRORS = (
+    "insufficient funds", "execution reverted", "gas required exceeds", "intrinsic gas too low",
+    "exceeds block gas limit", "invalid sender", "invalid signature", "chain id", "already claimed"
+)
+FAILOVER_ERRORS = (
+    "timeout", "timed out", "cannot connect", "connection reset", "connection refused", "server disconnected",
+    "bad gateway", "service unavailable", "gateway time-out", "header not found"
+)
+
+RETRY_FATAL = "fatal"
+RETRY_SAME = "retry"
+RETRY_RESYNC = "resync"
+RETRY_FAILOVER = "failover"
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+NATIVE_ADDRESS = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+
+AGGREGATE3 = AsyncWeb3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+GET_ETH_BALANCE = AsyncWeb3.keccak(text="getEthBalance(address)")[:4]
+BALANCE_OF = AsyncWeb3.keccak(text="balanceOf(address)")[:4]
+ALLOWANCE = AsyncWeb3.keccak(text="allowance(address,address)")[:4]
+DECIMALS = AsyncWeb3.keccak(text="decimals()")[:4]
+SYMBOL = AsyncWeb3.keccak(text="symbol()")[:4]
+
+TRANSFER_TOPIC = bytes(AsyncWeb3.keccak(text="Transfer(address,address,uint256)"))
+DEPOSIT_TOPIC = bytes(AsyncWeb3.keccak(text="Deposit(address,uint256)"))
+WITHDRAWAL_TOPIC = bytes(AsyncWeb3.keccak(text="Withdrawal(address,uint256)"))
+
+UNBATCHED_METHODS = ("eth_sendRawTransaction",)
+
+def is_nonce_error(error):
+    message = str(error).lower()
+    return any(text in message for text in NONCE_ERRORS)
+
+def is_known_transaction(error):
+    message = str(error).lower()
+    return any(text in message for text in KNOWN_TX_ERRORS)
+
+class BatchHTTPProvider(AsyncWeb3.AsyncHTTPProvider):
+    def __init__(self, endpoint_uri: str, batch_window=0.005, max_batch=20, **kwargs) -> None:
+        super().__init__(endpoint_uri, **kwargs)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batching = True
+        self.queue = {}
+        self.flush_handle = None
+        self.flush_tasks = set()
+        self.monitor = None
+
+    async def make_request(self, method, params):
+        if not self.batching or method in UNBATCHED_METHODS:
+            return await self.send_one(method, params)
+
+        key = (method, repr(params))
+        entry = self.queue.get(key)
+        if entry is None:
+            entry = (method, params, asyncio.get_running_loop().create_future())
+            self.queue[key] = entry
+
+            if len(self.queue) >= self.max_batch:
+                self.flush()
+            elif self.flush_handle is None:
+                self.flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self.flush)
+
+        return await asyncio.shield(entry[2])
+
+    async def send_one(self, method, params):
+        return await self.timed(super().make_request(method, params))
+
+    async def timed(self, request):
+        started = time.monotonic()
+        try:
+            response = await request
+        except Exception as e:
+            if self.monitor:
+                self.monitor(error=e)
+            raise
+        if self.monitor:
+            self.monitor(time.monotonic() - started)
+        return response
+
+    def flush(self):
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        queue, self.queue = list(self.queue.values()), {}
+        if queue:
+            task = asyncio.get_running_loop().create_task(self.send_batch(queue))
+            self.flush_tasks.add(task)
+            task.add_done_callback(self.flush_tasks.discard)
+
+    async def send_batch(self, queue):
+        try:
+            if len(queue) == 1:
+                method, params, _ = queue[0]
+                responses = [await self.send_one(method, params)]
+            else:
+                responses = await self.timed(self.make_batch_request([(method, params) for method, params, _ in queue]))
+                if not isinstance(responses, list) or len(responses) != len(queue):
+                    self.batching = False
+                    responses = await asyncio.gather(*(self.send_one(method, params) for method, params, _ in queue), return_exceptions=True)
+        except Exception as e:
+            responses = [e] * len(queue)
+
+        for (_, _, future), response in zip(queue, responses):
+            if future.done():
+                continue
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+def is_allowance_error(error):
+    message = str(error).lower()
+    return any(text in message for text in ALLOWANCE_ERRORS)
+
+class TransactionReverted(Exception):
+    def __init__(self, tx_hash: str, block_number: int, reason=None) -> None:
+        self.tx_hash = tx_hash
+        self.block_number = block_number
+        self.reason = reason
+        super().__init__(f"Transaction Reverted: {reason or 'Unknown Reason'}")
+
+async def revert_reason(web3, tx_hash: str, receipt):
+    try:
+        tx = await web3.eth.get_transaction(tx_hash)
+    except Exception:
+        return None
+
+    if receipt["gasUsed"] >= tx["gas"]:
+        return "Out of Gas"
+
+    call = {"from": tx["from"], "to": tx["to"], "data": tx["input"], "value": tx["value"], "gas": tx["gas"]}
+    try:
+        await web3.eth.call(call, block_identifier=receipt["blockNumber"])
+    except ContractLogicError as e:
+        return e.message
+    except Exception as e:
+        return str(e)
+    return None
+
+def error_status(error):
+    status = getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def classify_error(error):
+    if isinstance(error, (ContractLogicError, TransactionReverted)):
+        return RETRY_FATAL
+
+    status = error_status(error)
+    if status in (408, 425, 429):
+        return RETRY_SAME
+    if status is not None and 400 <= status < 500:
+        return RETRY_FATAL
+    if status is not None and status >= 500:
+        return RETRY_FAILOVER
+
+    if isinstance(error, (asyncio.TimeoutError, ClientConnectionError)):
+        return RETRY_FAILOVER
+
+    message = str(error).lower()
+    if is_nonce_error(error) or any(text in message for text in FEE_ERRORS):
+        return RETRY_RESYNC
+    if any(text in message for text in FATAL_ERRORS):
+        return RETRY_FATAL
+    if any(text in message for text in FAILOVER_ERRORS):
+        return RETRY_FAILOVER
+    return RETRY_SAME
+
+class RetryPolicy:
+    def __init__(self, backoff=None, jitter=0.5) -> None:
+        self.backoff = {
+            RETRY_SAME: (1, 8),
+            RETRY_RESYNC: (0.5, 2),
+            RETRY_FAILOVER: (2, 15),
+            **(backoff or {})
+        }
+        self.jitter = jitter
+
+    def should_retry(self, kind):
+        return kind != RETRY_FATAL
+
+    def delay(self, kind, attempt):
+        base, cap = self.backoff.get(kind, self.backoff[RETRY_SAME])
+        delay = min(cap, base * 2 ** attempt)
+        return delay * (1 - self.jitter * random.random())
+
+    async def sleep(self, kind, attempt):
+        await asyncio.sleep(self.delay(kind, attempt))
+
+def parse_retry_after(value, limit=60):
+    if not value:
+        return None
+    try:
+        return min(limit, max(0.0, float(value)))
+    except ValueError:
+        pass
+    try:
+        return min(limit, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+    except (TypeError, ValueError):
+        return None
+
+class RateLimiter:
+    def __init__(self, rate=10, burst=None, concurrency=8, min_rate=0.5, recovery=0.05) -> None:
+        self.rate = rate
+        self.current_rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.min_rate = min(min_rate, rate)
+        self.recovery = recovery
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.slots = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        await self.slots.acquire()
+        try:
+            async with self.lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self.paused_until:
+                        await asyncio.sleep(self.paused_until - now)
+                        continue
+
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.current_rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self.tokens) / self.current_rate)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, status=None, retry_after=None):
+        self.slots.release()
+
+        if status in (429, 503):
+            self.current_rate = max(self.min_rate, self.current_rate / 2)
+            self.tokens = min(self.tokens, 0)
+            delay = parse_retry_after(retry_after) or 1 / self.current_rate
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        elif status is not None and status < 400:
+            self.current_rate = min(self.rate, self.current_rate + self.rate * self.recovery)
+
+class RateLimits:
+    def __init__(self, hosts=None, default=None) -> None:
+        self.hosts = {host.lower(): options for host, options in (hosts or {}).items()}
+        self.default = default or {"rate": 10, "burst": 20, "concurrency": 8}
+        self.limiters = {}
+
+    @classmethod
+    def from_config(cls, filename="limits.json"):
+        config = {}
+        try:
+            if os.path.exists(filename):
+                with open(filename, "r") as f:
+                    config = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            config = {}
+
+        if not isinstance(config, dict):
+            config = {}
+        return cls(config.get("hosts"), config.get("default"))
+
+    def get(self, url):
+        host = (urlparse(str(url)).hostname or str(url)).lower()
+        if host not in self.limiters:
+            self.limiters[host] = RateLimiter(**self.hosts.get(host, self.default))
+        return self.limiters[host]
+
+    async def on_request_start(self, session, context, params):
+        limiter = self.get(params.url)
+        await limiter.acquire()
+        context.limiter = limiter
+
+    async def on_request_end(self, session, context, params):
+        limiter = getattr(context, "limiter", None)
+        if limiter:
+            context.limiter = None
+            limiter.release(params.response.status, params.response.headers.get("Retry-After"))
+
+    async def on_request_exception(self, session, context, params):
+        limiter = getattr(context, "limiter", None)
+        if limiter:
+            context.limiter = None
+            headers = getattr(params.exception, "headers", None) or {}
+            limiter.release(getattr(params.exception, "status", None), headers.get("Retry-After"))
+
+    def trace_config(self):
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self.on_request_start)
+        trace_config.on_request_end.append(self.on_request_end)
+        trace_config.on_request_exception.append(self.on_request_exception)
+        return trace_config
+
+class EndpointHealth:
+    def __init__(self, failure_threshold=3, cooldown=60, alpha=0.3) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.latency = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.open_until = 0
+        self.error = None
+
+    def record(self, latency=None, error=None):
+        if error is None:
+            self.latency = latency if self.latency is None else (1 - self.alpha) * self.latency + self.alpha * latency
+            self.error_rate *= 1 - self.alpha
+            self.failures = 0
+            self.open_until = 0
+            self.error = None
+            return
+
+        self.error_rate = (1 - self.alpha) * self.error_rate + self.alpha
+        self.failures += 1
+        self.error = str(error)
+        if self.failures >= self.failure_threshold:
+            self.open_until = time.time() + self.cooldown
+
+    def is_open(self):
+        return time.time() < self.open_until
+
+    def score(self):
+        latency = self.latency if self.latency is not None else 1.0
+        return max(latency, 0.001) * (1 + 4 * self.error_rate)
+
+class Web3Pool:
+    def __init__(self, endpoints=None, health_interval=30, connection_limit=32, failure_threshold=3, cooldown=60, idle_timeout=600, retry_policy=None, rate_limits=None) -> None:
+        self.endpoints = list(endpoints or [])
+        self.health_interval = health_interval
+        self.connection_limit = connection_limit
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.idle_timeout = idle_timeout
+        self.providers = {}
+        self.sessions = {}
+        self.used = {}
+        self.health = {}
+        self.pins = {}
+        self.health_task = None
+        self.trackers = {}
+        self.chain = ChainContext()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limits = rate_limits
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, filename="rpc.json", default=None, **kwargs):
+        config = {}
+        try:
+            if os.path.exists(filename):
+                with open(filename, "r") as f:
+                    config = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            config = {}
+
+        if isinstance(config, list):
+            config = {"endpoints": config}
+
+        endpoints = [url.strip() for url in config.get("endpoints") or [] if url.strip()]
+        if not endpoints:
+            endpoints = [default] if isinstance(default, str) else list(default or [])
+
+        options = {
+            key: config[key] for key in ("health_interval", "connection_limit", "failure_threshold", "cooldown", "idle_timeout")
+            if key in config
+        }
+        return cls(endpoints, **{**options, **kwargs})
+
+    async def build_web3(self, key):
+        rpc_url, proxy, timeout = key
+
+        request_kwargs = {"timeout": ClientTimeout(total=timeout)}
+        if proxy and proxy.startswith("socks"):
+            connector = ProxyConnector.from_url(proxy, limit=self.connection_limit, ttl_dns_cache=300)
+        else:
+            connector = TCPConnector(limit=self.connection_limit, ttl_dns_cache=300, keepalive_timeout=60)
+            if proxy:
+                request_kwargs["proxy"] = proxy
+
+        trace_configs = [self.rate_limits.trace_config()] if self.rate_limits else None
+        session = ClientSession(connector=connector, raise_for_status=True, trace_configs=trace_configs)
+        provider = BatchHTTPProvider(rpc_url, request_kwargs=request_kwargs)
+        provider.monitor = self.health[rpc_url].record
+        await provider.cache_async_session(session)
+
+        self.sessions[key] = session
+        return AsyncWeb3(provider)
+
+    async def check(self, rpc_url):
+        keys = [key for key in self.providers if key[0] == rpc_url]
+        if not keys:
+            return self.health[rpc_url]
+
+        web3 = self.providers[max(keys, key=lambda key: self.used.get(key, 0))]
+        try:
+            await web3.eth.get_block_number()
+        except (ClientError, asyncio.TimeoutError):
+            pass
+        except Exception as e:
+            self.health[rpc_url].record(error=e)
+        return self.health[rpc_url]
+
+    async def evict_idle(self):
+        now = time.time()
+        for key in [key for key in self.providers if now - self.used.get(key, now) > self.idle_timeout]:
+            web3 = self.providers[key]
+            tracker = self.trackers.get(key[0])
+            if tracker and tracker.web3 is web3:
+                if tracker.pending:
+                    continue
+                tracker.stop()
+                del self.trackers[key[0]]
+
+            del self.providers[key]
+            self.used.pop(key, None)
+            await self.sessions.pop(key).close()
+
+    async def health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.evict_idle()
+            await asyncio.gather(*(self.check(rpc_url) for rpc_url in {key[0] for key in self.providers}))
+
+    def start_health_checks(self):
+        if self.health_task is None or self.health_task.done():
+            self.health_task = asyncio.get_running_loop().create_task(self.health_loop())
+
+    def select(self, keys, pin=None):
+        available = [key for key in keys if not self.health[key[0]].is_open()]
+        if not available:
+            return None
+
+        if pin is None:
+            weights = [1 / self.health[key[0]].score() for key in available]
+            return random.choices(available, weights=weights)[0]
+
+        pinned = self.pins.get(pin)
+        for key in available:
+            if key[0] == pinned:
+                return key
+
+        key = min(available, key=lambda key: self.health[key[0]].score())
+        self.pins[pin] = key[0]
+        return key
+
+    async def get(self, proxy=None, timeout=60, retries=3, pin=None, exclude=None):
+        keys = [(rpc_url, proxy, timeout) for rpc_url in self.endpoints if rpc_url != exclude]
+        if not keys:
+            raise Exception("No RPC Endpoints Configured")
+
+        if any(key not in self.providers for key in keys):
+            async with self.lock:
+                built = [key for key in keys if key not in self.providers]
+                for key in built:
+                    if key[0] not in self.health:
+                        self.health[key[0]] = EndpointHealth(self.failure_threshold, self.cooldown)
+                    self.providers[key] = await self.build_web3(key)
+                    self.used[key] = time.time()
+                if len(keys) > 1:
+                    await asyncio.gather(*(self.check(key[0]) for key in built if self.health[key[0]].latency is None))
+
+        self.start_health_checks()
+
+        for attempt in range(retries):
+            key = self.select(keys, pin)
+            if key is not None:
+                self.used[key] = time.time()
+                return self.providers[key]
+            if attempt < retries - 1:
+                await self.retry_policy.sleep(RETRY_FAILOVER, attempt)
+                await asyncio.gather(*(self.check(key[0]) for key in keys))
+                continue
+            errors = "; ".join(self.health[key[0]].error or "Unknown Error" for key in keys)
+            raise Exception(f"Failed to Connect to RPC: {errors}")
+
+    async def failover(self, web3, pin=None):
+        key = next((key for key, provider in self.providers.items() if provider is web3), None)
+        if key is None or len(self.endpoints) < 2:
+            return web3
+
+        rpc_url, proxy, timeout = key
+        if pin is not None and self.pins.get(pin) == rpc_url:
+            del self.pins[pin]
+        try:
+            return await self.get(proxy, timeout, 1, pin, exclude=rpc_url)
+        except Exception:
+            return web3
+
+    def receipts(self, web3):
+        endpoint = web3.provider.endpoint_uri
+        if endpoint not in self.trackers:
+            self.trackers[endpoint] = ReceiptTracker(web3)
+        tracker = self.trackers[endpoint]
+        tracker.web3 = web3
+        return tracker
+
+    async def close(self):
+        if self.health_task and not self.health_task.done():
+            self.health_task.cancel()
+        for tracker in self.trackers.values():
+            tracker.stop()
+        self.trackers.clear()
+        for session in self.sessions.values():
+            await session.close()
+        self.providers.clear()
+        self.sessions.clear()
+        self.used.clear()
+        self.health.clear()
+        self.pins.clear()
+
+class GasProfile:
+    def __init__(self, path="gas_profiles.json", out_of_gas_ratio=0.99) -> None:
+        self.path = path
+        self.out_of_gas_ratio = out_of_gas_ratio
+        self.profiles = {}
+        self.watched = {}
+        self.load()
+
+    def key(self, to: str, selector: str, value):
+        return f"{to}:{selector[:10]}:{int(bool(value))}".lower()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                self.profiles.update({key: int(gas) for key, gas in json.load(f).items()})
+        except Exception:
+            pass
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(self.profiles, f, indent=4)
+            os.replace(temp_path, self.path)
+        except Exception:
+            pass
+
+    async def estimate(self, contract_function, params: dict):
+        key = self.key(contract_function.address, contract_function.selector, params.get("value"))
+        if key in self.profiles:
+            return self.profiles[key]
+        return await contract_function.estimate_gas(params)
+
+    def watch(self, tx_hash: str, tx: dict):
+        if tx.get("to") and tx.get("data"):
+            self.watched[tx_hash.lower()] = (self.key(tx["to"], tx["data"], tx.get("value")), tx["gas"])
+
+    def learn(self, tx_hash: str, receipt):
+        watched = self.watched.pop(tx_hash.lower(), None)
+        if watched is None:
+            return
+
+        key, gas_limit = watched
+        if receipt.status == 1:
+            if receipt.gasUsed > self.profiles.get(key, 0):
+                self.profiles[key] = receipt.gasUsed
+                self.save()
+        elif receipt.gasUsed >= gas_limit * self.out_of_gas_ratio and key in self.profiles:
+            self.profiles.pop(key)
+            self.save()
+
+class SessionPool:
+    def __init__(self, connection_limit=16, rate_limits=None) -> None:
+        self.connection_limit = connection_limit
+        self.rate_limits = rate_limits
+        self.sessions = {}
+
+    def get(self, url: str, proxy=None):
+        parsed = urlparse(url)
+        socks_proxy = proxy if proxy and proxy.startswith("socks") else None
+        key = (f"{parsed.scheme}://{parsed.netloc}", socks_proxy)
+
+        session = self.sessions.get(key)
+        if session is None or session.closed:
+            if socks_proxy:
+                connector = ProxyConnector.from_url(socks_proxy, limit=self.connection_limit, ttl_dns_cache=300)
+            else:
+                connector = TCPConnector(limit=self.connection_limit, ttl_dns_cache=300, keepalive_timeout=60)
+            trace_configs = [self.rate_limits.trace_config()] if self.rate_limits else None
+            session = ClientSession(connector=connector, cookie_jar=DummyCookieJar(), trace_configs=trace_configs)
+            self.sessions[key] = session
+
+        return session
+
+    async def close(self):
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions.clear()
+
+class SingleFlightCache:
+    def __init__(self, ttl=10) -> None:
+        self.ttl = ttl
+        self.entries = {}
+        self.inflight = {}
+
+    async def get(self, key, loader):
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self.load(key, loader))
+            self.inflight[key] = task
+
+        return await asyncio.shield(task)
+
+    async def load(self, key, loader):
+        try:
+            value = await loader()
+            if value is not None:
+                self.prune()
+                self.entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            self.inflight.pop(key, None)
+
+    def prune(self):
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self.entries.items() if expires <= now]:
+            self.entries.pop(key)
+
+    def invalidate(self, key):
+        self.entries.pop(key, None)
+
+class ConditionalCache:
+    def __init__(self, path: str, max_age=24 * 60 * 60) -> None:
+        self.path = path
+        self.max_age = max_age
+        self.entries = self.read()
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            return {key.lower(): entry for key, entry in data.items() if isinstance(entry, dict) and "value" in entry}
+        except Exception:
+            return {}
+
+    def save(self):
+        data = {**self.read(), **self.entries}
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(temp_path, self.path)
+        except Exception:
+            pass
+
+    def get(self, key: str):
+        entry = self.entries.get(key.lower())
+        return entry["value"] if entry else None
+
+    def is_fresh(self, key: str):
+        entry = self.entries.get(key.lower())
+        return bool(entry) and time.time() - entry.get("checked", 0) < self.max_age
+
+    def headers(self, key: str):
+        entry = self.entries.get(key.lower()) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key: str, value, headers):
+        self.entries[key.lower()] = {
+            "value": value,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "checked": time.time()
+        }
+
+    def touch(self, key: str):
+        entry = self.entries.get(key.lower())
+        if entry:
+            entry["checked"] = time.time()
+
+class ChainContext:
+    def __init__(self, fee_interval=15, fee_blocks=10, percentiles=(25, 50, 90), base_fee_multiplier=2, min_priority_fee=10**9) -> None:
+        self.fee_interval = fee_interval
+        self.fee_blocks = fee_blocks
+        self.percentiles = percentiles
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_priority_fee = min_priority_fee
+        self.chain_ids = {}
+        self.fee_data = {}
+        self.refreshing = {}
+
+    async def chain_id(self, web3):
+        endpoint = web3.provider.endpoint_uri
+        if endpoint not in self.chain_ids:
+            self.chain_ids[endpoint] = await web3.eth.chain_id
+        return self.chain_ids[endpoint]
+
+    async def refresh(self, web3):
+        endpoint = web3.provider.endpoint_uri
+        task = self.refreshing.get(endpoint)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self.load(web3))
+            self.refreshing[endpoint] = task
+            task.add_done_callback(lambda _: self.refreshing.pop(endpoint, None))
+        return await asyncio.shield(task)
+
+    async def load(self, web3):
+        endpoint = web3.provider.endpoint_uri
+        try:
+            history = await web3.eth.fee_history(self.fee_blocks, "latest", list(self.percentiles))
+            base_fee = history["baseFeePerGas"][-1]
+            rewards = [reward for reward in history.get("reward") or [] if len(reward) == len(self.percentiles)]
+
+            priority_fees = {}
+            for index, percentile in enumerate(self.percentiles):
+                values = sorted(reward[index] for reward in rewards)
+                median = values[len(values) // 2] if values else 0
+                priority_fees[percentile] = max(self.min_priority_fee, median)
+        except Exception:
+            base_fee = 0
+            priority_fees = {percentile: self.min_priority_fee for percentile in self.percentiles}
+
+        self.fee_data[endpoint] = (time.time(), base_fee, priority_fees)
+        return self.fee_data[endpoint]
+
+    async def fees(self, web3, percentile=50):
+        fee_data = self.fee_data.get(web3.provider.endpoint_uri)
+        if fee_data is None or time.time() - fee_data[0] > self.fee_interval:
+            fee_data = await self.refresh(web3)
+
+        _, base_fee, priority_fees = fee_data
+        target = min(priority_fees, key=lambda value: abs(value - percentile))
+        max_priority_fee = priority_fees[target]
+        max_fee = int(base_fee * self.base_fee_multiplier) + max_priority_fee
+
+        return max_fee, max_priority_fee
+
+    async def bump(self, web3, tx, ratio=1.125):
+        await self.refresh(web3)
+        max_fee, max_priority_fee = await self.fees(web3)
+        tx["maxPriorityFeePerGas"] = max(max_priority_fee, int(tx["maxPriorityFeePerGas"] * ratio) + 1)
+        tx["maxFeePerGas"] = max(max_fee, int(tx["maxFeePerGas"] * ratio) + 1, tx["maxPriorityFeePerGas"])
+        return tx
+
+class ReceiptTracker:
+    def __init__(self, web3, poll_interval=1, sweep_blocks=10) -> None:
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.sweep_blocks = sweep_blocks
+        self.pending = {}
+        self.checked_at = {}
+        self.last_block = None
+        self.task = None
+
+    def track(self, tx_hash: str):
+        tx_hash = tx_hash.lower()
+        if tx_hash not in self.pending:
+            self.pending[tx_hash] = asyncio.get_running_loop().create_future()
+            self.checked_at[tx_hash] = None
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+        return self.pending[tx_hash]
+
+    async def wait(self, tx_hash: str, timeout=300):
+        future = self.track(tx_hash)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.forget(tx_hash.lower())
+            raise Exception(f"Transaction {tx_hash} Not Mined After {timeout} Seconds")
+
+    def forget(self, tx_hash: str):
+        self.pending.pop(tx_hash, None)
+        self.checked_at.pop(tx_hash, None)
+
+    def resolve(self, tx_hash: str, receipt):
+        future = self.pending.get(tx_hash)
+        if future and not future.done():
+            future.set_result(receipt)
+        self.forget(tx_hash)
+
+    async def fetch_receipts(self, tx_hashes, block_number):
+        receipts = await asyncio.gather(*(self.web3.eth.get_transaction_receipt(tx_hash) for tx_hash in tx_hashes), return_exceptions=True)
+        for tx_hash, receipt in zip(tx_hashes, receipts):
+            if isinstance(receipt, Exception) or receipt is None:
+                if tx_hash in self.checked_at:
+                    self.checked_at[tx_hash] = block_number
+                continue
+            self.resolve(tx_hash, receipt)
+
+    async def poll(self):
+        block_number = await self.web3.eth.get_block_number()
+        if self.last_block is None:
+            self.last_block = block_number
+
+        mined = set()
+        if block_number - self.last_block > self.sweep_blocks:
+            mined.update(self.checked_at)
+        elif block_number > self.last_block:
+            blocks = await asyncio.gather(*(self.web3.eth.get_block(number) for number in range(self.last_block + 1, block_number + 1)))
+            for block in blocks:
+                mined.update(self.web3.to_hex(tx_hash).lower() for tx_hash in block["transactions"])
+        self.last_block = max(self.last_block, block_number)
+
+        due = [
+            tx_hash for tx_hash, checked_at in self.checked_at.items()
+            if tx_hash in mined or checked_at is None or block_number - checked_at >= self.sweep_blocks
+        ]
+        if due:
+            await self.fetch_receipts(due, block_number)
+
+    async def run(self):
+        while self.pending:
+            try:
+                await self.poll()
+            except Exception:
+                pass
+            await asyncio.sleep(self.poll_interval)
+        self.last_block = None
+
+    def stop(self):
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+class Multicall:
+    def __init__(self, address=MULTICALL3_ADDRESS, chunk_size=200) -> None:
+        self.address = address
+        self.chunk_size = chunk_size
+        self.available = {}
+
+    async def is_available(self, web3):
+        endpoint = web3.provider.endpoint_uri
+        if endpoint not in self.available:
+            code = await web3.eth.get_code(self.address)
+            self.available[endpoint] = len(code) > 0
+        return self.available[endpoint]
+
+    async def call_one(self, web3, target: str, data: bytes):
+        try:
+            result = await web3.eth.call({"to": target, "data": data})
+            return True, bytes(result)
+        except Exception:
+            return False, b""
+
+    async def aggregate(self, web3, calls: list):
+        if not calls:
+            return []
+
+        if not await self.is_available(web3):
+            return list(await asyncio.gather(*(self.call_one(web3, target, data) for target, data in calls)))
+
+        results = []
+        for start in range(0, len(calls), self.chunk_size):
+            chunk = [(target, True, data) for target, data in calls[start:start + self.chunk_size]]
+            data = AGGREGATE3 + web3.codec.encode(["(address,bool,bytes)[]"], [chunk])
+            result = await web3.eth.call({"to": self.address, "data": data})
+            results.extend(web3.codec.decode(["(bool,bytes)[]"], result)[0])
+        return results
+
+def decode_uint(result):
+    success, data = result
+    if not success or len(data) < 32:
+        raise Exception("Contract Read Reverted")
+    return int.from_bytes(data[:32], "big")
+
+def decode_symbol(web3, result):
+    success, data = result
+    if not success or not data:
+        return None
+    try:
+        return web3.codec.decode(["string"], data)[0]
+    except Exception:
+        return data[:32].strip(b"\x00").decode(errors="ignore") or None
+
+class TokenRegistry:
+    def __init__(self, path="tokens.json", multicall=None, native_address=NATIVE_ADDRESS, native_symbol="PHRS") -> None:
+        self.path = path
+        self.multicall = multicall or Multicall()
+        self.native_address = native_address.lower()
+        self.tokens = {self.native_address: {"symbol": native_symbol, "decimals": 18}}
+        self.lock = asyncio.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            for token, meta in data.items():
+                if isinstance(meta, dict) and isinstance(meta.get("decimals"), int):
+                    self.tokens[token.lower()] = {"symbol": meta.get("symbol"), "decimals": meta["decimals"]}
+        except Exception:
+            pass
+
+    def save(self):
+        self.load()
+        data = {token: meta for token, meta in self.tokens.items() if token != self.native_address}
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(temp_path, self.path)
+        except Exception:
+            pass
+
+    async def resolve(self, web3, tokens: list):
+        missing = list(dict.fromkeys(token.lower() for token in tokens if token.lower() not in self.tokens))
+        if missing:
+            async with self.lock:
+                missing = [token for token in missing if token not in self.tokens]
+                if missing:
+                    calls = []
+                    for token in missing:
+                        token = web3.to_checksum_address(token)
+                        calls.extend([(token, DECIMALS), (token, SYMBOL)])
+
+                    results = await self.multicall.aggregate(web3, calls)
+                    for index, token in enumerate(missing):
+                        decimals = decode_uint(results[index * 2])
+                        self.tokens[token] = {"symbol": decode_symbol(web3, results[index * 2 + 1]), "decimals": decimals}
+                    self.save()
+
+        return [self.tokens[token.lower()] for token in tokens]
+
+    async def get(self, web3, token: str):
+        return (await self.resolve(web3, [token]))[0]
+
+    async def decimals(self, web3, token: str):
+        return (await self.get(web3, token))["decimals"]
+
+class TokenReader:
+    def __init__(self, multicall=None, registry=None, native_address=NATIVE_ADDRESS) -> None:
+        self.multicall = multicall or Multicall()
+        self.registry = registry or TokenRegistry(multicall=self.multicall)
+        self.native_address = native_address.lower()
+
+    async def read(self, web3, queries: list):
+        use_multicall = await self.multicall.is_available(web3)
+        metadata = await self.registry.resolve(web3, [token for token, _, _ in queries])
+
+        calls = []
+        for token, owner, spender in queries:
+            owner = web3.to_checksum_address(owner)
+            if token.lower() == self.native_address:
+                if use_multicall:
+                    calls.append((self.multicall.address, GET_ETH_BALANCE + web3.codec.encode(["address"], [owner])))
+                continue
+
+            token = web3.to_checksum_address(token)
+            calls.append((token, BALANCE_OF + web3.codec.encode(["address"], [owner])))
+            if spender:
+                calls.append((token, ALLOWANCE + web3.codec.encode(["address", "address"], [owner, web3.to_checksum_address(spender)])))
+
+        results = iter(await self.multicall.aggregate(web3, calls))
+
+        snapshot = []
+        for (token, owner, spender), meta in zip(queries, metadata):
+            if token.lower() == self.native_address:
+                balance = decode_uint(next(results)) if use_multicall else await web3.eth.get_balance(web3.to_checksum_address(owner))
+                snapshot.append({"token": token, "balance": balance, "decimals": meta["decimals"], "allowance": None})
+                continue
+
+            balance = decode_uint(next(results))
+            allowance = decode_uint(next(results)) if spender else None
+            snapshot.append({"token": token, "balance": balance, "decimals": meta["decimals"], "allowance": allowance})
+
+        return snapshot
+
+def decode_topic_address(topic):
+    return "0x" + bytes(topic)[-20:].hex()
+
+class BalanceLedger:
+    def __init__(self, reader=None, native_address=NATIVE_ADDRESS) -> None:
+        self.reader = reader or TokenReader()
+        self.native_address = native_address.lower()
+        self.balances = {}
+        self.watched = {}
+
+    def key(self, owner: str, token: str):
+        return f"{owner}:{token}".lower()
+
+    async def sync(self, web3, owner: str, tokens: list):
+        snapshot = await self.reader.read(web3, [(token, owner, None) for token in tokens])
+        for token in snapshot:
+            self.balances[self.key(owner, token["token"])] = token["balance"]
+        return snapshot
+
+    async def seed(self, web3, owner: str, tokens: list):
+        try:
+            await self.sync(web3, owner, tokens)
+        except Exception:
+            self.invalidate(owner)
+
+    async def read(self, web3, owner: str, tokens: list, required=None):
+        metadata = await self.reader.registry.resolve(web3, tokens)
+
+        stale = []
+        for token, meta in zip(tokens, metadata):
+            balance = self.balances.get(self.key(owner, token))
+            if balance is None or (required is not None and balance / (10 ** meta["decimals"]) <= required):
+                stale.append(token)
+        if stale:
+            await self.sync(web3, owner, stale)
+
+        return [
+            {"token": token, "balance": self.balances[self.key(owner, token)], "decimals": meta["decimals"]}
+            for token, meta in zip(tokens, metadata)
+        ]
+
+    def credit(self, owner: str, token: str, amount: int):
+        key = self.key(owner, token)
+        if key in self.balances:
+            self.balances[key] += amount
+
+    def invalidate(self, owner: str, token=None):
+        prefix = f"{owner}:".lower()
+        for key in [key for key in self.balances if key.startswith(prefix)]:
+            if token is None or key == self.key(owner, token):
+                self.balances.pop(key)
+
+    def watch(self, tx_hash: str, tx: dict):
+        self.watched[tx_hash] = (tx["from"], tx.get("value", 0))
+
+    def apply(self, tx_hash: str, receipt):
+        owner, value = self.watched.pop(tx_hash, (receipt["from"], None))
+        gas_price = receipt.get("effectiveGasPrice")
+        if value is None or gas_price is None:
+            self.invalidate(owner, self.native_address)
+        else:
+            spent = receipt["gasUsed"] * gas_price + (value if receipt["status"] == 1 else 0)
+            self.credit(owner, self.native_address, -spent)
+
+        if receipt["status"] != 1:
+            self.invalidate(owner)
+            return
+
+        for log in receipt["logs"]:
+            topics = log["topics"]
+            if not topics:
+                continue
+
+            token = log["address"]
+            topic = bytes(topics[0])
+            data = bytes(log["data"])
+            amount = int.from_bytes(data[:32], "big") if len(data) >= 32 else 0
+
+            if topic == TRANSFER_TOPIC and len(topics) == 3:
+                self.credit(decode_topic_address(topics[1]), token, -amount)
+                self.credit(decode_topic_address(topics[2]), token, amount)
+            elif topic == DEPOSIT_TOPIC and len(topics) == 2:
+                self.credit(decode_topic_address(topics[1]), token, amount)
+            elif topic == WITHDRAWAL_TOPIC and len(topics) == 2:
+                source = decode_topic_address(topics[1])
+                self.credit(source, token, -amount)
+                if source == owner.lower():
+                    self.credit(owner, self.native_address, amount)
+                else:
+                    self.invalidate(owner, self.native_address)
+
+class AllowanceLedger:
+    def __init__(self, path="allowances.json", multicall=None) -> None:
+        self.path = path
+        self.multicall = multicall or Multicall()
+        self.allowances = {}
+        self.changes = {}
+        self.load()
+
+    def key(self, owner: str, token: str, spender: str):
+        return f"{owner}:{token}:{spender}".lower()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.allowances.update({key: int(value) for key, value in data.items()})
+        except Exception:
+            pass
+
+    def save(self):
+        self.load()
+        for key, value in self.changes.items():
+            if value is None:
+                self.allowances.pop(key, None)
+            else:
+                self.allowances[key] = value
+        self.changes.clear()
+
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({key: str(value) for key, value in self.allowances.items()}, f, indent=4)
+            os.replace(temp_path, self.path)
+        except Exception:
+            pass
+
+    def get(self, owner: str, token: str, spender: str):
+        return self.allowances.get(self.key(owner, token, spender))
+
+    def record(self, owner: str, token: str, spender: str, amount: int):
+        key = self.key(owner, token, spender)
+        if self.allowances.get(key) != amount:
+            self.allowances[key] = amount
+            self.changes[key] = amount
+            self.save()
+
+    def spend(self, owner: str, token: str, spender: str, amount: int):
+        allowance = self.get(owner, token, spender)
+        if allowance is not None and allowance < 2**256 - 1:
+            self.record(owner, token, spender, max(0, allowance - amount))
+
+    def forget(self, owner: str, token=None, spender=None):
+        prefix = f"{owner}:".lower()
+        for key in [key for key in self.allowances if key.startswith(prefix)]:
+            _, key_token, key_spender = key.split(":")
+            if token and key_token != token.lower():
+                continue
+            if spender and key_spender != spender.lower():
+                continue
+            self.allowances.pop(key)
+            self.changes[key] = None
+        if self.changes:
+            self.save()
+
+    async def scan(self, web3, owner: str, pairs: list):
+        owner = web3.to_checksum_address(owner)
+        missing = [(token, spender) for token, spender in pairs if self.get(owner, token, spender) is None]
+        if not missing:
+            return
+
+        calls = [
+            (web3.to_checksum_address(token), ALLOWANCE + web3.codec.encode(["address", "address"], [owner, web3.to_checksum_address(spender)]))
+            for token, spender in missing
+        ]
+        try:
+            results = await self.multicall.aggregate(web3, calls)
+        except Exception:
+            return
+
+        for (token, spender), result in zip(missing, results):
+            try:
+                amount = decode_uint(result)
+            except Exception:
+                continue
+            key = self.key(owner, token, spender)
+            self.allowances[key] = amount
+            self.changes[key] = amount
+        if self.changes:
+            self.save()
+
+class TransactionSigner:
+    def __init__(self, max_workers=4) -> None:
+        self.max_workers = max_workers
+        self.offload = False
+        self.accounts = {}
+        self.executor = None
+
+    def account(self, private_key: str):
+        if private_key not in self.accounts:
+            self.accounts[private_key] = Account.from_key(private_key)
+        return self.accounts[private_key]
+
+    async def sign(self, tx: dict, private_key: str):
+        account = self.account(private_key)
+        if not self.offload:
+            return account.sign_transaction(tx)
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="signer")
+        return await asyncio.get_running_loop().run_in_executor(self.executor, account.sign_transaction, dict(tx))
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+class EligibilityIndex:
+    def __init__(self, multicall=None) -> None:
+        self.multicall = multicall or Multicall()
+        self.next_times = {}
+
+    async def scan(self, web3, entries: list, decode):
+        results = await self.multicall.aggregate(web3, [(target, data) for _, target, data in entries])
+        for (key, _, _), (success, data) in zip(entries, results):
+            if success and len(data) >= 32:
+                self.next_times[key.lower()] = decode(int.from_bytes(data[:32], "big"))
+
+    def get(self, key: str):
+        return self.next_times.get(key.lower())
+
+    def mark(self, key: str, next_time):
+        if next_time is None:
+            self.next_times.pop(key.lower(), None)
+        else:
+            self.next_times[key.lower()] = next_time
+
+    def is_eligible(self, key: str):
+        next_time = self.get(key)
+        if next_time is None:
+            return None
+        return time.time() >= next_time
+
+class AccountScheduler:
+    def __init__(self, interval=24 * 60 * 60) -> None:
+        self.interval = interval
+        self.queue = []
+        self.counter = 0
+
+    def schedule(self, item, due=None):
+        latest = time.time() + self.interval
+        if due is None or due > latest:
+            due = latest
+        heapq.heappush(self.queue, (due, self.counter, item))
+        self.counter += 1
+
+    def seconds_until_due(self):
+        if not self.queue:
+            return 0
+        return max(0, self.queue[0][0] - time.time())
+
+    def pop_due(self):
+        now = time.time()
+        items = []
+        while self.queue and self.queue[0][0] <= now:
+            items.append(heapq.heappop(self.queue)[2])
+        return items
+
+class NonceManager:
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self.next_nonce = None
+        self.released = []
+        self.lock = asyncio.Lock()
+
+    async def sync(self, web3):
+        async with self.lock:
+            self.next_nonce = await web3.eth.get_transaction_count(self.address, "pending")
+            self.released.clear()
+            return self.next_nonce
+
+    def reserve(self):
+        if self.released:
+            return heapq.heappop(self.released)
+        nonce = self.next_nonce
+        self.next_nonce += 1
+        return nonce
+
+    def release(self, nonce):
+        if nonce == self.next_nonce - 1:
+            self.next_nonce = nonce
+        else:
+            heapq.heappush(self.released, nonce)
+
+    async def resync(self, web3):
+        async with self.lock:
+            chain_nonce = await web3.eth.get_transaction_count(self.address, "pending")
+            self.released = [nonce for nonce in self.released if nonce >= chain_nonce]
+            heapq.heapify(self.released)
+            self.next_nonce = max(self.next_nonce, chain_nonce)
+        return self.reserve()
+
+class RunJournal:
+    def __init__(self, filename="journal.db", scope="default", max_age=43200) -> None:
+        self.scope = scope
+        self.max_age = max_age
+        self.session = uuid.uuid4().hex
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS journal ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, run TEXT, scope TEXT, session TEXT, account TEXT, step TEXT, "
+            "tx_hash TEXT, nonce INTEGER, status TEXT, created REAL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS journal_account ON journal (account, scope, run)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS journal_tx ON journal (tx_hash)")
+        self.connection.commit()
+
+    def append(self, run, account, step, status, tx_hash=None, nonce=None, scope=None):
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO journal (run, scope, session, account, step, tx_hash, nonce, status, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run, scope, self.session if scope else None, account, step, tx_hash, nonce, status, time.time())
+            )
+
+    def open_run(self, account, option=None):
+        scope = self.scope if option is None else f"{self.scope}:{option}"
+        row = self.connection.execute(
+            "SELECT run, status, session, created FROM journal WHERE account = ? AND scope = ? AND step = 'run' ORDER BY id DESC LIMIT 1",
+            (account, scope)
+        ).fetchone()
+        if row and row[1] == "started" and row[2] != self.session and time.time() - row[3] < self.max_age:
+            return row[0], self.steps(row[0], account)
+
+        run = uuid.uuid4().hex
+        self.append(run, account, "run", "started", scope=scope)
+        return run, {}
+
+    def close_run(self, run, account, status="finished"):
+        self.append(run, account, "run", status)
+
+    def steps(self, run, account):
+        steps, transactions = {}, {}
+        rows = self.connection.execute(
+            "SELECT step, tx_hash, status FROM journal WHERE run = ? AND account = ? AND step != 'run' ORDER BY id", (run, account)
+        )
+        for step, tx_hash, status in rows:
+            if tx_hash:
+                transactions[step] = status
+            else:
+                steps[step] = status
+
+        for step, status in transactions.items():
+            if step not in steps:
+                steps[step] = "reverted" if status == "reverted" else "completed" if status == "confirmed" else None
+
+        return {step: status for step, status in steps.items() if status in ("completed", "reverted")}
+
+    def pending(self):
+        return self.connection.execute(
+            "SELECT journal.run, journal.account, journal.step, journal.tx_hash, journal.nonce FROM journal "
+            "JOIN (SELECT MAX(id) AS id FROM journal WHERE tx_hash IS NOT NULL GROUP BY tx_hash) latest ON journal.id = latest.id "
+            "WHERE journal.status = 'pending'"
+        ).fetchall()
+
+    async def lookup(self, web3, tx_hash):
+        try:
+            receipt = await web3.eth.get_transaction_receipt(tx_hash)
+            return "confirmed" if receipt.status == 1 else "reverted"
+        except TransactionNotFound:
+            pass
+        except Exception:
+            return None
+
+        try:
+            await web3.eth.get_transaction(tx_hash)
+            return None
+        except TransactionNotFound:
+            return "dropped"
+        except Exception:
+            return None
+
+    async def reconcile(self, web3, timeout=120, interval=5):
+        pending = self.pending()
+        deadline = time.monotonic() + timeout
+        while pending:
+            statuses = await asyncio.gather(*(self.lookup(web3, row[3]) for row in pending))
+            for (run, account, step, tx_hash, nonce), status in zip(pending, statuses):
+                if status:
+                    self.append(run, account, step, status, tx_hash, nonce)
+            pending = [row for row, status in zip(pending, statuses) if not status]
+            if not pending or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(interval)
+        return len(pending)
+
+class AccountState:
+    def __init__(self, account: str, address: str, label: str, **fields) -> None:
+        self.account = account
+        self.address = address
+        self.label = label
+        self.nonces = NonceManager(address)
+        self.last_revert = None
+        self.reverted = {}
+        self.journal = None
+        self.run = None
+        self.completed = {}
+        self.step = None
+        self.transactions = {}
+        self.__dict__.update(fields)
+
+    def open_run(self, journal, option=None):
+        self.journal = journal
+        self.run, self.completed = journal.open_run(self.address, option)
+        self.step = None
+        return self.completed
+
+    def close_run(self, status="finished"):
+        if self.journal and self.run:
+            self.journal.close_run(self.run, self.address, status)
+        self.run = None
+
+    def begin_step(self, name):
+        status = self.completed.get(name)
+        self.step = None if status else name
+        self.last_revert = None
+        return status
+
+    def track(self, tx_hash, nonce, status, substep=None):
+        if status == "pending" and self.step:
+            self.transactions[tx_hash] = f"{self.step}:{substep}" if substep else self.step
+        step = self.transactions.get(tx_hash) if status == "pending" else self.transactions.pop(tx_hash, None)
+        if self.journal and self.run and step:
+            self.journal.append(self.run, self.address, step, status, tx_hash, nonce)
+
+    def record(self, path, success):
+        if self.step is None:
+            self.last_revert = None
+        if not success and self.last_revert:
+            self.reverted[path] = self.last_revert.reason or "Unknown Reason"
+        if self.journal and self.run and self.step:
+            status = "completed" if success else "reverted" if self.last_revert else "failed"
+            self.journal.append(self.run, self.address, self.step, status)
+        self.step = None
+        self.last_revert = None
+        return success
+
+class TransactionSender:
+    def __init__(self, web3_pool, signer, gas_profile, balance_ledger=None, log=print, message_label="   Message :", status_label="   Status  :") -> None:
+        self.web3_pool = web3_pool
+        self.signer = signer
+        self.gas_profile = gas_profile
+        self.balance_ledger = balance_ledger
+        self.log = log
+        self.message_label = message_label
+        self.status_label = status_label
+
+    def warn(self, label, message):
+        self.log(
+            f"{Fore.CYAN + Style.BRIGHT}{label}{Style.RESET_ALL}"
+            f"{Fore.YELLOW + Style.BRIGHT} {message} {Style.RESET_ALL}"
+        )
+
+    def skip(self, step=None, path=None):
+        state = current_account.get()
+        if step is not None:
+            resumed = state.begin_step(step)
+            if resumed:
+                self.warn(self.status_label, f"Skipped, {resumed.title()} Before Restart")
+                return True
+        if path is not None and path in state.reverted:
+            self.warn(self.status_label, f"Skipped, Previously Reverted: {state.reverted[path]}")
+            return True
+        return False
+
+    def watch(self, tx_hash, tx):
+        self.gas_profile.watch(tx_hash, tx)
+        if self.balance_ledger:
+            self.balance_ledger.watch(tx_hash, tx)
+        return tx_hash
+
+    async def send(self, account, web3, tx, retries=5, substep=None):
+        state = current_account.get()
+        retry_policy = self.web3_pool.retry_policy
+        tx["nonce"] = state.nonces.reserve()
+        try:
+            signed_tx = await self.signer.sign(tx, account)
+            state.track(web3.to_hex(signed_tx.hash), tx["nonce"], "pending", substep)
+        except Exception:
+            state.nonces.release(tx["nonce"])
+            raise
+        for attempt in range(retries):
+            try:
+                raw_tx = await web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                return self.watch(web3.to_hex(raw_tx), tx)
+            except TransactionNotFound:
+                kind = RETRY_SAME
+            except Exception as e:
+                if is_known_transaction(e):
+                    return self.watch(web3.to_hex(signed_tx.hash), tx)
+                kind = classify_error(e)
+                if kind == RETRY_FATAL:
+                    state.nonces.release(tx["nonce"])
+                    raise
+                if is_nonce_error(e):
+                    tx["nonce"] = await state.nonces.resync(web3)
+                    signed_tx = await self.signer.sign(tx, account)
+                    state.track(web3.to_hex(signed_tx.hash), tx["nonce"], "pending", substep)
+                    self.warn(self.message_label, f"[Attempt {attempt + 1}] Nonce Resynced: {tx['nonce']}")
+                elif kind == RETRY_RESYNC:
+                    await self.web3_pool.chain.bump(web3, tx)
+                    signed_tx = await self.signer.sign(tx, account)
+                    state.track(web3.to_hex(signed_tx.hash), tx["nonce"], "pending", substep)
+                    self.warn(self.message_label, f"[Attempt {attempt + 1}] Fee Bumped: {tx['maxFeePerGas']}")
+                else:
+                    self.warn(self.message_label, f"[Attempt {attempt + 1}] Send TX Error: {str(e)}")
+            if kind == RETRY_FAILOVER:
+                web3 = await self.web3_pool.failover(web3, state.address)
+            await retry_policy.sleep(kind, attempt)
+        state.nonces.release(tx["nonce"])
+        raise Exception("Transaction Hash Not Found After Maximum Retries")
+
+    async def wait(self, web3, tx_hash, retries=5):
+        state = current_account.get()
+        retry_policy = self.web3_pool.retry_policy
+        for attempt in range(retries):
+            try:
+                receipt = await self.web3_pool.receipts(web3).wait(tx_hash, timeout=300)
+                self.gas_profile.learn(tx_hash, receipt)
+                if self.balance_ledger:
+                    self.balance_ledger.apply(tx_hash, receipt)
+                state.track(tx_hash, None, "confirmed" if receipt.status == 1 else "reverted")
+                if receipt.status != 1:
+                    state.last_revert = TransactionReverted(tx_hash, receipt.blockNumber, await revert_reason(web3, tx_hash, receipt))
+                    raise state.last_revert
+                return receipt
+            except TransactionNotFound:
+                kind = RETRY_SAME
+            except TransactionReverted:
+                raise
+            except Exception as e:
+                kind = classify_error(e)
+                if kind == RETRY_FATAL:
+                    raise
+                self.warn(self.message_label, f"[Attempt {attempt + 1}] Wait for Receipt Error: {str(e)}")
+            if kind == RETRY_FAILOVER:
+                web3 = await self.web3_pool.failover(web3, state.address)
+            await retry_policy.sleep(kind, attempt)
+        raise Exception("Transaction Receipt Not Found After Maximum Retries")
+
+class AccountRunner:
+    def __init__(self, workers=1) -> None:
+        self.workers = max(1, workers)
+
+    async def run(self, items, handler):
+        semaphore = asyncio.Semaphore(self.workers)
+        report = {"processed": 0, "failed": 0, "busy": 0.0, "elapsed": 0.0, "per_minute": 0.0, "parallelism": 0.0}
+
+        async def worker(item):
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    result = await handler(item)
+                except Exception:
+                    result = False
+                report["processed"] += 1
+                report["busy"] += time.monotonic() - started
+                if result is False:
+                    report["failed"] += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(item) for item in items))
+        report["elapsed"] = time.monotonic() - started
+
+        if report["elapsed"] > 0:
+            report["per_minute"] = report["processed"] * 60 / report["elapsed"]
+            report["parallelism"] = report["busy"] / report["elapsed"]
+
+        return report
@@ -0,0 +1,251 @@
+from web3.datastructures import AttributeDict
+from pharos import (
+    NonceManager, RunJournal, AccountState, BalanceLedger, GasProfile, RateLimiter,
+    TRANSFER_TOPIC, NATIVE_ADDRESS
+)
+import asyncio, pytest
+
+OWNER = "0x00000000000000000000000000000000000000aa"
+OTHER = "0x00000000000000000000000000000000000000bb"
+TOKEN = "0x00000000000000000000000000000000000000cc"
+ROUTER = "0x00000000000000000000000000000000000000dd"
+
+class FakeEth:
+    def __init__(self, count):
+        self.count = count
+
+    async def get_transaction_count(self, address, block):
+        return self.count
+
+class FakeWeb3:
+    def __init__(self, count):
+        self.eth = FakeEth(count)
+
+def topic(address):
+    return bytes(12) + bytes.fromhex(address[2:])
+
+def receipt(status=1, gas_used=21000, gas_price=10, logs=(), sender=OWNER):
+    return AttributeDict({
+        "status": status, "gasUsed": gas_used, "effectiveGasPrice": gas_price,
+        "logs": list(logs), "from": sender, "blockNumber": 1
+    })
+
+def transfer_log(source, target, amount):
+    return {"address": TOKEN, "topics": [TRANSFER_TOPIC, topic(source), topic(target)], "data": amount.to_bytes(32, "big")}
+
+@pytest.fixture
+def nonces():
+    manager = NonceManager(OWNER)
+    asyncio.run(manager.sync(FakeWeb3(5)))
+    return manager
+
+def test_nonce_reserve_is_sequential(nonces):
+    assert [nonces.reserve() for _ in range(3)] == [5, 6, 7]
+
+def test_nonce_release_of_latest_rewinds(nonces):
+    nonce = nonces.reserve()
+    nonces.release(nonce)
+    assert nonces.reserve() == nonce
+    assert nonces.released == []
+
+def test_nonce_release_of_gap_is_reused_first(nonces):
+    first, _, third = nonces.reserve(), nonces.reserve(), nonces.reserve()
+    nonces.release(first)
+    assert nonces.reserve() == first
+    assert nonces.reserve() == third + 1
+
+def test_nonce_resync_drops_mined_gaps(nonces):
+    first, _ = nonces.reserve(), nonces.reserve()
+    nonces.release(first)
+    assert asyncio.run(nonces.resync(FakeWeb3(9))) == 9
+    assert nonces.released == []
+
+def test_nonce_resync_keeps_local_lead(nonces):
+    for _ in range(4):
+        nonces.reserve()
+    assert asyncio.run(nonces.resync(FakeWeb3(6))) == 9
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.db")
+
+def start(journal_path, scope="test", **kwargs):
+    state = AccountState("key", OWNER, "label")
+    state.open_run(RunJournal(journal_path, scope, **kwargs))
+    return state
+
+def test_journal_does_not_resume_in_same_session(journal_path):
+    journal = RunJournal(journal_path, "test")
+    run, _ = journal.open_run(OWNER)
+    assert journal.open_run(OWNER)[0] != run
+
+def test_journal_resumes_unfinished_run(journal_path):
+    state = start(journal_path)
+    state.begin_step("swap:0")
+    state.record("path", True)
+    state.begin_step("swap:1")
+    state.record("path", False)
+
+    resumed = start(journal_path)
+    assert resumed.run == state.run
+    assert resumed.completed == {"swap:0": "completed"}
+    assert resumed.begin_step("swap:0") == "completed"
+    assert resumed.step is None
+    assert resumed.begin_step("swap:1") is None
+
+def test_journal_starts_fresh_after_finish(journal_path):
+    state = start(journal_path)
+    state.begin_step("swap:0")
+    state.record("path", True)
+    state.close_run()
+
+    assert start(journal_path).run != state.run
+
+def test_journal_starts_fresh_after_max_age(journal_path):
+    state = start(journal_path)
+    assert start(journal_path, max_age=0).run != state.run
+
+def test_journal_scopes_are_isolated(journal_path):
+    state = start(journal_path, "faroswap")
+    assert start(journal_path, "brokex").run != state.run
+
+def test_journal_confirmed_transaction_completes_step(journal_path):
+    state = start(journal_path)
+    state.begin_step("swap:0")
+    state.track("0x01", 5, "pending")
+    state.track("0x01", None, "confirmed")
+
+    assert start(journal_path).completed == {"swap:0": "completed"}
+
+def test_journal_reverted_transaction_marks_step(journal_path):
+    state = start(journal_path)
+    state.begin_step("swap:0")
+    state.track("0x01", 5, "pending")
+    state.track("0x01", None, "reverted")
+
+    assert start(journal_path).completed == {"swap:0": "reverted"}
+
+def test_journal_pending_transaction_does_not_complete_step(journal_path):
+    state = start(journal_path)
+    state.begin_step("swap:0")
+    state.track("0x01", 5, "pending")
+
+    assert start(journal_path).completed == {}
+
+def test_journal_approval_does_not_complete_step(journal_path):
+    state = start(journal_path)
+    state.begin_step("swap:0")
+    state.track("0x01", 5, "pending", "approve")
+    state.track("0x01", None, "confirmed")
+    state.track("0x02", 6, "pending")
+
+    assert "swap:0" not in start(journal_path).completed
+
+def test_journal_receipt_is_recorded_under_sending_step(journal_path):
+    state = start(journal_path)
+    state.begin_step("swap:0")
+    state.track("0x01", 5, "pending")
+    state.begin_step("swap:1")
+    state.track("0x01", None, "confirmed")
+
+    assert start(journal_path).completed == {"swap:0": "completed"}
+
+def test_journal_pending_lists_latest_pending_rows(journal_path):
+    state = start(journal_path)
+    state.begin_step("swap:0")
+    state.track("0x01", 5, "pending")
+    state.track("0x02", 6, "pending")
+    state.track("0x01", None, "confirmed")
+
+    assert [row[3] for row in state.journal.pending()] == ["0x02"]
+
+def ledger_with(balances):
+    ledger = BalanceLedger()
+    for (owner, token), amount in balances.items():
+        ledger.balances[ledger.key(owner, token)] = amount
+    return ledger
+
+def test_ledger_credit_ignores_unknown_balances():
+    ledger = BalanceLedger()
+    ledger.credit(OWNER, TOKEN, 10)
+    assert ledger.balances == {}
+
+def test_ledger_invalidate_single_token_or_owner():
+    ledger = ledger_with({(OWNER, TOKEN): 1, (OWNER, NATIVE_ADDRESS): 2, (OTHER, TOKEN): 3})
+    ledger.invalidate(OWNER, TOKEN)
+    assert ledger.key(OWNER, TOKEN) not in ledger.balances
+    assert ledger.key(OWNER, NATIVE_ADDRESS) in ledger.balances
+
+    ledger.invalidate(OWNER)
+    assert list(ledger.balances) == [ledger.key(OTHER, TOKEN)]
+
+def test_ledger_apply_charges_gas_value_and_transfers():
+    ledger = ledger_with({(OWNER, NATIVE_ADDRESS): 10**6, (OWNER, TOKEN): 500, (OTHER, TOKEN): 0})
+    ledger.watch("0x01", {"from": OWNER, "value": 1000})
+    ledger.apply("0x01", receipt(gas_used=100, gas_price=2, logs=[transfer_log(OWNER, OTHER, 200)]))
+
+    assert ledger.balances[ledger.key(OWNER, NATIVE_ADDRESS)] == 10**6 - 1200
+    assert ledger.balances[ledger.key(OWNER, TOKEN)] == 300
+    assert ledger.balances[ledger.key(OTHER, TOKEN)] == 200
+
+def test_ledger_apply_unwatched_invalidates_native():
+    ledger = ledger_with({(OWNER, NATIVE_ADDRESS): 10**6})
+    ledger.apply("0x01", receipt())
+    assert ledger.key(OWNER, NATIVE_ADDRESS) not in ledger.balances
+
+def test_ledger_apply_revert_invalidates_owner():
+    ledger = ledger_with({(OWNER, NATIVE_ADDRESS): 10**6, (OWNER, TOKEN): 500})
+    ledger.watch("0x01", {"from": OWNER, "value": 0})
+    ledger.apply("0x01", receipt(status=0))
+    assert ledger.balances == {}
+
+@pytest.fixture
+def profile(tmp_path):
+    return GasProfile(str(tmp_path / "gas_profiles.json"))
+
+def watch(profile, tx_hash, gas=100000):
+    profile.watch(tx_hash, {"to": ROUTER, "data": "0x12345678abcdef", "value": 0, "gas": gas})
+    return profile.key(ROUTER, "0x12345678", 0)
+
+def test_gas_profile_learns_peak_usage(profile, tmp_path):
+    key = watch(profile, "0x01")
+    profile.learn("0x01", receipt(gas_used=60000))
+    watch(profile, "0x02")
+    profile.learn("0x02", receipt(gas_used=50000))
+
+    assert profile.profiles == {key: 60000}
+    assert GasProfile(str(tmp_path / "gas_profiles.json")).profiles == {key: 60000}
+
+def test_gas_profile_evicts_after_out_of_gas(profile):
+    key = watch(profile, "0x01")
+    profile.learn("0x01", receipt(gas_used=60000))
+    watch(profile, "0x02", gas=60000)
+    profile.learn("0x02", receipt(status=0, gas_used=60000))
+
+    assert key not in profile.profiles
+
+def test_gas_profile_keeps_profile_on_plain_revert(profile):
+    key = watch(profile, "0x01")
+    profile.learn("0x01", receipt(gas_used=60000))
+    watch(profile, "0x02")
+    profile.learn("0x02", receipt(status=0, gas_used=30000))
+
+    assert profile.profiles == {key: 60000}
+
+def test_gas_profile_ignores_unwatched(profile):
+    profile.learn("0x01", receipt())
+    assert profile.profiles == {}
+
+def test_rate_limiter_backs_off_and_recovers():
+    async def run():
+        limiter = RateLimiter(rate=8, min_rate=1, recovery=0.25)
+        await limiter.acquire()
+        limiter.release(429)
+        assert limiter.current_rate == 4
+        assert limiter.paused_until > 0
+
+        await limiter.acquire()
+        limiter.release(200)
+        assert limiter.current_rate == 6
+
+    asyncio.run(run())